@@ -9,8 +9,16 @@ Hybrid consensus combining:
 
 Package contents:
 - core.py: Block, Blockchain, Transaction structures
+- storage.py: Persistent append-only block store
+- state_trie.py: Authenticated state trie (state_root)
+- chain_index.py: Block hash, transaction and address indexes
+- snapshot.py: Versioned binary state snapshots
+- codec.py: Binary codec primitives for Block/Transaction to_bytes
+- plot.py: Capacity plot files and deadline-based PoC mining
 - consensus.py: PoC, PoS, PoW Lottery mechanisms
+- voting.py: Vote tallies shared by consensus and governance
 - network.py: P2P networking, peer discovery, gossip
+- transport.py: asyncio TCP transport for network messages
 - node.py: FCU node implementations
 - governance.py: Council voting and treasury management
 - main.py: Network demonstration and CLI
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+FCU BLOCKCHAIN - PERFORMANCE BENCHMARKS
+Run: python benchmark.py
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+# Add FCU blockchain to path
+fcu_path = Path(__file__).parent
+sys.path.insert(0, str(fcu_path))
+
+from core import Block, Transaction, TransactionType
+from consensus import PoCMiner, PoSValidator
+from node import FCUNode, PoSValidatorNode
+from network import Message, MessageType
+import plot
+
+
+def print_header(title):
+    """Print formatted section header"""
+    print(f"\n{'='*80}")
+    print(f"{title.center(80)}")
+    print(f"{'='*80}\n")
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    """Best wall-clock time of several runs (seconds)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def make_block(tx_count: int) -> Block:
+    """Block with realistic-looking transfers and a few pledges"""
+    transactions = []
+    for i in range(tx_count):
+        is_pledge = i % 10 == 0
+        transactions.append(Transaction(
+            tx_id=f"tx_{i:08d}",
+            timestamp=1700000000.0 + i,
+            sender=f"Farmer_{i % 500}",
+            receiver=f"Farmer_{(i * 7) % 500}",
+            amount=round(1.0 + (i % 100) * 0.25, 2),
+            tx_type=TransactionType.STORAGE_PLEDGE if is_pledge else TransactionType.TRANSFER,
+            nonce=i,
+            signature=f"{i:064x}",
+            data={'capacity_gb': 256.0} if is_pledge else {}
+        ))
+    return Block(
+        index=1,
+        previous_hash="ab" * 32,
+        timestamp=1700000000.0,
+        transactions=transactions,
+        miner="Farmer_John",
+        validators=["TREASURER_Alice", "COUNCIL_Bob", "COUNCIL_Charlie"],
+        poc_difficulty=4,
+        nonce=12345
+    )
+
+
+def bench_codec(tx_count: int = 2000):
+    """Compare JSON and binary block encodings: size, encode and decode time"""
+    print_header(f"Block codec: JSON vs binary ({tx_count} transactions)")
+    block = make_block(tx_count)
+
+    json_payload = block.to_json().encode()
+    binary_payload = block.to_bytes()
+
+    json_encode = best_of(lambda: block.to_json().encode())
+    binary_encode = best_of(lambda: [tx.invalidate_hash() for tx in block.transactions]
+                            and block.to_bytes())  # Cold: no memoized tx encodings
+    json_decode = best_of(lambda: Block.from_dict(json.loads(json_payload)))
+    binary_decode = best_of(lambda: Block.from_bytes(binary_payload))
+
+    assert Block.from_bytes(binary_payload).to_dict() == block.to_dict()
+
+    print(f"{'':12}{'JSON':>14}{'binary':>14}{'ratio':>10}")
+    print(f"{'size (KB)':12}{len(json_payload) / 1024:>14.1f}"
+          f"{len(binary_payload) / 1024:>14.1f}{len(json_payload) / len(binary_payload):>9.1f}x")
+    print(f"{'encode (ms)':12}{json_encode * 1000:>14.2f}"
+          f"{binary_encode * 1000:>14.2f}{json_encode / binary_encode:>9.1f}x")
+    print(f"{'decode (ms)':12}{json_decode * 1000:>14.2f}"
+          f"{binary_decode * 1000:>14.2f}{json_decode / binary_decode:>9.1f}x")
+
+
+def bench_mining(seconds: float = 3.0):
+    """Nonce search hash rate: single process vs worker pool"""
+    print_header("PoC nonce search: hash rate by worker count")
+    worker_counts = sorted({1, 2, os.cpu_count() or 1})
+    base_rate = None
+    print(f"{'workers':>8}{'MH/s':>10}{'speedup':>10}")
+    for workers in worker_counts:
+        miner = PoCMiner("Farmer_Bench", 256.0, workers=workers)
+        miner.mine_block("ab" * 32, difficulty=1 << 250, timeout=seconds)  # Unsolvable: pure hashing
+        miner.close()
+        base_rate = base_rate or miner.last_hash_rate
+        print(f"{workers:>8}{miner.last_hash_rate / 1e6:>10.2f}"
+              f"{miner.last_hash_rate / base_rate:>9.1f}x")
+
+
+def bench_plot_scan(drives: int = 2, nonces_per_drive: int = 64):
+    """Round scan latency over plots on several directories"""
+    print_header(f"Plot scan: {drives} drives x {nonces_per_drive} nonces")
+    with tempfile.TemporaryDirectory() as root:
+        plot_dirs = [os.path.join(root, f"drive{i}") for i in range(drives)]
+        for i, plot_dir in enumerate(plot_dirs):
+            plot.Plotter(plot_dir).plot(1, i * nonces_per_drive, nonces_per_drive)
+        gen_sig = plot.generation_signature("ab" * 32, "Farmer_John")
+        base_target = plot.base_target_for(drives * nonces_per_drive / plot.NONCES_PER_GB, 22.5)
+
+        for label, options in (("readinto", {}), ("mmap", {'use_mmap': True})):
+            scanner = plot.PlotScanner(plot_dirs, **options)
+            result = scanner.scan(gen_sig, 1, base_target)
+            scanner.close()
+            drive_ms = ", ".join(f"{os.path.basename(d)} {t * 1000:.2f}ms"
+                                 for d, t in sorted(result.drive_times.items()))
+            print(f"{label:>9}: round {result.scan_time * 1000:.2f}ms, "
+                  f"{result.bytes_read / 1024:.0f} KB read ({drive_ms}), deadline {result.deadline}s")
+
+
+def _free_ports(count: int):
+    sockets = [socket.socket() for _ in range(count)]
+    for sock in sockets:
+        sock.bind(("127.0.0.1", 0))
+    ports = [sock.getsockname()[1] for sock in sockets]
+    for sock in sockets:
+        sock.close()
+    return ports
+
+
+async def _propagation_node(index, ports, ready, dial, go, done, results, blocks, tx_count):
+    node = FCUNode(f"node_{index}", port=ports[index])
+    await node.start_network()
+    loop = asyncio.get_running_loop()
+    ready.put(index)
+    await loop.run_in_executor(None, dial.wait)
+    # Each node dials up to two lower-numbered nodes: a connected mesh
+    for port in ports[max(0, index - 2):index]:
+        await node.dial_peer("127.0.0.1", port)
+    payloads = []
+    if index == 0:
+        for height in range(1, blocks + 1):
+            block = make_block(tx_count)
+            block.index = height
+            block.hash = block.calculate_hash()
+            payloads.append(block.to_dict())
+    ready.put(index)
+    await loop.run_in_executor(None, go.wait)
+
+    for payload in payloads:
+        node.receive_block(payload)
+        await asyncio.sleep(0.05)
+    if index == 0:
+        await asyncio.sleep(0.5)
+    peers = len(node.connected_peers)
+    if index == 0:
+        done.set()
+    await loop.run_in_executor(None, done.wait)
+    results.put((index, peers, list(node.propagation_delays["block_announce"])))
+    await node.stop_network()
+
+
+def _run_propagation_node(*args):
+    asyncio.run(_propagation_node(*args))
+
+
+def bench_propagation(nodes: int = 6, blocks: int = 20, tx_count: int = 200):
+    """Block announce latency over localhost TCP, one process per node"""
+    print_header(f"Block propagation: {nodes} node processes, {blocks} blocks x {tx_count} txs")
+    ports = _free_ports(nodes)
+    ready, results = multiprocessing.Queue(), multiprocessing.Queue()
+    dial, go, done = multiprocessing.Event(), multiprocessing.Event(), multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(
+            target=_run_propagation_node,
+            args=(i, ports, ready, dial, go, done, results, blocks, tx_count)
+        )
+        for i in range(nodes)
+    ]
+    for process in processes:
+        process.start()
+    for _ in range(nodes):
+        ready.get(timeout=30)
+    dial.set()
+    for _ in range(nodes):
+        ready.get(timeout=30)
+    go.set()
+
+    delays = []
+    print(f"{'node':>6}{'peers':>7}{'blocks':>8}{'p50 ms':>9}{'max ms':>9}")
+    for index, peers, node_delays in sorted(results.get(timeout=60) for _ in range(nodes)):
+        delays.extend(node_delays)
+        node_delays.sort()
+        p50 = node_delays[len(node_delays) // 2] * 1000 if node_delays else float('nan')
+        worst = node_delays[-1] * 1000 if node_delays else float('nan')
+        print(f"{index:>6}{peers:>7}{len(node_delays):>8}{p50:>9.2f}{worst:>9.2f}")
+    for process in processes:
+        process.join()
+
+    delays.sort()
+    if delays:
+        print(f"\nall nodes: p50 {delays[len(delays) // 2] * 1000:.2f}ms, "
+              f"p95 {delays[int(len(delays) * 0.95)] * 1000:.2f}ms, max {delays[-1] * 1000:.2f}ms")
+
+
+async def _tx_storm(traffic_classes, blocks: int, txs_per_block: int):
+    receiver = FCUNode("storm_receiver", port=0)
+    sender = FCUNode("storm_sender", port=0)
+    await receiver.start_network(traffic_classes=traffic_classes)
+    await sender.start_network([("127.0.0.1", receiver.port)], traffic_classes=traffic_classes)
+
+    payloads = []
+    for height in range(1, blocks + 1):
+        block = make_block(200)
+        block.index = height
+        block.hash = block.calculate_hash()
+        payloads.append(block.to_dict())
+
+    tx_number = 0
+    for payload in payloads:
+        for _ in range(txs_per_block):
+            tx_number += 1
+            sender.send_message("storm_receiver", Message(
+                message_id=f"tx_{tx_number}",
+                message_type=MessageType.TRANSACTION,
+                sender_id=sender.node_id,
+                payload={'tx_id': f"storm_{tx_number}", 'sender': "Farmer_1",
+                         'receiver': "Farmer_2", 'amount': 1.0, 'nonce': tx_number}
+            ))
+        sender.receive_block(payload)
+        await asyncio.sleep(0.1)
+
+    deadline = time.time() + 30
+    while time.time() < deadline and len(receiver.propagation_delays["block_announce"]) < blocks:
+        await asyncio.sleep(0.05)
+    await sender.stop_network()
+    await receiver.stop_network()
+    return sorted(receiver.propagation_delays["block_announce"])
+
+
+def bench_tx_storm(blocks: int = 10, txs_per_block: int = 3000):
+    """Block latency behind transaction bursts: priority queues vs one FIFO"""
+    print_header(f"Block latency in a transaction storm: {blocks} blocks, {txs_per_block} txs ahead of each")
+    scenarios = (
+        ("priority", None),
+        ("fifo", {'fifo': (1, 1 << 30, 'newest')}),
+    )
+    print(f"{'queues':>10}{'blocks':>8}{'p50 ms':>10}{'max ms':>10}")
+    for label, traffic_classes in scenarios:
+        delays = asyncio.run(_tx_storm(traffic_classes, blocks, txs_per_block))
+        p50 = delays[len(delays) // 2] * 1000 if delays else float('nan')
+        worst = delays[-1] * 1000 if delays else float('nan')
+        print(f"{label:>10}{len(delays):>8}{p50:>10.1f}{worst:>10.1f}")
+
+
+async def _attestation_round(validators: int, blocks: int):
+    genesis_validators = {f"Council_{i}": 10000.0 for i in range(validators)}
+    nodes = [
+        PoSValidatorNode(validator_id, role=PoSValidator.ROLE_COUNCIL, initial_stake=stake,
+                         port=0, genesis_validators=genesis_validators)
+        for validator_id, stake in genesis_validators.items()
+    ]
+    for i, node in enumerate(nodes):
+        await node.start_network([("127.0.0.1", other.port) for other in nodes[:i]])
+    deadline = time.time() + 10
+    while time.time() < deadline and any(len(node.connected_peers) < validators - 1 for node in nodes):
+        await asyncio.sleep(0.05)
+
+    latencies = []
+    for height in range(1, blocks + 1):
+        block_hash = f"{height:064x}"
+        started = time.time()
+        for node in nodes:
+            node.validate_block({'hash': block_hash})
+        deadline = started + 10
+        while time.time() < deadline and not all(
+                block_hash in node.attestations.published for node in nodes):
+            await asyncio.sleep(0.005)
+        missing = [node.node_id for node in nodes if block_hash not in node.attestations.published]
+        assert not missing, f"no aggregate attestation for block {height} at {missing}"
+        latencies.append(time.time() - started)
+
+    for node in nodes:
+        await node.stop_network()
+        node.close()
+    return sorted(latencies)
+
+
+def bench_attestation(validators: int = 6, blocks: int = 10):
+    """Attestations to aggregators and the aggregate's gossip, one process over localhost TCP"""
+    print_header(f"Attestation aggregation: {validators} validators, {blocks} blocks")
+    latencies = asyncio.run(_attestation_round(validators, blocks))
+    print(f"every node received an aggregate for all {blocks} blocks: "
+          f"p50 {latencies[len(latencies) // 2] * 1000:.2f}ms, max {latencies[-1] * 1000:.2f}ms")
+
+
+def main():
+    bench_codec()
+    bench_mining()
+    bench_plot_scan()
+    bench_propagation()
+    bench_tx_storm()
+    bench_attestation()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+FCU Blockchain Secondary Indexes
+- Block hash -> height
+- Transaction ID -> (height, position)
+- Address -> compact postings list of transaction locations
+- Binary save/load so disk-backed chains keep indexes next to snapshots
+"""
+
+import sys
+import hashlib
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from codec import CodecError, Decoder, Encoder
+
+INDEX_MAGIC = b"FCUIDX"
+INDEX_VERSION = 1
+_CHECKSUM_SIZE = 32
+
+
+class ChainIndex:
+    """
+    Secondary lookup indexes maintained alongside the chain.
+
+    Locations are packed as (height << POSITION_BITS) | position into a
+    single unsigned 64-bit integer, and each address keeps its locations in
+    an array('Q') postings list, so history costs 8 bytes per entry rather
+    than a tuple object. Blocks must be added in height order and removed
+    from the tip, which keeps every postings list sorted. A tx_id confirmed
+    again keeps its earlier locations so a reorg can restore them.
+    """
+
+    POSITION_BITS = 24                     # Up to 16M transactions per block
+    _POSITION_MASK = (1 << POSITION_BITS) - 1
+
+    def __init__(self, index_block_hashes: bool = True):
+        # Disk-backed chains already have a hash index in the BlockStore
+        self.index_block_hashes = index_block_hashes
+        self.block_heights: Dict[str, int] = {}
+        self.tx_locations: Dict[str, int] = {}
+        self.address_postings: Dict[str, array] = {}
+        self.shadowed_locations: Dict[str, List[int]] = {}  # Earlier locations of re-used tx_ids
+
+    @classmethod
+    def pack(cls, height: int, position: int) -> int:
+        return (height << cls.POSITION_BITS) | position
+
+    @classmethod
+    def unpack(cls, location: int) -> Tuple[int, int]:
+        return location >> cls.POSITION_BITS, location & cls._POSITION_MASK
+
+    @staticmethod
+    def _addresses(tx) -> Tuple[str, ...]:
+        if tx.sender == tx.receiver:
+            return (tx.sender,)
+        return (tx.sender, tx.receiver)
+
+    def add_block(self, block):
+        """Index a newly appended block"""
+        height = block.index
+        if self.index_block_hashes:
+            self.block_heights[block.hash] = height
+
+        postings = self.address_postings
+        for position, tx in enumerate(block.transactions):
+            location = self.pack(height, position)
+            previous = self.tx_locations.get(tx.tx_id)
+            if previous is not None:
+                self.shadowed_locations.setdefault(tx.tx_id, []).append(previous)
+            self.tx_locations[tx.tx_id] = location
+            for address in self._addresses(tx):
+                entries = postings.get(address)
+                if entries is None:
+                    entries = postings[address] = array('Q')
+                entries.append(location)
+
+    def remove_block(self, block):
+        """Drop a block removed from the tip (chain reorganization)"""
+        height = block.index
+        if self.index_block_hashes and self.block_heights.get(block.hash) == height:
+            del self.block_heights[block.hash]
+
+        for position in range(len(block.transactions) - 1, -1, -1):
+            tx = block.transactions[position]
+            location = self.pack(height, position)
+            if self.tx_locations.get(tx.tx_id) == location:
+                earlier = self.shadowed_locations.get(tx.tx_id)
+                if earlier:
+                    self.tx_locations[tx.tx_id] = earlier.pop()
+                    if not earlier:
+                        del self.shadowed_locations[tx.tx_id]
+                else:
+                    del self.tx_locations[tx.tx_id]
+            for address in self._addresses(tx):
+                entries = self.address_postings.get(address)
+                if entries and entries[-1] == location:
+                    entries.pop()
+                    if not entries:
+                        del self.address_postings[address]
+
+    def rebuild(self, blocks: Iterable):
+        """Rebuild all indexes in bulk from blocks in height order"""
+        self.block_heights.clear()
+        self.tx_locations.clear()
+        self.address_postings.clear()
+        self.shadowed_locations.clear()
+        for block in blocks:
+            self.add_block(block)
+
+    def to_bytes(self, height: int, block_hash: str) -> bytes:
+        """Serialize indexes as of block (height, block_hash), with a SHA-256 trailer"""
+        enc = Encoder()
+        enc.raw(INDEX_MAGIC)
+        enc.u8(INDEX_VERSION)
+        enc.varint(height)
+        enc.hash_field(block_hash)
+        for table in (self.block_heights, self.tx_locations):
+            enc.varint(len(table))
+            for key, value in table.items():
+                enc.str(key)
+                enc.varint(value)
+        enc.varint(len(self.shadowed_locations))
+        for tx_id, locations in self.shadowed_locations.items():
+            enc.str(tx_id)
+            enc.varint(len(locations))
+            for location in locations:
+                enc.varint(location)
+        enc.varint(len(self.address_postings))
+        for address, entries in self.address_postings.items():
+            enc.str(address)
+            if sys.byteorder == 'big':
+                entries = array('Q', entries)
+                entries.byteswap()
+            enc.blob(entries.tobytes())     # Little-endian u64s
+        body = enc.getvalue()
+        return body + hashlib.sha256(body).digest()
+
+    def load_bytes(self, data: bytes) -> Tuple[int, str]:
+        """Replace indexes with serialized contents; returns (height, block_hash)"""
+        view = memoryview(data)
+        body = view[:-_CHECKSUM_SIZE]
+        if len(data) < len(INDEX_MAGIC) + _CHECKSUM_SIZE or \
+                hashlib.sha256(body).digest() != bytes(view[-_CHECKSUM_SIZE:]):
+            raise CodecError("index checksum mismatch")
+        dec = Decoder(body)
+        if bytes(dec.raw(len(INDEX_MAGIC))) != INDEX_MAGIC or dec.u8() != INDEX_VERSION:
+            raise CodecError("not an index file of a supported version")
+        height = dec.varint()
+        block_hash = dec.hash_field()
+        block_heights = {dec.str(): dec.varint() for _ in range(dec.varint())}
+        tx_locations = {dec.str(): dec.varint() for _ in range(dec.varint())}
+        shadowed = {}
+        for _ in range(dec.varint()):
+            tx_id = dec.str()
+            shadowed[tx_id] = [dec.varint() for _ in range(dec.varint())]
+        postings = {}
+        for _ in range(dec.varint()):
+            address = dec.str()
+            entries = array('Q')
+            entries.frombytes(dec.blob())
+            if sys.byteorder == 'big':
+                entries.byteswap()
+            postings[address] = entries
+        if not dec.done():
+            raise CodecError("trailing bytes in index")
+
+        self.block_heights = block_heights
+        self.tx_locations = tx_locations
+        self.shadowed_locations = shadowed
+        self.address_postings = postings
+        return height, block_hash
+
+    def get_block_height(self, block_hash: str) -> Optional[int]:
+        return self.block_heights.get(block_hash)
+
+    def get_tx_location(self, tx_id: str) -> Optional[Tuple[int, int]]:
+        """(height, position) of transaction, or None"""
+        location = self.tx_locations.get(tx_id)
+        if location is None:
+            return None
+        return self.unpack(location)
+
+    def get_address_history(
+        self,
+        address: str,
+        limit: Optional[int] = None
+    ) -> List[Tuple[int, int]]:
+        """(height, position) of transactions touching address, newest first"""
+        entries = self.address_postings.get(address)
+        if not entries:
+            return []
+        end = len(entries) - limit if limit is not None else 0
+        return [self.unpack(entries[i]) for i in range(len(entries) - 1, max(end, 0) - 1, -1)]
+
+    def get_stats(self) -> Dict:
+        return {
+            'indexed_blocks': len(self.block_heights),
+            'indexed_transactions': len(self.tx_locations),
+            'indexed_addresses': len(self.address_postings),
+            'postings': sum(len(entries) for entries in self.address_postings.values())
+        }
@@ -0,0 +1,281 @@
+"""
+FCU Blockchain Binary Codec Primitives
+- LEB128 varints (zigzag for signed values)
+- Length-prefixed strings and byte fields
+- Tagged values (None/bool/int/float/str/list/dict) for free-form payloads
+- Zero-copy reader over memoryview
+
+Block/Transaction layouts live in core.py (to_bytes / from_bytes).
+"""
+
+import struct
+from typing import Optional, Union
+
+_F64 = struct.Struct(">d")
+
+# Hash-like fields are stored raw when they are 64-char hex digests
+HASH_RAW = 0
+HASH_TEXT = 1
+HASH_NONE = 2
+
+# Tagged value encoding; dict keys are written as sorted strings so the
+# output is canonical (safe to hash)
+VALUE_NONE = 0
+VALUE_FALSE = 1
+VALUE_TRUE = 2
+VALUE_INT = 3
+VALUE_FLOAT = 4
+VALUE_STR = 5
+VALUE_LIST = 6
+VALUE_DICT = 7
+
+
+class CodecError(ValueError):
+    """Raised on truncated or malformed binary payloads"""
+
+
+def read_varint(view: memoryview, pos: int):
+    """Decode varint at pos; returns (value, new_pos). Hot-path helper for decoders"""
+    try:
+        byte = view[pos]
+        if byte < 0x80:
+            return byte, pos + 1
+        result, shift = byte & 0x7F, 7
+        while True:
+            pos += 1
+            byte = view[pos]
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result, pos + 1
+            shift += 7
+    except IndexError:
+        raise CodecError("payload truncated") from None
+
+
+def read_svarint(view: memoryview, pos: int):
+    """Decode zigzag varint at pos; returns (value, new_pos)"""
+    value, pos = read_varint(view, pos)
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1), pos
+
+
+def read_str(view: memoryview, pos: int):
+    """Decode length-prefixed UTF-8 string at pos; returns (value, new_pos)"""
+    try:
+        length = view[pos]
+    except IndexError:
+        raise CodecError("payload truncated") from None
+    if length < 0x80:
+        pos += 1
+    else:
+        length, pos = read_varint(view, pos)
+    end = pos + length
+    if end > len(view):
+        raise CodecError("payload truncated")
+    return str(view[pos:end], 'utf-8'), end
+
+
+def read_value(view: memoryview, pos: int):
+    """Decode a tagged value at pos; returns (value, new_pos)"""
+    try:
+        tag = view[pos]
+    except IndexError:
+        raise CodecError("payload truncated") from None
+    pos += 1
+    if tag == VALUE_STR:
+        return read_str(view, pos)
+    if tag == VALUE_INT:
+        return read_svarint(view, pos)
+    if tag == VALUE_FLOAT:
+        if pos + 8 > len(view):
+            raise CodecError("payload truncated")
+        return _F64.unpack_from(view, pos)[0], pos + 8
+    if tag == VALUE_DICT:
+        count, pos = read_varint(view, pos)
+        result = {}
+        for _ in range(count):
+            key, pos = read_str(view, pos)
+            result[key], pos = read_value(view, pos)
+        return result, pos
+    if tag == VALUE_LIST:
+        count, pos = read_varint(view, pos)
+        result = []
+        for _ in range(count):
+            item, pos = read_value(view, pos)
+            result.append(item)
+        return result, pos
+    if tag == VALUE_NONE:
+        return None, pos
+    if tag == VALUE_FALSE:
+        return False, pos
+    if tag == VALUE_TRUE:
+        return True, pos
+    raise CodecError(f"bad value tag {tag}")
+
+
+class Encoder:
+    """Append-only binary writer"""
+
+    __slots__ = ('buf',)
+
+    def __init__(self):
+        self.buf = bytearray()
+
+    def u8(self, value: int):
+        self.buf.append(value)
+
+    def varint(self, value: int):
+        if value < 0:
+            raise CodecError("varint must be non-negative")
+        buf = self.buf
+        while value > 0x7F:
+            buf.append((value & 0x7F) | 0x80)
+            value >>= 7
+        buf.append(value)
+
+    def svarint(self, value: int):
+        """Zigzag-encoded signed varint"""
+        self.varint((value << 1) if value >= 0 else ((-value << 1) - 1))
+
+    def f64(self, value: float):
+        self.buf += _F64.pack(value)
+
+    def raw(self, value: bytes):
+        self.buf += value
+
+    def blob(self, value: bytes):
+        self.varint(len(value))
+        self.buf += value
+
+    def str(self, value: str):
+        self.blob(value.encode())
+
+    def opt_str(self, value: Optional[str]):
+        if value is None:
+            self.u8(0)
+        else:
+            self.u8(1)
+            self.str(value)
+
+    def hash_field(self, value: Optional[str]):
+        """32 raw bytes for hex digests, else tagged text/None"""
+        if value is None:
+            self.u8(HASH_NONE)
+            return
+        if len(value) == 64:
+            try:
+                raw = bytes.fromhex(value)
+            except ValueError:
+                raw = None
+            if raw is not None and raw.hex() == value:
+                self.u8(HASH_RAW)
+                self.buf += raw
+                return
+        self.u8(HASH_TEXT)
+        self.str(value)
+
+    def value(self, value):
+        """Tagged value; unsupported types are written as str() like json default=str"""
+        if value is None:
+            self.u8(VALUE_NONE)
+        elif value is True or value is False:
+            self.u8(VALUE_TRUE if value else VALUE_FALSE)
+        elif isinstance(value, int):
+            self.u8(VALUE_INT)
+            self.svarint(value)
+        elif isinstance(value, float):
+            self.u8(VALUE_FLOAT)
+            self.f64(value)
+        elif isinstance(value, dict):
+            self.u8(VALUE_DICT)
+            items = sorted(((str(key), item) for key, item in value.items()), key=lambda kv: kv[0])
+            self.varint(len(items))
+            for key, item in items:
+                self.str(key)
+                self.value(item)
+        elif isinstance(value, (list, tuple)):
+            self.u8(VALUE_LIST)
+            self.varint(len(value))
+            for item in value:
+                self.value(item)
+        else:
+            self.u8(VALUE_STR)
+            self.str(str(value))
+
+    def getvalue(self) -> bytes:
+        return bytes(self.buf)
+
+
+class Decoder:
+    """Reader over a memoryview; slices are views, not copies"""
+
+    __slots__ = ('view', 'pos')
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview], pos: int = 0):
+        self.view = data if isinstance(data, memoryview) else memoryview(data)
+        self.pos = pos
+
+    def _need(self, size: int):
+        if self.pos + size > len(self.view):
+            raise CodecError("payload truncated")
+
+    def u8(self) -> int:
+        self._need(1)
+        value = self.view[self.pos]
+        self.pos += 1
+        return value
+
+    def varint(self) -> int:
+        view, pos = self.view, self.pos
+        result = shift = 0
+        while True:
+            if pos >= len(view):
+                raise CodecError("payload truncated")
+            byte = view[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                self.pos = pos
+                return result
+            shift += 7
+
+    def svarint(self) -> int:
+        value, self.pos = read_svarint(self.view, self.pos)
+        return value
+
+    def f64(self) -> float:
+        self._need(8)
+        value = _F64.unpack_from(self.view, self.pos)[0]
+        self.pos += 8
+        return value
+
+    def raw(self, size: int) -> memoryview:
+        self._need(size)
+        value = self.view[self.pos:self.pos + size]
+        self.pos += size
+        return value
+
+    def blob(self) -> memoryview:
+        return self.raw(self.varint())
+
+    def str(self) -> str:
+        return str(self.blob(), 'utf-8')
+
+    def opt_str(self) -> Optional[str]:
+        return self.str() if self.u8() else None
+
+    def hash_field(self) -> Optional[str]:
+        tag = self.u8()
+        if tag == HASH_RAW:
+            return self.raw(32).hex()
+        if tag == HASH_TEXT:
+            return self.str()
+        if tag == HASH_NONE:
+            return None
+        raise CodecError(f"bad hash field tag {tag}")
+
+    def value(self):
+        value, self.pos = read_value(self.view, self.pos)
+        return value
+
+    def done(self) -> bool:
+        return self.pos == len(self.view)
@@ -6,48 +6,77 @@ FCU Blockchain Consensus Mechanisms:
 """
 
 import hashlib
+import heapq
 import time
 import random
-from typing import Dict, List, Optional, Tuple
+import queue
+import multiprocessing
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 
+import plot
+from voting import VoteTally
+
 
 class PoCDifficulty:
-    """Proof of Capacity difficulty adjustment (Signum-style)"""
+    """
+    Proof of Capacity difficulty adjustment (Signum-style)
+    
+    Difficulty is the expected number of hashes per block; a solution is a
+    hash whose 256-bit integer value is below MAX_TARGET // difficulty, so
+    difficulty can move in arbitrarily small steps.
+    """
     
-    INITIAL_DIFFICULTY = 4
-    TARGET_BLOCK_TIME = 22.5  # seconds (15-30s range, middle target)
-    DIFFICULTY_ADJUSTMENT_BLOCKS = 50
+    INITIAL_DIFFICULTY = 256  # Same expected work as two leading hex zeros
+    TARGET_BLOCK_TIME = plot.TARGET_BLOCK_TIME  # seconds (15-30s range, middle target)
+    DIFFICULTY_ADJUSTMENT_BLOCKS = 50  # Rolling retarget window
+    RETARGET_MIN_BLOCKS = 10  # Samples needed before the first retarget
+    MAX_ADJUSTMENT = 4  # Max factor per retarget in either direction
+    MAX_TARGET = (1 << 256) - 1
     
     @staticmethod
     def calculate_new_difficulty(
         current_difficulty: int,
         actual_block_times: List[float],
-        network_capacity_gb: float
+        network_capacity_gb: float,
+        block_difficulties: Optional[List[int]] = None
     ) -> int:
         """
-        Adjust Proof of Capacity difficulty based on:
-        - Actual block times vs target
-        - Overall network storage capacity
+        Proportional retarget over a window of recent blocks.
+        Observed hash rate is work done / time taken; the new difficulty is
+        that rate times the target block time, clamped to MAX_ADJUSTMENT.
+        block_difficulties gives the difficulty each block was mined at
+        (defaults to current_difficulty for all).
         
-        Similar to Signum's mechanism
+        Network capacity is reflected through the observed block times.
         """
         if len(actual_block_times) < 2:
             return current_difficulty
         
-        # Calculate average block time
-        avg_time = sum(actual_block_times) / len(actual_block_times)
-        
-        # If blocks are too fast, increase difficulty
-        if avg_time < PoCDifficulty.TARGET_BLOCK_TIME * 0.8:
-            return min(current_difficulty + 1, 32)
-        
-        # If blocks are too slow, decrease difficulty
-        if avg_time > PoCDifficulty.TARGET_BLOCK_TIME * 1.2:
-            return max(current_difficulty - 1, 1)
-        
-        return current_difficulty
+        total_time = sum(actual_block_times)
+        if block_difficulties is None:
+            total_work = current_difficulty * len(actual_block_times)
+        else:
+            total_work = sum(block_difficulties)
+        if total_time <= 0:
+            return current_difficulty * PoCDifficulty.MAX_ADJUSTMENT
+        
+        # Integer math: difficulties can exceed float precision
+        scale = 1000
+        new_difficulty = (
+            total_work * int(PoCDifficulty.TARGET_BLOCK_TIME * scale)
+            // max(1, int(total_time * scale))
+        )
+        lower = max(1, current_difficulty // PoCDifficulty.MAX_ADJUSTMENT)
+        upper = current_difficulty * PoCDifficulty.MAX_ADJUSTMENT
+        return min(upper, max(lower, new_difficulty))
+
+    @staticmethod
+    def target_value(difficulty: int) -> int:
+        """256-bit integer target for a difficulty"""
+        return PoCDifficulty.MAX_TARGET // max(1, int(difficulty))
 
     @staticmethod
     def verify_pow_solution(
@@ -60,25 +89,200 @@ class PoCDifficulty:
         Verify PoC solution using storage-based proof.
         In production, this would verify against actual storage plots (Signum-style).
         
-        Here we simulate: hash(previous_hash || capacity || nonce) must have
-        'difficulty' leading zeros, weighted by capacity.
+        Here we simulate: hash(previous_hash || capacity || nonce), read as a
+        256-bit integer, must be below the difficulty target.
         """
         block_data = f"{previous_hash}:{storage_capacity_gb}:{nonce}"
-        result_hash = hashlib.sha256(block_data.encode()).hexdigest()
+        result_hash = hashlib.sha256(block_data.encode()).digest()
         
-        # Check if hash meets difficulty target (leading zeros)
-        required_leading_zeros = max(1, int(difficulty / 2))
-        return result_hash.startswith('0' * required_leading_zeros)
+        return int.from_bytes(result_hash, 'big') < PoCDifficulty.target_value(difficulty)
+
+    @staticmethod
+    def target_for(difficulty: int) -> bytes:
+        """
+        Target as 32 big-endian bytes: for equal-length digests, bytes
+        comparison is integer comparison, without converting each hash.
+        """
+        return PoCDifficulty.target_value(difficulty).to_bytes(32, 'big')
+
+    @staticmethod
+    def solution_prefix(previous_hash: str, storage_capacity_gb: float) -> bytes:
+        """Fixed part of the PoC preimage; the decimal nonce is appended to it"""
+        return f"{previous_hash}:{storage_capacity_gb}:".encode()
+
+
+class DifficultyRetarget:
+    """Rolling window of (block_time, difficulty) driving per-block retargets"""
+    
+    def __init__(
+        self,
+        difficulty: int = PoCDifficulty.INITIAL_DIFFICULTY,
+        window: int = PoCDifficulty.DIFFICULTY_ADJUSTMENT_BLOCKS
+    ):
+        self.difficulty = difficulty
+        self.window: deque = deque(maxlen=window)
+    
+    def record(self, block_time: float, network_capacity_gb: float = 0.0) -> int:
+        """Add a mined block's time and return the difficulty for the next block"""
+        self.window.append((block_time, self.difficulty))
+        if len(self.window) >= PoCDifficulty.RETARGET_MIN_BLOCKS:
+            self.difficulty = PoCDifficulty.calculate_new_difficulty(
+                self.difficulty,
+                [t for t, _ in self.window],
+                network_capacity_gb,
+                [d for _, d in self.window]
+            )
+        return self.difficulty
+
+
+def _search_nonces(midstate, target: bytes, start: int, end: int) -> Optional[int]:
+    """Scan nonces [start, end) from a precomputed SHA-256 midstate"""
+    for nonce in range(start, end):
+        h = midstate.copy()
+        h.update(b"%d" % nonce)
+        if h.digest() < target:
+            return nonce
+    return None
+
+
+def _nonce_worker(worker_index: int, jobs, results, active_job):
+    """
+    Mining worker process: takes (job_id, prefix, target, deadline, workers,
+    batch_size) jobs and scans every `workers`-th batch of the nonce space.
+    Stops a job as soon as active_job no longer matches (solution found or
+    timeout) - checked once per batch, not per hash.
+    """
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        job_id, prefix, target, deadline, workers, batch_size = job
+        midstate = hashlib.sha256(prefix)
+        batch = worker_index
+        hashes = 0
+        found = None
+        while active_job.value == job_id and time.time() < deadline:
+            start = batch * batch_size
+            found = _search_nonces(midstate, target, start, start + batch_size)
+            if found is not None:
+                hashes += found - start + 1
+                break
+            hashes += batch_size
+            batch += workers
+        results.put((job_id, found, hashes))
+
+
+class NonceSearchEngine:
+    """
+    Multi-core nonce search with a persistent worker pool.
+    The nonce space is split into batches dealt round-robin to workers; each
+    worker hashes from a shared-prefix midstate and the first solution
+    cancels the rest.
+    """
+    
+    DEFAULT_BATCH_SIZE = 20000
+    
+    def __init__(self, workers: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.batch_size = batch_size
+        self._ctx = multiprocessing.get_context()
+        self._processes: List = []
+        self._jobs = None
+        self._results = None
+        self._active_job = None
+        self._job_counter = 0
+        self.last_hashes = 0
+        self.last_hash_rate = 0.0
+    
+    def start(self):
+        """Spawn worker processes (idempotent)"""
+        if self._processes:
+            return
+        self._jobs = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._active_job = self._ctx.Value('q', 0, lock=False)
+        for worker_index in range(self.workers):
+            process = self._ctx.Process(
+                target=_nonce_worker,
+                args=(worker_index, self._jobs, self._results, self._active_job),
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+    
+    def close(self):
+        """Stop and join all workers"""
+        if not self._processes:
+            return
+        self._active_job.value = 0
+        for _ in self._processes:
+            self._jobs.put(None)
+        for process in self._processes:
+            process.join(timeout=5.0)
+        self._processes = []
+    
+    def search(self, prefix: bytes, target: bytes, timeout: float) -> Optional[int]:
+        """Find a nonce with sha256(prefix + str(nonce)) < target, or None on timeout"""
+        self.start()
+        self._job_counter += 1
+        job_id = self._job_counter
+        started = time.time()
+        deadline = started + timeout
+        self._active_job.value = job_id
+        for _ in range(self.workers):
+            self._jobs.put((job_id, prefix, target, deadline, self.workers, self.batch_size))
+        
+        found = None
+        pending = self.workers
+        hashes = 0
+        while pending:
+            try:
+                result_job, nonce, worker_hashes = self._results.get(timeout=timeout + 5.0)
+            except queue.Empty:
+                break
+            if result_job != job_id:
+                continue  # Late report from a cancelled job
+            pending -= 1
+            hashes += worker_hashes
+            if nonce is not None and found is None:
+                found = nonce
+                self._active_job.value = 0  # Cancel remaining workers
+        
+        elapsed = time.time() - started
+        self.last_hashes = hashes
+        self.last_hash_rate = hashes / elapsed if elapsed > 0 else 0.0
+        return found
 
 
 class PoCMiner:
     """Proof of Capacity Miner"""
     
-    def __init__(self, miner_id: str, storage_capacity_gb: float):
+    BATCH_SIZE = 4096  # Nonces hashed between deadline checks
+    
+    def __init__(
+        self,
+        miner_id: str,
+        storage_capacity_gb: float,
+        workers: int = 1,
+        plot_dir: Optional[Union[str, Sequence[str]]] = None
+    ):
         self.miner_id = miner_id
         self.storage_capacity_gb = max(32.0, storage_capacity_gb)  # Minimum 32GB
         self.total_blocks_mined = 0
         self.last_mine_time = time.time()
+        self.last_hash_rate = 0.0
+        # workers > 1 searches the nonce space in a process pool
+        self.engine = NonceSearchEngine(workers) if workers > 1 else None
+        
+        # Real capacity: plot files for this miner's account, one dir per drive
+        self.account_id = plot.account_id_for(miner_id)
+        self.scanner = plot.PlotScanner(
+            plot_dir, self.account_id, hash_workers=workers if workers > 1 else 0
+        ) if plot_dir else None
+        self.plots = self.scanner.plots if self.scanner else []
+        self.last_scan: Optional[plot.ScanResult] = None
+        if self.plots:
+            self.storage_capacity_gb = self.scanner.capacity_gb
 
     def mine_block(
         self,
@@ -92,23 +296,62 @@ class PoCMiner:
         Returns: (nonce, time_taken) or (None, 0) if timeout
         """
         start_time = time.time()
-        nonce = 0
-        
-        while time.time() - start_time < timeout:
-            if PoCDifficulty.verify_pow_solution(
-                previous_hash,
-                self.storage_capacity_gb,
-                nonce,
-                difficulty
-            ):
-                time_taken = time.time() - start_time
-                self.total_blocks_mined += 1
-                self.last_mine_time = time.time()
-                return nonce, time_taken
-            
-            nonce += 1
-        
-        return None, time.time() - start_time
+        prefix = PoCDifficulty.solution_prefix(previous_hash, self.storage_capacity_gb)
+        target = PoCDifficulty.target_for(difficulty)
+        
+        if self.engine is not None:
+            nonce = self.engine.search(prefix, target, timeout)
+            self.last_hash_rate = self.engine.last_hash_rate
+        else:
+            nonce = None
+            midstate = hashlib.sha256(prefix)
+            start = 0
+            # Deadline checked once per batch rather than per hash
+            while time.time() - start_time < timeout:
+                nonce = _search_nonces(midstate, target, start, start + self.BATCH_SIZE)
+                if nonce is not None:
+                    break
+                start += self.BATCH_SIZE
+            hashed = (nonce + 1) if nonce is not None else start
+            elapsed = time.time() - start_time
+            self.last_hash_rate = hashed / elapsed if elapsed > 0 else 0.0
+        
+        time_taken = time.time() - start_time
+        if nonce is None:
+            return None, time_taken
+        
+        self.total_blocks_mined += 1
+        self.last_mine_time = time.time()
+        return nonce, time_taken
+
+    def mine_deadline(
+        self,
+        generation_signature: bytes,
+        height: int,
+        base_target: int
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Deadline-based PoC mining over plot files.
+        Reads only the scoop selected for this block from each plot, all
+        drives in parallel; per-drive timings are kept in last_scan.
+        
+        Returns: (nonce, deadline_seconds) or (None, None) without plots
+        """
+        if not self.plots:
+            return None, None
+        self.last_scan = self.scanner.scan(generation_signature, height, base_target)
+        
+        if self.last_scan.nonce is not None:
+            self.total_blocks_mined += 1
+            self.last_mine_time = time.time()
+        return self.last_scan.nonce, self.last_scan.deadline
+
+    def close(self):
+        """Release mining worker processes"""
+        if self.engine is not None:
+            self.engine.close()
+        if self.scanner is not None:
+            self.scanner.close()
 
     def get_mining_probability(self, total_network_capacity_gb: float) -> float:
         """
@@ -176,11 +419,19 @@ class PoSValidator:
 class PoSConsensus:
     """Proof of Stake consensus layer - Council governance"""
     
-    def __init__(self, treasurer: PoSValidator):
+    def __init__(
+        self,
+        treasurer: PoSValidator,
+        validator_set: Optional['StakeWeightedValidatorSet'] = None
+    ):
         self.treasurer = treasurer
         self.council: Dict[str, PoSValidator] = {}  # 5 council members
         self.min_council_approval = 3  # Majority of 5
         self.pending_proposals: Dict[str, dict] = {}
+        # Optional: approve by stake-weighted committee instead of council count
+        self.validator_set = validator_set
+        # Called as listener(block_hash, approved) when approval is reached or lost
+        self.approval_listeners: List[Callable[[str, bool], None]] = []
 
     def add_council_member(self, member_id: str, validator: PoSValidator) -> bool:
         """Add council member (max 5)"""
@@ -213,15 +464,27 @@ class PoSConsensus:
     ) -> bool:
         """
         Treasurer proposes block parameters/rewards.
-        Council has opportunity to vote.
+        Council has opportunity to vote. With a validator set, fails while
+        the block's epoch has no committee.
         """
         if proposer_id == self.treasurer.validator_id:
-            self.pending_proposals[block_hash] = {
+            committee = None
+            if self.validator_set is not None:
+                committee = self.validator_set.get_committee(block_data.get('index', 0))
+                if committee is None:
+                    return False
+            tally = VoteTally()
+            proposal = {
                 'data': block_data,
                 'proposer': proposer_id,
-                'votes': {},
+                'votes': tally.votes,
+                'tally': tally,
                 'timestamp': time.time()
             }
+            if committee is not None:
+                proposal['committee'] = committee
+                proposal['approval_stake'] = self.validator_set.approval_stake(committee)
+            self.pending_proposals[block_hash] = proposal
             return True
         
         return False
@@ -236,10 +499,24 @@ class PoSConsensus:
         if block_hash not in self.pending_proposals:
             return False
         
-        if voter_id not in self.council and voter_id != self.treasurer.validator_id:
+        proposal = self.pending_proposals[block_hash]
+        committee = proposal.get('committee')
+        if committee is not None:
+            if voter_id not in committee:
+                return False
+            stake = committee[voter_id]
+        elif voter_id in self.council or voter_id == self.treasurer.validator_id:
+            stake = self.council.get(voter_id, self.treasurer).total_stake()
+        else:
             return False
         
-        self.pending_proposals[block_hash]['votes'][voter_id] = vote
+        was_approved = self._approved(proposal)
+        proposal['tally'].record(voter_id, vote, stake)
+        
+        approved = self._approved(proposal)
+        if approved != was_approved:
+            for listener in self.approval_listeners:
+                listener(block_hash, approved)
         return True
 
     def count_votes(self, block_hash: str) -> Tuple[int, int, int]:
@@ -251,32 +528,303 @@ class PoSConsensus:
             return 0, 0, 0
         
         proposal = self.pending_proposals[block_hash]
-        votes = proposal['votes']
-        
-        yes_votes = sum(1 for v in votes.values() if v is True)
-        no_votes = sum(1 for v in votes.values() if v is False)
-        
+        yes_votes, no_votes = proposal['tally'].counts()
+        if 'committee' in proposal:
+            return yes_votes, no_votes, len(proposal['committee'])
         return yes_votes, no_votes, len(self.council) + 1
 
+    def count_stake(self, block_hash: str) -> Tuple[float, float]:
+        """Stake-weighted (yes_stake, no_stake) on proposal"""
+        if block_hash not in self.pending_proposals:
+            return 0.0, 0.0
+        return self.pending_proposals[block_hash]['tally'].weighted()
+
     def is_proposal_approved(self, block_hash: str) -> bool:
         """Check if proposal has council approval"""
-        yes_votes, no_votes, total = self.count_votes(block_hash)
+        proposal = self.pending_proposals.get(block_hash)
+        return proposal is not None and self._approved(proposal)
+
+    def _approved(self, proposal: dict) -> bool:
+        tally = proposal['tally']
+        if 'committee' in proposal:
+            # Stake-weighted: 2/3 of the epoch committee's stake
+            return tally.yes_weight > 0 and tally.yes_weight >= proposal['approval_stake']
         
         # Treasurer's proposal needs council approval
-        if yes_votes >= self.min_council_approval:
-            return True
+        return tally.yes >= self.min_council_approval
+
+
+class WeightedSampler:
+    """
+    Fenwick (binary indexed) tree over keyed weights.
+    set_weight and sample are O(log n); slots are assigned in insertion
+    order, and slots of removed keys are reused smallest first, so nodes
+    that apply the same updates in the same order draw identically.
+    """
+    
+    def __init__(self):
+        self._slots: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = []
+        self._weights: List = []
+        self._tree: List = [0]  # 1-based
+        self._free: List[int] = []  # Heap of slots freed by remove()
+        self.total = 0
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._slots
+    
+    def get_weight(self, key: str):
+        slot = self._slots.get(key)
+        return self._weights[slot] if slot is not None else 0
+    
+    def _add(self, slot: int, delta):
+        i = slot + 1
+        tree = self._tree
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+    
+    def _append(self, key: str, weight):
+        # New node i covers (i - lowbit(i), i]: sum of the covered older nodes
+        i = len(self._tree)
+        value = weight
+        child = i - 1
+        stop = i - (i & -i)
+        while child > stop:
+            value += self._tree[child]
+            child -= child & -child
+        self._slots[key] = len(self._keys)
+        self._keys.append(key)
+        self._weights.append(weight)
+        self._tree.append(value)
+    
+    def set_weight(self, key: str, weight):
+        """Insert key or change its weight (0 excludes it from draws)"""
+        slot = self._slots.get(key)
+        if slot is None:
+            if not self._free:
+                self._append(key, weight)
+                self.total += weight
+                return
+            slot = heapq.heappop(self._free)
+            self._slots[key] = slot
+            self._keys[slot] = key
+        delta = weight - self._weights[slot]
+        if delta:
+            self._weights[slot] = weight
+            self._add(slot, delta)
+            self.total += delta
+    
+    def remove(self, key: str) -> bool:
+        """Drop key; its slot is reused by the next inserted key"""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+        weight = self._weights[slot]
+        if weight:
+            self._weights[slot] = 0
+            self._add(slot, -weight)
+            self.total -= weight
+        self._keys[slot] = None
+        heapq.heappush(self._free, slot)
+        return True
+    
+    def copy(self) -> 'WeightedSampler':
+        """Independent snapshot, O(n)"""
+        clone = WeightedSampler()
+        clone._slots = dict(self._slots)
+        clone._keys = list(self._keys)
+        clone._weights = list(self._weights)
+        clone._tree = list(self._tree)
+        clone._free = list(self._free)
+        clone.total = self.total
+        return clone
+    
+    def find(self, value) -> Optional[str]:
+        """Key whose cumulative weight interval contains value (0 <= value < total)"""
+        if not 0 <= value < self.total:
+            return None
+        tree = self._tree
+        pos = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(tree) and tree[nxt] <= value:
+                pos = nxt
+                value -= tree[nxt]
+            step >>= 1
+        return self._keys[pos] if pos < len(self._keys) else None
+    
+    def sample(self, rng: random.Random) -> Optional[str]:
+        """Weighted draw using the caller's RNG"""
+        if self.total <= 0:
+            return None
+        if isinstance(self.total, int):
+            return self.find(rng.randrange(self.total))
+        return self.find(rng.random() * self.total)
+
+
+class StakeWeightedValidatorSet:
+    """
+    Large stake-weighted validator set (tens of thousands of stakers).
+    
+    Stakes are held in a WeightedSampler in integer micro-FCU units, so
+    the total is exact and a stake update is O(log n). Each epoch a
+    committee of up to COMMITTEE_SIZE validators is drawn proportional to
+    stake (without replacement) and cached; blocks are approved by 2/3 of
+    committee stake, so approval cost does not grow with the set.
+    
+    Committees are drawn from stakes frozen at the epoch boundary: call
+    record_block(height) after applying each block (or freeze_stakes
+    directly) so every node samples the same snapshot whatever stake
+    updates it has applied since. An epoch that was never frozen has no
+    committee.
+    """
+    
+    STAKE_UNITS = 1_000_000   # Fixed-point units per FCU
+    EPOCH_BLOCKS = 100
+    COMMITTEE_SIZE = 64
+    APPROVAL_NUMERATOR = 2    # 2/3 of committee stake
+    APPROVAL_DENOMINATOR = 3
+    CACHED_EPOCHS = 4
+    
+    def __init__(
+        self,
+        seed: str = "",
+        committee_size: int = COMMITTEE_SIZE,
+        epoch_blocks: int = EPOCH_BLOCKS
+    ):
+        self.seed = seed
+        self.committee_size = committee_size
+        self.epoch_blocks = epoch_blocks
+        self.validators: Dict[str, PoSValidator] = {}
+        self.sampler = WeightedSampler()
+        self._committees: Dict[int, Dict[str, float]] = {}  # epoch -> member -> stake
+        self._frozen: Dict[int, WeightedSampler] = {}        # epoch -> stakes at its boundary
+    
+    def __len__(self) -> int:
+        return len(self.validators)
+    
+    def __contains__(self, validator_id: str) -> bool:
+        return validator_id in self.validators
+    
+    def _units(self, validator: PoSValidator) -> int:
+        if not validator.has_sufficient_stake():
+            return 0
+        return int(round(validator.total_stake() * self.STAKE_UNITS))
+    
+    @property
+    def total_stake(self) -> float:
+        """Eligible stake across the set, O(1)"""
+        return self.sampler.total / self.STAKE_UNITS
+    
+    def add_validator(self, validator: PoSValidator):
+        self.validators[validator.validator_id] = validator
+        self.sampler.set_weight(validator.validator_id, self._units(validator))
+    
+    def remove_validator(self, validator_id: str) -> bool:
+        if self.validators.pop(validator_id, None) is None:
+            return False
+        self.sampler.remove(validator_id)
+        return True
+    
+    def update_stake(self, validator_id: str, amount: float) -> bool:
+        """Set a validator's stake, O(log n)"""
+        validator = self.validators.get(validator_id)
+        if validator is None:
+            return False
+        validator.total_staked = max(0.0, amount)
+        self.sampler.set_weight(validator_id, self._units(validator))
+        return True
+    
+    def set_stakes(self, stakes: Dict[str, float]):
+        """Make the set match validator -> stake (e.g. Blockchain.get_validator_stakes())"""
+        for validator_id in [v for v in self.validators if v not in stakes]:
+            self.remove_validator(validator_id)
+        for validator_id, amount in sorted(stakes.items()):
+            if validator_id not in self.validators:
+                self.add_validator(PoSValidator(validator_id))
+            self.update_stake(validator_id, amount)
+    
+    def slash(self, validator_id: str, amount: float) -> bool:
+        validator = self.validators.get(validator_id)
+        if validator is None:
+            return False
+        validator.apply_slashing(amount)
+        self.sampler.set_weight(validator_id, self._units(validator))
+        return True
+    
+    def epoch_of(self, height: int) -> int:
+        return height // self.epoch_blocks
+    
+    def freeze_stakes(self, epoch: int):
+        """Snapshot current stakes as the ones epoch's committee is drawn from"""
+        self._frozen[epoch] = self.sampler.copy()
+        self._committees.pop(epoch, None)
+        for old_epoch in sorted(self._frozen)[:-self.CACHED_EPOCHS]:
+            del self._frozen[old_epoch]
+    
+    def record_block(self, height: int):
+        """Call once the block at height is applied; an epoch's last block freezes the next"""
+        if (height + 1) % self.epoch_blocks == 0:
+            self.freeze_stakes(self.epoch_of(height + 1))
+    
+    def get_committee(self, height: int) -> Optional[Dict[str, float]]:
+        """
+        Committee (member -> stake) for the epoch containing height.
+        Sampled once per epoch with an RNG seeded from (seed, epoch) over
+        the stakes frozen for that epoch; None if they never were, since
+        current stakes may differ between nodes.
+        """
+        epoch = self.epoch_of(height)
+        committee = self._committees.get(epoch)
+        if committee is not None:
+            return committee
         
-        return False
+        stakes = self._frozen.get(epoch)
+        if stakes is None:
+            return None
+        epoch_seed = hashlib.sha256(f"{self.seed}:{epoch}".encode()).digest()
+        rng = random.Random(int.from_bytes(epoch_seed[:8], 'big'))
+        drawn: List[Tuple[str, int]] = []
+        while len(drawn) < self.committee_size and stakes.total > 0:
+            member = stakes.sample(rng)
+            weight = stakes.get_weight(member)
+            drawn.append((member, weight))
+            stakes.set_weight(member, 0)  # Without replacement
+        for member, weight in drawn:
+            stakes.set_weight(member, weight)
+        
+        committee = {member: weight / self.STAKE_UNITS for member, weight in drawn}
+        self._committees[epoch] = committee
+        for old_epoch in sorted(self._committees)[:-self.CACHED_EPOCHS]:
+            del self._committees[old_epoch]
+        return committee
+    
+    def approval_stake(self, committee: Dict[str, float]) -> float:
+        """Yes stake needed to approve with this committee"""
+        return sum(committee.values()) * self.APPROVAL_NUMERATOR / self.APPROVAL_DENOMINATOR
 
 
 class PoWLottery:
     """Proof of Work Lottery for Storage Donators"""
     
+    TICKET_GB = 32.0  # Storage per ticket / unit of draw weight
+    
     def __init__(self, block_time: int = 22):
         self.block_time = block_time
         self.lottery_difficulty = 4
         self.participants: Dict[str, dict] = {}  # address -> lottery data
         self.winners: List[str] = []
+        # Draw weights kept incrementally instead of a per-block ticket pool
+        self.sampler = WeightedSampler()
+    
+    @classmethod
+    def _weight(cls, storage_gb: float) -> int:
+        return max(1, int(storage_gb / cls.TICKET_GB))
 
     def register_participant(
         self,
@@ -290,6 +838,7 @@ class PoWLottery:
             'wins': 0,
             'last_entry_block': 0
         }
+        self.sampler.set_weight(participant_id, self._weight(storage_gb))
 
     def add_lottery_ticket(
         self,
@@ -306,10 +855,11 @@ class PoWLottery:
         
         # Tickets proportional to storage (32GB = 1 ticket minimum)
         capacity = self.participants[participant_id]['storage_gb']
-        tickets = max(1, int(capacity / 32.0))
+        tickets = self._weight(capacity)
         
         self.participants[participant_id]['entries'] += tickets
         self.participants[participant_id]['last_entry_block'] = block_height
+        self.sampler.set_weight(participant_id, tickets)  # O(log n), no-op if unchanged
         
         return tickets
 
@@ -317,26 +867,20 @@ class PoWLottery:
         """
         Select lottery winner for block.
         Uses block hash as entropy source.
+        O(log participants): weights live in a Fenwick tree, and the draw
+        uses its own RNG so the global `random` state is left untouched.
         """
         if not self.participants:
             return None
         
         # Generate seed from block hash - ensure it's a valid integer
         hash_seed = hashlib.sha256(str(block_hash).encode()).hexdigest()
-        seed = int(hash_seed[:16], 16)
-        random.seed(seed)
-        
-        # Create weighted pool (proportional to storage)
-        pool = []
-        for participant_id, data in self.participants.items():
-            # Weight by storage capacity
-            weight = max(1, int(data['storage_gb'] / 32.0))
-            pool.extend([participant_id] * weight)
+        rng = random.Random(int(hash_seed[:16], 16))
         
-        if not pool:
+        winner = self.sampler.sample(rng)
+        if winner is None:
             return None
         
-        winner = random.choice(pool)
         if winner not in self.winners:
             self.winners.append(winner)
         
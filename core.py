@@ -3,12 +3,29 @@ Farmers Credit Union (FCU) Blockchain - Core Data Structures
 Hybrid consensus: Proof of Capacity (PoC) + Proof of Stake (PoS) + Proof of Work (PoW) Lottery
 """
 
+import os
 import time
 import hashlib
 import json
+import struct
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field, asdict
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 from enum import Enum
+from collections import OrderedDict, deque
+from itertools import repeat
+
+import plot
+from storage import BlockStore
+from state_trie import StateTrie
+from chain_index import ChainIndex
+from snapshot import SnapshotError, SnapshotStore, StateSnapshot
+from codec import CodecError, Decoder, Encoder, read_str, read_value, read_varint
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batches fall back to sequential apply
+    np = None
 
 
 class TransactionType(Enum):
@@ -21,6 +38,22 @@ class TransactionType(Enum):
     GOVERNANCE_VOTE = "governance_vote" # Council voting
 
 
+TX_ENCODING_VERSION = 2               # Single layout for tx hashing, storage and network
+WIRE_FORMAT_VERSION = 1               # Compact codec for storage and network payloads
+BLOCK_DEADLINE_VERSION = 2            # Block encoding with a plot base target
+_TX_HEAD = struct.Struct(">BBBddq")   # version, flags, type code, timestamp, amount, nonce
+
+
+def _is_packable_hex(value: str) -> bool:
+    """True if value is lowercase hex that round-trips through bytes"""
+    if len(value) % 2:
+        return False
+    try:
+        return bytes.fromhex(value).hex() == value
+    except ValueError:
+        return False
+
+
 @dataclass
 class Transaction:
     """Transaction in FCU blockchain"""
@@ -44,10 +77,134 @@ class Transaction:
         """Serialize transaction to JSON"""
         return json.dumps(self.to_dict(), default=str)
 
+    @staticmethod
+    def from_dict(tx_data: Dict) -> 'Transaction':
+        """Rebuild transaction from to_dict() output"""
+        return Transaction(
+            tx_id=tx_data.get('tx_id'),
+            timestamp=tx_data.get('timestamp'),
+            sender=tx_data.get('sender'),
+            receiver=tx_data.get('receiver'),
+            amount=tx_data.get('amount'),
+            tx_type=TransactionType(tx_data.get('tx_type', 'transfer')),
+            nonce=tx_data.get('nonce', 0),
+            signature=tx_data.get('signature'),
+            data=tx_data.get('data', {})
+        )
+
+    def to_bytes(self) -> bytes:
+        """Binary wire/storage encoding; identical to the hashed encode()"""
+        return self.encode()
+
+    @staticmethod
+    def from_bytes(data) -> 'Transaction':
+        """Decode to_bytes() output (bytes or memoryview)"""
+        view = data if isinstance(data, memoryview) else memoryview(data)
+        tx, pos = Transaction._decode_at(view, 0)
+        if pos != len(view):
+            raise CodecError("trailing bytes after transaction")
+        return tx
+
+    @staticmethod
+    def _decode_at(view: Union[bytes, memoryview], pos: int) -> Tuple['Transaction', int]:
+        """Decode one transaction at pos; returns (transaction, end position)"""
+        if pos + _TX_HEAD.size > len(view):
+            raise CodecError("payload truncated")
+        version, flags, type_code, timestamp, amount, nonce = _TX_HEAD.unpack_from(view, pos)
+        if version != TX_ENCODING_VERSION:
+            raise CodecError(f"unsupported transaction version {version}")
+        pos += _TX_HEAD.size
+        
+        tx_id, pos = read_str(view, pos)
+        sender, pos = read_str(view, pos)
+        receiver, pos = read_str(view, pos)
+        signature = None
+        if flags & 4:
+            length, pos = read_varint(view, pos)
+            if pos + length > len(view):
+                raise CodecError("payload truncated")
+            signature = view[pos:pos + length].hex()
+            pos += length
+        elif flags & 1:
+            signature, pos = read_str(view, pos)
+        data = {}
+        if flags & 2:
+            data, pos = read_value(view, pos)
+            if not isinstance(data, dict):
+                raise CodecError("transaction data must be a mapping")
+        
+        try:
+            tx_type = TX_TYPES_BY_CODE[type_code]
+        except IndexError:
+            raise CodecError(f"unknown transaction type {type_code}") from None
+        tx = object.__new__(Transaction)
+        # Fill __dict__ directly: skips dataclass __init__ and cache invalidation
+        tx.__dict__.update(
+            tx_id=tx_id,
+            timestamp=timestamp,
+            sender=sender,
+            receiver=receiver,
+            amount=amount,
+            tx_type=tx_type,
+            nonce=nonce,
+            signature=signature,
+            data=data
+        )
+        return tx, pos
+
+    def __setattr__(self, name, value):
+        # Any field change invalidates the memoized encoding/digest
+        if '_encoded' in self.__dict__:
+            object.__setattr__(self, '_encoded', None)
+            object.__setattr__(self, '_digest', None)
+        object.__setattr__(self, name, value)
+
+    def encode(self) -> bytes:
+        """
+        Canonical binary encoding (memoized); used as both the hash preimage
+        and the wire/storage form.
+        Layout: fixed head (version, flags, type code, timestamp, amount,
+        nonce), tx_id, sender, receiver, [signature], [data as a codec value].
+        Flags: 1 = signature, 2 = data, 4 = signature packed from hex.
+        """
+        encoded = self.__dict__.get('_encoded')
+        if encoded is None:
+            signature_hex = self.signature is not None and _is_packable_hex(self.signature)
+            flags = (self.signature is not None) | (bool(self.data) << 1) | (signature_hex << 2)
+            enc = Encoder()
+            enc.raw(_TX_HEAD.pack(
+                TX_ENCODING_VERSION, flags, TX_TYPE_CODES[self.tx_type],
+                float(self.timestamp), float(self.amount), int(self.nonce)
+            ))
+            enc.str(str(self.tx_id))
+            enc.str(str(self.sender))
+            enc.str(str(self.receiver))
+            if signature_hex:
+                enc.blob(bytes.fromhex(self.signature))
+            elif flags & 1:
+                enc.str(self.signature)
+            if flags & 2:
+                enc.value(self.data)
+            encoded = enc.getvalue()
+            object.__setattr__(self, '_encoded', encoded)
+        return encoded
+
+    def digest(self) -> bytes:
+        """Raw 32-byte SHA-256 of the canonical encoding (memoized)"""
+        digest = self.__dict__.get('_digest')
+        if digest is None:
+            digest = hashlib.sha256(self.encode()).digest()
+            object.__setattr__(self, '_digest', digest)
+        return digest
+
+    def invalidate_hash(self):
+        """Drop cached encoding; needed only after mutating `data` in place"""
+        object.__setattr__(self, '_encoded', None)
+        object.__setattr__(self, '_digest', None)
+
     def hash(self) -> str:
         """Calculate transaction hash"""
-        value = json.dumps(self.to_dict(), sort_keys=True, default=str)
-        return hashlib.sha256(value.encode()).hexdigest()
+        return self.digest().hex()
 
     @staticmethod
     def create_genesis_tx() -> 'Transaction':
@@ -104,6 +261,96 @@ class PoWLotteryEntry:
         return asdict(self)
 
 
+def _hash_pair(left: bytes, right: bytes) -> bytes:
+    """Hash two raw child digests into their parent"""
+    return hashlib.sha256(left + right).digest()
+
+
+class MerkleTree:
+    """
+    Incremental Merkle tree over raw 32-byte digests.
+    Odd nodes are paired with themselves (Bitcoin-style), so the root is
+    identical whether the tree is built in bulk or leaf by leaf.
+    """
+
+    EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+    def __init__(self, leaves: Optional[List[bytes]] = None):
+        self.levels: List[List[bytes]] = [[]]
+        if leaves:
+            self._build(list(leaves))
+
+    def _build(self, leaves: List[bytes]):
+        """Bulk-build all levels in O(n)"""
+        self.levels = [leaves]
+        row = leaves
+        while len(row) > 1:
+            row = [
+                _hash_pair(row[i], row[i + 1] if i + 1 < len(row) else row[i])
+                for i in range(0, len(row), 2)
+            ]
+            self.levels.append(row)
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+    def append(self, leaf: bytes) -> int:
+        """Append a leaf, rehashing only its path to the root. Returns leaf index."""
+        levels = self.levels
+        levels[0].append(leaf)
+        leaf_index = index = len(levels[0]) - 1
+        level = 0
+        while len(levels[level]) > 1:
+            row = levels[level]
+            left_i = index & ~1
+            left = row[left_i]
+            right = row[left_i + 1] if left_i + 1 < len(row) else left
+            if level + 1 == len(levels):
+                levels.append([])
+            parent_row = levels[level + 1]
+            index >>= 1
+            if index < len(parent_row):
+                parent_row[index] = _hash_pair(left, right)
+            else:
+                parent_row.append(_hash_pair(left, right))
+            level += 1
+        return leaf_index
+
+    def root(self) -> bytes:
+        """Raw 32-byte root"""
+        if not self.levels[0]:
+            return self.EMPTY_ROOT
+        return self.levels[-1][0]
+
+    def root_hex(self) -> str:
+        return self.root().hex()
+
+    def get_proof(self, index: int) -> List[Tuple[bytes, bool]]:
+        """
+        Inclusion proof for leaf at index.
+        Returns [(sibling_digest, sibling_is_right), ...] from leaf to root.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError(f"leaf index {index} out of range")
+        proof = []
+        for row in self.levels[:-1]:
+            if index & 1:
+                proof.append((row[index - 1], False))
+            else:
+                sibling = row[index + 1] if index + 1 < len(row) else row[index]
+                proof.append((sibling, True))
+            index >>= 1
+        return proof
+
+    @staticmethod
+    def verify_proof(leaf: bytes, proof: List[Tuple[bytes, bool]], root: bytes) -> bool:
+        """Verify an inclusion proof against a raw root"""
+        node = leaf
+        for sibling, sibling_is_right in proof:
+            node = _hash_pair(node, sibling) if sibling_is_right else _hash_pair(sibling, node)
+        return node == root
+
+
 class Block:
     """Block in FCU multi-node blockchain"""
     
@@ -119,7 +366,8 @@ class Block:
         pow_lottery_winner: Optional[str] = None,
         nonce: int = 0,
         merkle_root: Optional[str] = None,
-        state_root: Optional[str] = None
+        state_root: Optional[str] = None,
+        base_target: Optional[int] = None   # Set on plot-forged blocks
     ):
         self.index = index
         self.previous_hash = previous_hash
@@ -132,23 +380,18 @@ class Block:
         self.nonce = nonce
         self.merkle_root = merkle_root or Block.calculate_merkle_root(self.transactions)
         self.state_root = state_root
+        self.base_target = base_target
         self.hash = self.calculate_hash()
 
     @staticmethod
     def calculate_merkle_root(transactions: List[Transaction]) -> str:
-        """Calculate Merkle root of transactions"""
-        if not transactions:
-            return hashlib.sha256(b"").hexdigest()
-        
-        tx_hashes = [tx.hash() for tx in transactions]
-        while len(tx_hashes) > 1:
-            if len(tx_hashes) % 2 != 0:
-                tx_hashes.append(tx_hashes[-1])
-            tx_hashes = [
-                hashlib.sha256((tx_hashes[i] + tx_hashes[i+1]).encode()).hexdigest()
-                for i in range(0, len(tx_hashes), 2)
-            ]
-        return tx_hashes[0]
+        """Calculate Merkle root of transactions (over raw digests)"""
+        return MerkleTree([tx.digest() for tx in transactions]).root_hex()
+
+    def get_merkle_proof(self, tx_index: int) -> List[Tuple[bytes, bool]]:
+        """Inclusion proof for a transaction, verifiable against merkle_root"""
+        tree = MerkleTree([tx.digest() for tx in self.transactions])
+        return tree.get_proof(tx_index)
 
     def calculate_hash(self) -> str:
         """Calculate block hash with all components"""
@@ -163,6 +406,8 @@ class Block:
             'nonce': self.nonce,
             'state_root': self.state_root
         }
+        if self.base_target is not None:
+            block_data['base_target'] = self.base_target
         block_json = json.dumps(block_data, sort_keys=True, default=str)
         return hashlib.sha256(block_json.encode()).hexdigest()
 
@@ -180,49 +425,703 @@ class Block:
             'pow_lottery_winner': self.pow_lottery_winner,
             'nonce': self.nonce,
             'merkle_root': self.merkle_root,
-            'state_root': self.state_root
+            'state_root': self.state_root,
+            'base_target': self.base_target
         }
 
     def to_json(self) -> str:
         """Serialize block to JSON"""
         return json.dumps(self.to_dict(), default=str)
 
+    def to_bytes(self) -> bytes:
+        """
+        Compact binary wire/storage encoding:
+        version, varint index, previous_hash, timestamp, miner, validators,
+        difficulty, lottery winner, nonce, merkle_root, state_root, hash,
+        base target (plot-forged blocks, version 2 only), then length-prefixed
+        transactions. Hex digests are stored as 32 raw bytes.
+        """
+        enc = Encoder()
+        enc.u8(WIRE_FORMAT_VERSION if self.base_target is None else BLOCK_DEADLINE_VERSION)
+        enc.varint(self.index)
+        enc.hash_field(self.previous_hash)
+        enc.f64(self.timestamp)
+        enc.str(str(self.miner))
+        enc.varint(len(self.validators))
+        for validator in self.validators:
+            enc.str(str(validator))
+        enc.svarint(self.poc_difficulty)
+        enc.opt_str(self.pow_lottery_winner)
+        enc.svarint(self.nonce)
+        enc.hash_field(self.merkle_root)
+        enc.hash_field(self.state_root)
+        enc.hash_field(self.hash)
+        if self.base_target is not None:
+            enc.varint(self.base_target)
+        enc.varint(len(self.transactions))
+        for tx in self.transactions:
+            enc.blob(tx.encode())
+        return enc.getvalue()
+
+    @staticmethod
+    def from_bytes(data) -> 'Block':
+        """
+        Decode to_bytes() output from bytes or a memoryview without copying
+        the buffer. The stored hash is kept as-is (not recomputed), so
+        validate_chain can detect tampering.
+        """
+        dec = Decoder(data)
+        version = dec.u8()
+        if version not in (WIRE_FORMAT_VERSION, BLOCK_DEADLINE_VERSION):
+            raise CodecError(f"unsupported block version {version}")
+        
+        block = object.__new__(Block)
+        block.index = dec.varint()
+        block.previous_hash = dec.hash_field()
+        block.timestamp = dec.f64()
+        block.miner = dec.str()
+        block.validators = [dec.str() for _ in range(dec.varint())]
+        block.poc_difficulty = dec.svarint()
+        block.pow_lottery_winner = dec.opt_str()
+        block.nonce = dec.svarint()
+        block.merkle_root = dec.hash_field()
+        block.state_root = dec.hash_field()
+        block.hash = dec.hash_field()
+        block.base_target = dec.varint() if version == BLOCK_DEADLINE_VERSION else None
+        
+        # Slicing bytes is cheaper than slicing a memoryview; use it when given
+        view, pos = data if isinstance(data, bytes) else dec.view, dec.pos
+        count, pos = read_varint(view, pos)
+        transactions = []
+        for _ in range(count):
+            length, pos = read_varint(view, pos)
+            tx, end = Transaction._decode_at(view, pos)
+            if end != pos + length:
+                raise CodecError("transaction length mismatch")
+            transactions.append(tx)
+            pos = end
+        block.transactions = transactions
+        
+        if pos != len(view):
+            raise CodecError("trailing bytes after block")
+        return block
+
+    @staticmethod
+    def from_dict(block_data: Dict) -> 'Block':
+        """
+        Rebuild block from to_dict() output.
+        The stored hash is kept as-is so validate_chain can detect tampering.
+        """
+        block = Block(
+            index=block_data['index'],
+            previous_hash=block_data['previous_hash'],
+            timestamp=block_data['timestamp'],
+            transactions=[Transaction.from_dict(tx) for tx in block_data.get('transactions', [])],
+            miner=block_data['miner'],
+            validators=block_data.get('validators', []),
+            poc_difficulty=block_data.get('poc_difficulty', 4),
+            pow_lottery_winner=block_data.get('pow_lottery_winner'),
+            nonce=block_data.get('nonce', 0),
+            merkle_root=block_data.get('merkle_root'),
+            state_root=block_data.get('state_root'),
+            base_target=block_data.get('base_target')
+        )
+        block.hash = block_data.get('hash', block.hash)
+        return block
+
+
+class StoredChain:
+    """
+    List-like view of a BlockStore.
+    Blocks are paged in on demand through an LRU cache, so memory stays
+    bounded regardless of chain height.
+    """
+
+    def __init__(self, store: BlockStore, cache_size: int = 1024):
+        self.store = store
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, Block]" = OrderedDict()
+
+    @staticmethod
+    def encode_block(block: Block) -> bytes:
+        return block.to_bytes()
+
+    @staticmethod
+    def decode_block(payload: bytes) -> Block:
+        # Stores written before the binary codec hold JSON payloads
+        if payload[:1] == b"{":
+            return Block.from_dict(json.loads(payload))
+        return Block.from_bytes(payload)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("block index out of range")
+
+        block = self._cache.get(index)
+        if block is not None:
+            self._cache.move_to_end(index)
+            return block
+
+        block = self.decode_block(self.store.read(index))
+        self._remember(index, block)
+        return block
+
+    def __iter__(self) -> Iterator[Block]:
+        """Stream blocks in order without churning the LRU cache"""
+        return self.iter_range(0, len(self))
+
+    def iter_range(self, start: int, end: int) -> Iterator[Block]:
+        """Stream blocks [start, end) without churning the LRU cache"""
+        for index in range(start, end):
+            block = self._cache.get(index)
+            yield block if block is not None else self.decode_block(self.store.read(index))
+
+    def _remember(self, index: int, block: Block):
+        self._cache[index] = block
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def append(self, block: Block):
+        index = self.store.append(bytes.fromhex(block.hash), self.encode_block(block))
+        self._remember(index, block)
+
+    def truncate(self, length: int):
+        """Drop blocks at index >= length"""
+        self.store.truncate(length)
+        for index in [i for i in self._cache if i >= length]:
+            del self._cache[index]
+
+    def get_height(self, block_hash: str) -> Optional[int]:
+        """Height of block by hex hash, via the store's hash index"""
+        return self.store.get_height(bytes.fromhex(block_hash))
+
+
+TX_TYPE_CODES = {tx_type: code for code, tx_type in enumerate(TransactionType)}
+TX_TYPES_BY_CODE = list(TransactionType)
+_TRANSFER_CODE = TX_TYPE_CODES[TransactionType.TRANSFER]
+_STAKE_DEPOSIT_CODE = TX_TYPE_CODES[TransactionType.STAKE_DEPOSIT]
+
+
+class TransactionBatch:
+    """
+    Columnar view of a list of transactions (requires NumPy).
+    Addresses are interned to dense per-batch indexes so balance checks and
+    updates can run as array operations.
+    """
+
+    def __init__(self, transactions: List[Transaction]):
+        self.transactions = transactions
+        self.address_index: Dict[str, int] = {}
+        
+        # setdefault(addr, len(index)) interns in a single dict operation
+        index = self.address_index
+        senders = [index.setdefault(tx.sender, len(index)) for tx in transactions]
+        receivers = [index.setdefault(tx.receiver, len(index)) for tx in transactions]
+        self.addresses: List[str] = list(index)
+        self.sender_idx = np.array(senders, dtype=np.int64)
+        self.receiver_idx = np.array(receivers, dtype=np.int64)
+        self.amount = np.array([tx.amount for tx in transactions], dtype=np.float64)
+        self.type_code = np.array(
+            [TX_TYPE_CODES[tx.tx_type] for tx in transactions], dtype=np.int8
+        )
+
+    def __len__(self) -> int:
+        return len(self.transactions)
+
+    def split_conflicts(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Partition into (vectorizable transfers, sequential remainder) masks.
+        
+        A transfer is vectorizable when its sender sends exactly once and never
+        receives in the batch, and no address it touches is also touched by a
+        sequential transaction. Its balance check then depends only on the
+        pre-batch balance, and every credit to a receiver is applied in the
+        original order, so results are bit-identical to sequential apply.
+        """
+        n_addr = len(self.addresses)
+        is_transfer = self.type_code == _TRANSFER_CODE
+        s, r = self.sender_idx, self.receiver_idx
+        
+        sends = np.bincount(s[is_transfer], minlength=n_addr)
+        receives = np.bincount(r[is_transfer], minlength=n_addr)
+        conflict = (sends > 1) | ((sends > 0) & (receives > 0))
+        conflict[s[self.type_code == _STAKE_DEPOSIT_CODE]] = True
+        
+        while True:
+            vectorized = is_transfer & ~conflict[s] & ~conflict[r]
+            sequential = is_transfer & ~vectorized
+            touched_seq = np.zeros(n_addr, dtype=bool)
+            touched_seq[s[sequential]] = True
+            touched_seq[r[sequential]] = True
+            touched_vec = np.zeros(n_addr, dtype=bool)
+            touched_vec[s[vectorized]] = True
+            touched_vec[r[vectorized]] = True
+            shared = touched_seq & touched_vec & ~conflict
+            if not shared.any():
+                return vectorized, ~vectorized
+            conflict |= shared
+
+
+FORGING_HISTORY = plot.RETARGET_BLOCKS + 1  # Blocks (ending at the parent) a forging check reads
+
+
+def expected_base_target(recent: Sequence[Block]) -> int:
+    """Base target the block after recent[-1] must carry (see plot.next_base_target)"""
+    history = []
+    for block in reversed(recent):
+        if block.base_target is None:
+            break
+        history.append((block.timestamp, block.base_target))
+    history.reverse()
+    return plot.next_base_target(history)
+
+
+def forging_valid(block: Block, recent: Sequence[Block]) -> bool:
+    """
+    Plot-forging rules for `block` given the last FORGING_HISTORY blocks up
+    to its parent. Once a plot-forged block is on the chain every later block
+    must be plot-forged, carry the base target derived from the chain, and
+    be forged no earlier than its deadline (recomputed from the nonce) after
+    the parent.
+    """
+    previous = recent[-1]
+    if block.base_target is None:
+        return previous.base_target is None
+    if block.base_target != expected_base_target(recent):
+        return False
+    deadline = plot.deadline_for(
+        plot.account_id_for(block.miner),
+        block.nonce,
+        plot.generation_signature(previous.hash, previous.miner),
+        block.index,
+        block.base_target
+    )
+    return block.timestamp - previous.timestamp >= deadline
+
+
+def _validate_block_range(
+    source: Union[str, Iterable[Block]],
+    start: int,
+    end: int
+) -> Tuple[Optional[int], Optional[str], Optional[str]]:
+    """
+    Check hash integrity, internal linkage and plot forging of blocks
+    [start, end). `source` is a BlockStore directory (opened read-only, for
+    worker processes) or an iterable of blocks from
+    max(start - FORGING_HISTORY, 0), the blocks before the range being
+    needed for its first forging check.
+    Returns (first_bad_height or None, first previous_hash, last hash).
+    """
+    first = max(start - FORGING_HISTORY, 0)
+    store = None
+    if isinstance(source, str):
+        store = BlockStore(source, read_only=True)
+        source = (StoredChain.decode_block(store.read(h)) for h in range(first, end))
+    
+    first_previous = last_hash = None
+    recent = deque(maxlen=FORGING_HISTORY)
+    try:
+        for height, block in zip(range(first, end), source):
+            if height < start:
+                recent.append(block)
+                continue
+            if height == start:
+                first_previous = block.previous_hash
+            elif block.previous_hash != last_hash:
+                return height, first_previous, last_hash
+            
+            # Genesis is trusted as-is
+            if height > 0 and block.hash != block.calculate_hash():
+                return height, first_previous, last_hash
+            if recent and not forging_valid(block, recent):
+                return height, first_previous, last_hash
+            last_hash = block.hash
+            recent.append(block)
+    finally:
+        if store is not None:
+            store.close()
+    
+    return None, first_previous, last_hash
+
+
+MISSING = object()  # Journal marker: key did not exist before the block
+
+
+class TrackedDict(dict):
+    """
+    dict that records keys written since the last state-root update and,
+    while `journal` is set, the value each key held before its first write.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dirty: Set = set(self)
+        self.journal: Optional[Dict] = None
+
+    def touch(self, key):
+        """Mark key as written; call directly before mutating a value in place"""
+        journal = self.journal
+        if journal is not None and key not in journal:
+            prior = dict.get(self, key, MISSING)
+            journal[key] = list(prior) if isinstance(prior, list) else prior
+        self.dirty.add(key)
+
+    def __setitem__(self, key, value):
+        self.touch(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.touch(key)
+        super().__delitem__(key)
+
+    def pop(self, key, *default):
+        self.touch(key)
+        return super().pop(key, *default)
+
+    def popitem(self):
+        if self:
+            self.touch(next(reversed(self)))
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.touch(key)
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        other = dict(*args, **kwargs)
+        for key in other:
+            self.touch(key)
+        super().update(other)
+
+    def clear(self):
+        for key in self:
+            self.touch(key)
+        super().clear()
+
 
 class Blockchain:
     """FCU Multi-node Blockchain with Hybrid Consensus"""
+
+    VECTORIZE_MIN_TXS = 64          # Smaller blocks are cheaper to apply sequentially
+    VALIDATION_RANGE_SIZE = 10000   # Blocks per validation work unit
+    JOURNAL_DEPTH = 100             # Undo journals cached in memory
+    JOURNAL_DISK_DEPTH = 10000      # Journals kept on disk (if journal_dir set)
+    JOURNALED_TABLES = ('state', 'pos_stakes', 'storage_pledges')
+    SNAPSHOT_INTERVAL = 1000        # Heights between automatic state snapshots
+    VALIDATION_CHECKPOINT = "validated.chk"
+    _CHECKPOINT = struct.Struct(">Q32s")  # height, block hash
+
+    # State trie namespaces: key = sha256(namespace + address)
+    STATE_NS_BALANCE = b"balance:"
+    STATE_NS_STAKES = b"stakes:"
+    STATE_NS_PLEDGE = b"pledge:"
     
-    def __init__(self, chain_id: str = "FCU_MAINNET"):
+    def __init__(
+        self,
+        chain_id: str = "FCU_MAINNET",
+        data_dir: Optional[str] = None,
+        cache_size: int = 1024,
+        journal_depth: int = JOURNAL_DEPTH,
+        journal_dir: Optional[str] = None,
+        snapshot_interval: int = SNAPSHOT_INTERVAL,
+        genesis_validators: Optional[Dict[str, float]] = None
+    ):
         self.chain_id = chain_id
+        self.block_store: Optional[BlockStore] = None
         self.chain: List[Block] = []
-        self.state: Dict[str, float] = {}  # Account balances
-        self.storage_pledges: Dict[str, StoragePledge] = {}
-        self.pos_stakes: Dict[str, List[PoSStake]] = {}
+        if data_dir is not None:
+            # Disk-backed chain: survives restarts, blocks paged in lazily
+            self.block_store = BlockStore(data_dir)
+            self.chain = StoredChain(self.block_store, cache_size)
+        self.state: Dict[str, float] = TrackedDict()  # Account balances
+        self.storage_pledges: Dict[str, StoragePledge] = TrackedDict()
+        self.pos_stakes: Dict[str, List[PoSStake]] = TrackedDict()
+        self.state_trie = StateTrie()
+        self.index = ChainIndex(index_block_hashes=self.block_store is None)
+        self._index_stale = False   # Set when booting without a saved index; rebuilt on first use
+        self.validated_height = -1   # Highest height known valid (-1 = none)
+        self.last_validation: Dict = {}
+        self.block_listeners: List[Callable[[Block], None]] = []   # Called after each commit_block
+        
+        # Per-block undo journals: height -> {table: {key: prior value}}
+        self.undo_journals: "OrderedDict[int, Dict[str, Dict]]" = OrderedDict()
+        self.journal_depth = journal_depth
+        self.journal_dir = journal_dir
+        if journal_dir is None and data_dir is not None:
+            self.journal_dir = os.path.join(data_dir, "journals")
+        if self.journal_dir is not None:
+            os.makedirs(self.journal_dir, exist_ok=True)
+        
+        # Periodic state snapshots (disk-backed chains only)
+        self.snapshot_interval = snapshot_interval
+        self.snapshots: Optional[SnapshotStore] = None
+        self.index_dir: Optional[str] = None    # Saved ChainIndex per snapshot height
+        if data_dir is not None:
+            self.snapshots = SnapshotStore(os.path.join(data_dir, "snapshots"))
+            self.index_dir = os.path.join(data_dir, "index")
+            os.makedirs(self.index_dir, exist_ok=True)
         self.pow_lottery_entries: Dict[int, List[PoWLotteryEntry]] = {}
         self.pending_transactions: List[Transaction] = []
         
-        # Initialize with genesis block
-        self._create_genesis_block()
+        # Initialize with genesis block (or reload persisted chain)
+        if len(self.chain) == 0:
+            self._create_genesis_block(genesis_validators or {})
+        elif not self._boot_from_snapshot():
+            self._replay_state()
 
-    def _create_genesis_block(self):
-        """Create genesis block with initial Simcoin donation to FCU"""
-        genesis_tx = Transaction.create_genesis_tx()
+    def _create_genesis_block(self, genesis_validators: Dict[str, float]):
+        """
+        Create genesis block with initial Simcoin donation to FCU, plus a
+        stake credit for each genesis validator (listed as its validators)
+        """
+        now = time.time()
+        transactions = [Transaction.create_genesis_tx()] + [
+            Transaction(
+                tx_id=f"GENESIS_STAKE_{address}",
+                timestamp=now,
+                sender="SYSTEM",
+                receiver=address,
+                amount=stake,
+                data={"note": "Genesis validator stake"}
+            )
+            for address, stake in sorted(genesis_validators.items())
+        ]
+        for tx in transactions:
+            self.state[tx.receiver] = self.state.get(tx.receiver, 0.0) + tx.amount
         genesis_block = Block(
             index=0,
             previous_hash="0",
-            timestamp=time.time(),
-            transactions=[genesis_tx],
+            timestamp=now,
+            transactions=transactions,
             miner="GENESIS_SYSTEM",
-            validators=["GENESIS_SYSTEM"],
+            validators=sorted(genesis_validators) or ["GENESIS_SYSTEM"],
             poc_difficulty=1,
-            nonce=0
+            nonce=0,
+            state_root=self.get_state_root()
         )
         self.chain.append(genesis_block)
-        self.state[genesis_tx.receiver] = genesis_tx.amount
+        self.index.add_block(genesis_block)
+
+    def _replay_state(self, start: int = 0):
+        """Rebuild in-memory state (and indexes, from genesis) from a persisted chain"""
+        # Blocks recent enough to roll back get their undo journal back if it is missing
+        depth = self.JOURNAL_DISK_DEPTH if self.journal_dir is not None else self.journal_depth
+        journal_from = len(self.chain) - depth
+        for block in self.chain.iter_range(start, len(self.chain)):
+            if not self._index_stale:
+                self.index.add_block(block)
+            if block.index == 0:
+                for tx in block.transactions:
+                    self.state[tx.receiver] = self.state.get(tx.receiver, 0.0) + tx.amount
+                continue
+            record = block.index >= journal_from and not self._has_journal(block.index)
+            if record:
+                self.begin_block()
+            self.process_transactions(block.transactions)
+            if record:
+                self._store_journal(block.index, self._end_journal())
+
+    def _boot_from_snapshot(self) -> bool:
+        """Load the newest snapshot that matches the stored chain, then replay the tail"""
+        if self.snapshots is None:
+            return False
+        
+        for height in self.snapshots.heights():
+            if height >= len(self.chain):
+                continue
+            try:
+                snapshot = self.snapshots.load(height)
+            except (OSError, SnapshotError):
+                continue
+            if self.block_store.get_hash(height).hex() != snapshot.block_hash:
+                continue  # Snapshot of a block that was later reorganized away
+            
+            try:
+                self.load_snapshot(snapshot)
+            except SnapshotError:
+                continue  # State does not hash to the committed root
+            self._index_stale = not self._load_index(height, snapshot.block_hash)
+            self._replay_state(height + 1)
+            return True
+        
+        return False
+
+    def create_snapshot(self) -> StateSnapshot:
+        """Capture balances, stakes, pledges and lottery entries at the current tip"""
+        tip = self.get_latest_block()
+        return StateSnapshot(
+            height=tip.index,
+            block_hash=tip.hash,
+            state_root=self.get_state_root(),
+            balances=dict(self.state),
+            stakes={
+                address: [stake.to_dict() for stake in stakes]
+                for address, stakes in self.pos_stakes.items()
+            },
+            pledges={address: pledge.to_dict() for address, pledge in self.storage_pledges.items()},
+            lottery_entries={
+                height: [entry.to_dict() for entry in entries]
+                for height, entries in self.pow_lottery_entries.items()
+            }
+        )
+
+    def save_snapshot(self) -> Optional[int]:
+        """Write a snapshot of the current tip; returns its height"""
+        if self.snapshots is None:
+            return None
+        snapshot = self.create_snapshot()
+        self.snapshots.save(snapshot)
+        self._save_index(snapshot.height, snapshot.block_hash)
+        return snapshot.height
+
+    def _index_path(self, height: int) -> str:
+        return os.path.join(self.index_dir, f"index_{height:010d}.idx")
+
+    def _save_index(self, height: int, block_hash: str):
+        """Write indexes next to the snapshot at height; drop those of pruned snapshots"""
+        self._ensure_index()
+        path = self._index_path(height)
+        with open(path + ".tmp", "wb") as f:
+            f.write(self.index.to_bytes(height, block_hash))
+        os.replace(path + ".tmp", path)
+
+        kept = {self._index_path(h) for h in self.snapshots.heights()}
+        for name in os.listdir(self.index_dir):
+            path = os.path.join(self.index_dir, name)
+            if path not in kept:
+                os.remove(path)
+
+    def _load_index(self, height: int, block_hash: str) -> bool:
+        """Load indexes saved with the snapshot at height; False if missing or mismatched"""
+        try:
+            with open(self._index_path(height), "rb") as f:
+                data = f.read()
+            if self.index.load_bytes(data) == (height, block_hash):
+                return True
+        except (OSError, CodecError, UnicodeDecodeError):
+            pass
+        self.index.rebuild([])
+        return False
+
+    def load_snapshot(self, snapshot: StateSnapshot):
+        """
+        Replace in-memory state with snapshot contents. The state trie is
+        rebuilt here and its root must match the snapshot and, if the block
+        at that height is stored, its header; otherwise SnapshotError is
+        raised and the previous state is kept.
+        """
+        previous = (self.state, self.pos_stakes, self.storage_pledges,
+                    self.pow_lottery_entries, self.state_trie)
+        self.state = TrackedDict(snapshot.balances)
+        self.pos_stakes = TrackedDict({
+            address: [PoSStake(**stake) for stake in stakes]
+            for address, stakes in snapshot.stakes.items()
+        })
+        self.storage_pledges = TrackedDict({
+            address: StoragePledge(**pledge) for address, pledge in snapshot.pledges.items()
+        })
+        self.pow_lottery_entries = {
+            height: [PoWLotteryEntry(**entry) for entry in entries]
+            for height, entries in snapshot.lottery_entries.items()
+        }
+        self.state_trie = StateTrie()
+
+        expected = {snapshot.state_root}
+        if snapshot.height < len(self.chain):
+            expected.add(self.chain[snapshot.height].state_root or snapshot.state_root)
+        root = self.get_state_root()
+        if expected != {root}:
+            (self.state, self.pos_stakes, self.storage_pledges,
+             self.pow_lottery_entries, self.state_trie) = previous
+            raise SnapshotError(f"snapshot state root {root} does not match height {snapshot.height}")
+
+    def close(self):
+        """Flush and close the block store (no-op for in-memory chains)"""
+        if self.block_store is not None:
+            self.block_store.close()
 
     def get_latest_block(self) -> Block:
         """Get the last block in the chain"""
         return self.chain[-1]
 
+    def recent_blocks(self, count: int = FORGING_HISTORY) -> List[Block]:
+        """The last `count` blocks, oldest first"""
+        return self.chain[-count:]
+
+    def next_base_target(self) -> int:
+        """Base target the next plot-forged block must carry"""
+        return expected_base_target(self.recent_blocks())
+
+    def get_block_height(self, block_hash: str) -> Optional[int]:
+        """Height of block by hash, or None"""
+        if isinstance(self.chain, StoredChain):
+            return self.chain.get_height(block_hash)
+        return self.index.get_block_height(block_hash)
+
+    def get_block_by_hash(self, block_hash: str) -> Optional[Block]:
+        """Look up block by hash"""
+        height = self.get_block_height(block_hash)
+        return self.chain[height] if height is not None else None
+
+    def get_transaction_location(self, tx_id: str) -> Optional[Tuple[int, int]]:
+        """(block height, position in block) of a transaction, or None"""
+        self._ensure_index()
+        return self.index.get_tx_location(tx_id)
+
+    def get_transaction(self, tx_id: str) -> Optional[Transaction]:
+        """Look up confirmed transaction by ID"""
+        self._ensure_index()
+        location = self.index.get_tx_location(tx_id)
+        if location is None:
+            return None
+        height, position = location
+        return self.chain[height].transactions[position]
+
+    def get_address_history(
+        self,
+        address: str,
+        limit: Optional[int] = None
+    ) -> List[Tuple[int, int]]:
+        """(height, position) of confirmed transactions touching address, newest first"""
+        self._ensure_index()
+        return self.index.get_address_history(address, limit)
+
+    def rebuild_indexes(self):
+        """Rebuild secondary indexes in bulk from the chain (or block store)"""
+        self.index.rebuild(self.chain)
+        self._index_stale = False
+
+    def _ensure_index(self):
+        if self._index_stale:
+            self.rebuild_indexes()
+
+    def get_validators(self) -> List[str]:
+        """Genesis validators and addresses with an active PoS stake, sorted"""
+        return sorted(self.get_validator_stakes())
+
+    def get_validator_stakes(self) -> Dict[str, float]:
+        """Validator -> stake: genesis validator stakes plus active PoS stakes"""
+        genesis = self.chain[0]
+        genesis_validators = set(genesis.validators)
+        stakes = {
+            tx.receiver: tx.amount
+            for tx in genesis.transactions
+            if tx.receiver in genesis_validators
+        }
+        for deposits in self.pos_stakes.values():
+            for stake in deposits:
+                if stake.is_active:
+                    stakes[stake.validator] = stakes.get(stake.validator, 0.0) + stake.amount
+        return stakes
+
     def get_balance(self, address: str) -> float:
         """Get account balance"""
         return self.state.get(address, 0.0)
@@ -236,44 +1135,394 @@ class Blockchain:
 
     def process_transactions(self, transactions: List[Transaction]):
         """Apply transactions to state"""
+        if np is not None and len(transactions) >= self.VECTORIZE_MIN_TXS:
+            self.apply_batch(TransactionBatch(transactions))
+            return
+        
         for tx in transactions:
-            if tx.tx_type == TransactionType.TRANSFER:
-                sender_bal = self.state.get(tx.sender, 0.0)
-                if sender_bal >= tx.amount:
-                    self.state[tx.sender] = sender_bal - tx.amount
-                    self.state[tx.receiver] = self.state.get(tx.receiver, 0.0) + tx.amount
-            elif tx.tx_type == TransactionType.STAKE_DEPOSIT:
-                if tx.sender in self.pos_stakes:
-                    self.pos_stakes[tx.sender].append(PoSStake(
-                        validator=tx.sender,
-                        amount=tx.amount
-                    ))
-                else:
-                    self.pos_stakes[tx.sender] = [PoSStake(
-                        validator=tx.sender,
-                        amount=tx.amount
-                    )]
-                self.state[tx.sender] = self.state.get(tx.sender, 0.0) - tx.amount
-            elif tx.tx_type == TransactionType.STORAGE_PLEDGE:
-                self.storage_pledges[tx.sender] = StoragePledge(
-                    pledger=tx.sender,
-                    capacity_gb=tx.data.get('capacity_gb', 32.0),
-                    proof_hash=tx.data.get('proof_hash')
-                )
-
-    def validate_chain(self) -> bool:
-        """Validate entire blockchain integrity"""
-        for i in range(1, len(self.chain)):
-            block = self.chain[i]
-            previous_block = self.chain[i - 1]
+            self._apply_transaction(tx)
+
+    def _apply_transaction(self, tx: Transaction):
+        """Apply a single transaction to state"""
+        if tx.tx_type == TransactionType.TRANSFER:
+            sender_bal = self.state.get(tx.sender, 0.0)
+            if sender_bal >= tx.amount:
+                self.state[tx.sender] = sender_bal - tx.amount
+                self.state[tx.receiver] = self.state.get(tx.receiver, 0.0) + tx.amount
+        elif tx.tx_type == TransactionType.STAKE_DEPOSIT:
+            if tx.sender in self.pos_stakes:
+                self.pos_stakes.touch(tx.sender)  # In-place append
+                self.pos_stakes[tx.sender].append(PoSStake(
+                    validator=tx.sender,
+                    amount=tx.amount
+                ))
+            else:
+                self.pos_stakes[tx.sender] = [PoSStake(
+                    validator=tx.sender,
+                    amount=tx.amount
+                )]
+            self.state[tx.sender] = self.state.get(tx.sender, 0.0) - tx.amount
+        elif tx.tx_type == TransactionType.STORAGE_PLEDGE:
+            self.storage_pledges[tx.sender] = StoragePledge(
+                pledger=tx.sender,
+                capacity_gb=tx.data.get('capacity_gb', 32.0),
+                proof_hash=tx.data.get('proof_hash')
+            )
+
+    def apply_batch(self, batch: TransactionBatch):
+        """
+        Apply a columnar batch: non-conflicting transfers with array ops,
+        everything else sequentially in original order. Produces exactly the
+        same state as applying the transactions one by one.
+        """
+        vectorized, sequential = batch.split_conflicts()
+        
+        if vectorized.any():
+            balances = np.array(
+                list(map(self.state.get, batch.addresses, repeat(0.0))), dtype=np.float64
+            )
+            senders = batch.sender_idx[vectorized]
+            receivers = batch.receiver_idx[vectorized]
+            amounts = batch.amount[vectorized]
             
-            # Check hash integrity
-            if block.hash != block.calculate_hash():
-                return False
+            funded = balances[senders] >= amounts
+            senders, receivers, amounts = senders[funded], receivers[funded], amounts[funded]
+            np.subtract.at(balances, senders, amounts)
+            np.add.at(balances, receivers, amounts)
             
-            # Check chain continuity
-            if block.previous_hash != previous_block.hash:
+            touched = np.unique(np.concatenate((senders, receivers)))
+            addresses = batch.addresses
+            self.state.update(zip(
+                [addresses[i] for i in touched.tolist()], balances[touched].tolist()
+            ))
+        
+        transactions = batch.transactions
+        for position in np.flatnonzero(sequential).tolist():
+            self._apply_transaction(transactions[position])
+
+    def begin_block(self):
+        """Start recording an undo journal for the next block's state changes"""
+        for name in self.JOURNALED_TABLES:
+            getattr(self, name).journal = {}
+
+    def _end_journal(self) -> Dict[str, Dict]:
+        """Stop recording and return the journal since begin_block()"""
+        journal = {}
+        for name in self.JOURNALED_TABLES:
+            table = getattr(self, name)
+            journal[name] = table.journal or {}
+            table.journal = None
+        return journal
+
+    def commit_block(self, block: Block):
+        """Append block, keep the journal recorded since begin_block() and notify block_listeners"""
+        # Journal first: after a crash every stored block still has its undo record
+        self._store_journal(block.index, self._end_journal())
+        self.chain.append(block)
+        if not self._index_stale:
+            self.index.add_block(block)
+        
+        if (self.snapshots is not None and self.snapshot_interval
+                and block.index % self.snapshot_interval == 0):
+            self.save_snapshot()
+        for listener in self.block_listeners:
+            listener(block)
+
+    def apply_block(self, block: Block) -> bool:
+        """
+        Apply a block's transactions and append it, recording an undo journal.
+        The header's merkle_root and state_root must match the transactions
+        and the resulting state; otherwise the changes are undone.
+        """
+        recent = self.recent_blocks()
+        if block.previous_hash != recent[-1].hash or not forging_valid(block, recent):
+            return False
+        if block.merkle_root != Block.calculate_merkle_root(block.transactions):
+            return False
+        
+        self.begin_block()
+        self.process_transactions(block.transactions)
+        if self.get_state_root() != block.state_root:
+            self._undo_journal(self._end_journal())
+            return False
+        self.commit_block(block)
+        return True
+
+    def _undo_journal(self, journal: Dict[str, Dict]):
+        """Restore the values a block's journal recorded (re-dirtying the trie keys)"""
+        for name, entries in journal.items():
+            table = getattr(self, name)
+            for key, prior in entries.items():
+                if prior is MISSING:
+                    table.pop(key, None)
+                else:
+                    table[key] = prior
+
+    def _journal_path(self, height: int) -> str:
+        return os.path.join(self.journal_dir, f"undo_{height:010d}.json")
+
+    def _store_journal(self, height: int, journal: Dict[str, Dict]):
+        """
+        Write journal to disk now (if journal_dir set) and cache it in memory,
+        dropping the oldest cached entries past journal_depth.
+        """
+        if self.journal_dir is not None:
+            path = self._journal_path(height)
+            with open(path + ".tmp", "w") as f:
+                json.dump(self._encode_journal(journal), f)
+            os.replace(path + ".tmp", path)
+            expired = self._journal_path(height - self.JOURNAL_DISK_DEPTH)
+            if os.path.exists(expired):
+                os.remove(expired)
+        self.undo_journals[height] = journal
+        while len(self.undo_journals) > self.journal_depth:
+            self.undo_journals.popitem(last=False)
+
+    def _has_journal(self, height: int) -> bool:
+        if height in self.undo_journals:
+            return True
+        return self.journal_dir is not None and os.path.exists(self._journal_path(height))
+
+    def _take_journal(self, height: int) -> Dict[str, Dict]:
+        """Remove and return the journal for height (memory first, then disk)"""
+        journal = self.undo_journals.pop(height, None)
+        path = self._journal_path(height) if self.journal_dir is not None else None
+        if journal is None:
+            with open(path) as f:
+                journal = self._decode_journal(json.load(f))
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+        return journal
+
+    @staticmethod
+    def _encode_journal(journal: Dict[str, Dict]) -> Dict[str, List]:
+        """JSON form: table -> [[key, existed, prior value], ...]"""
+        def encode(value):
+            if isinstance(value, list):
+                return [stake.to_dict() for stake in value]
+            if isinstance(value, StoragePledge):
+                return value.to_dict()
+            return value
+        
+        return {
+            name: [
+                [key, prior is not MISSING, None if prior is MISSING else encode(prior)]
+                for key, prior in entries.items()
+            ]
+            for name, entries in journal.items()
+        }
+
+    @staticmethod
+    def _decode_journal(raw: Dict[str, List]) -> Dict[str, Dict]:
+        decoders = {
+            'state': lambda value: value,
+            'pos_stakes': lambda value: [PoSStake(**stake) for stake in value],
+            'storage_pledges': lambda value: StoragePledge(**value),
+        }
+        return {
+            name: {
+                key: decoders[name](value) if existed else MISSING
+                for key, existed, value in entries
+            }
+            for name, entries in raw.items()
+        }
+
+    def rollback(self, count: int) -> Optional[List[Block]]:
+        """
+        Undo the last `count` blocks for a fork switch, in O(changes).
+        Returns the removed blocks (lowest height first), or None if the
+        genesis block would be removed or a journal is unavailable.
+        """
+        tip = len(self.chain) - 1
+        if count <= 0:
+            return []
+        if count > tip:
+            return None
+        heights = range(tip, tip - count, -1)
+        if not all(self._has_journal(height) for height in heights):
+            return None
+        
+        removed = []
+        for height in heights:
+            self._undo_journal(self._take_journal(height))
+            block = self.chain[height]
+            if not self._index_stale:
+                self.index.remove_block(block)
+            removed.append(block)
+        
+        new_length = tip - count + 1
+        if isinstance(self.chain, StoredChain):
+            self.chain.truncate(new_length)
+        else:
+            del self.chain[new_length:]
+        self.validated_height = min(self.validated_height, new_length - 1)
+        
+        removed.reverse()
+        return removed
+
+    @staticmethod
+    def _state_key(namespace: bytes, address: str) -> bytes:
+        return hashlib.sha256(namespace + str(address).encode()).digest()
+
+    @staticmethod
+    def _balance_value_hash(balance: float) -> bytes:
+        return hashlib.sha256(struct.pack(">d", balance)).digest()
+
+    @staticmethod
+    def _stakes_value_hash(stakes: List[PoSStake]) -> bytes:
+        # Timestamps are local wall-clock values, so they are left out of consensus state
+        value = [
+            [s.validator, s.amount, s.lock_time, s.delegated_from, s.is_active]
+            for s in stakes
+        ]
+        return hashlib.sha256(json.dumps(value, separators=(',', ':')).encode()).digest()
+
+    @staticmethod
+    def _pledge_value_hash(pledge: StoragePledge) -> bytes:
+        value = [
+            pledge.pledger, pledge.capacity_gb, pledge.proof_hash,
+            pledge.challenge_response, pledge.is_active
+        ]
+        return hashlib.sha256(json.dumps(value, separators=(',', ':')).encode()).digest()
+
+    def _sync_state_trie(self):
+        """Push keys written since the last root into the state trie"""
+        for namespace, table, value_hash in (
+            (self.STATE_NS_BALANCE, self.state, self._balance_value_hash),
+            (self.STATE_NS_STAKES, self.pos_stakes, self._stakes_value_hash),
+            (self.STATE_NS_PLEDGE, self.storage_pledges, self._pledge_value_hash),
+        ):
+            for address in table.dirty:
+                key = self._state_key(namespace, address)
+                if address in table:
+                    self.state_trie.update(key, value_hash(table[address]))
+                else:
+                    self.state_trie.delete(key)
+            table.dirty.clear()
+
+    def get_state_root(self) -> str:
+        """
+        Authenticated root over balances, stakes and pledges.
+        Only accounts touched since the previous call are rehashed.
+        """
+        self._sync_state_trie()
+        return self.state_trie.root().hex()
+
+    def get_state_proof(
+        self,
+        address: str,
+        namespace: bytes = STATE_NS_BALANCE
+    ) -> Optional[List[Tuple[bytes, bool]]]:
+        """Inclusion proof for an account entry, verifiable with StateTrie.verify_proof"""
+        self._sync_state_trie()
+        return self.state_trie.get_proof(self._state_key(namespace, address))
+
+    def _checkpoint_path(self) -> Optional[str]:
+        if self.block_store is None:
+            return None
+        return os.path.join(self.block_store.data_dir, self.VALIDATION_CHECKPOINT)
+
+    def _load_validation_checkpoint(self) -> int:
+        """Highest validated height, if the checkpoint still matches the chain"""
+        # In-memory chains can be mutated in place, so they always revalidate
+        path = self._checkpoint_path()
+        if path is None or not os.path.exists(path):
+            return -1
+        with open(path, "rb") as f:
+            raw = f.read()
+        if len(raw) != self._CHECKPOINT.size:
+            return -1
+        height, block_hash = self._CHECKPOINT.unpack(raw)
+        if height >= len(self.chain) or self.block_store.get_hash(height) != block_hash:
+            return -1
+        return height
+
+    def _save_validation_checkpoint(self, height: int, block_hash: str):
+        self.validated_height = height
+        path = self._checkpoint_path()
+        if path is None:
+            return
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self._CHECKPOINT.pack(height, bytes.fromhex(block_hash)))
+        os.replace(tmp_path, path)
+
+    def _block_source(self, start: int, end: int, in_worker: bool):
+        """Blocks [start - FORGING_HISTORY, end) in the form _validate_block_range expects"""
+        first = max(start - FORGING_HISTORY, 0)
+        if self.block_store is not None:
+            return self.block_store.data_dir if in_worker else self.chain.iter_range(first, end)
+        return self.chain[first:end]
+
+    def validate_chain(
+        self,
+        workers: int = 1,
+        resume: bool = True,
+        progress: Optional[Callable[[Dict], None]] = None,
+        range_size: int = VALIDATION_RANGE_SIZE
+    ) -> bool:
+        """
+        Validate entire blockchain integrity.
+        
+        The chain is split into ranges of range_size blocks; with workers > 1
+        they are checked in a process pool and stitched together by checking
+        previous_hash linkage at range boundaries. With resume=True only blocks
+        above the last validated checkpoint are checked (persisted next to the
+        block store for disk-backed chains). progress, if given, is called
+        with the running stats dict after each range.
+        """
+        total = len(self.chain)
+        start = self._load_validation_checkpoint() + 1 if resume else 0
+        expected_previous = self.chain[start - 1].hash if start > 0 else None
+        ranges = [(lo, min(lo + range_size, total)) for lo in range(start, total, range_size)]
+        
+        started_at = time.time()
+        stats = {
+            'start_height': start,
+            'validated_height': start - 1,
+            'target_height': total - 1,
+            'blocks': 0,
+            'elapsed': 0.0,
+            'blocks_per_sec': 0.0,
+            'failed_height': None
+        }
+        self.last_validation = stats
+        
+        def check(result, lo: int, hi: int) -> bool:
+            nonlocal expected_previous
+            bad_height, first_previous, last_hash = result
+            if expected_previous is not None and first_previous != expected_previous:
+                bad_height = lo
+            if bad_height is not None:
+                stats['failed_height'] = bad_height
                 return False
+            
+            expected_previous = last_hash
+            self._save_validation_checkpoint(hi - 1, last_hash)
+            stats['validated_height'] = hi - 1
+            stats['blocks'] += hi - lo
+            stats['elapsed'] = time.time() - started_at
+            stats['blocks_per_sec'] = stats['blocks'] / stats['elapsed'] if stats['elapsed'] else 0.0
+            if progress:
+                progress(dict(stats))
+            return True
+        
+        if workers <= 1 or len(ranges) <= 1:
+            for lo, hi in ranges:
+                if not check(_validate_block_range(self._block_source(lo, hi, False), lo, hi), lo, hi):
+                    return False
+            return True
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_validate_block_range, self._block_source(lo, hi, True), lo, hi)
+                for lo, hi in ranges
+            ]
+            for future, (lo, hi) in zip(futures, ranges):
+                if not check(future.result(), lo, hi):
+                    for pending in futures:
+                        pending.cancel()
+                    return False
         
         return True
 
@@ -7,10 +7,12 @@ FCU Blockchain Governance System
 """
 
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
+from voting import VoteTally
+
 
 class ProposalType(Enum):
     """Types of governance proposals"""
@@ -43,25 +45,45 @@ class Proposal:
     timestamp: float = field(default_factory=time.time)
     voting_deadline: float = field(default_factory=lambda: time.time() + 86400)  # 24h
     status: ProposalStatus = ProposalStatus.PROPOSED
-    votes: Dict[str, bool] = field(default_factory=dict)  # voter_id -> vote (yes/no)
+    votes: Mapping[str, bool] = field(default_factory=dict)  # voter_id -> vote; read-only, see record_vote
     execution_time: Optional[float] = None
+    min_approval: int = 3                  # Yes votes needed (3/5 council)
+    tally: VoteTally = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Running counters; votes becomes the tally's read-only view
+        self.tally = VoteTally(self.votes)
+        self.votes = self.tally.votes
 
     def is_voting_active(self) -> bool:
         """Check if voting period is still active"""
         return time.time() < self.voting_deadline and self.status == ProposalStatus.VOTING
 
+    def record_vote(self, voter_id: str, vote: bool, weight: float = 1.0) -> bool:
+        """
+        Record or change a vote in O(1).
+        Returns True if this vote moved the proposal across min_approval.
+        """
+        was_approved = self.tally.yes >= self.min_approval
+        self.tally.record(voter_id, vote, weight)
+        return (self.tally.yes >= self.min_approval) != was_approved
+
     def get_vote_count(self) -> Tuple[int, int]:
         """Get (yes_votes, no_votes)"""
-        yes = sum(1 for v in self.votes.values() if v is True)
-        no = sum(1 for v in self.votes.values() if v is False)
-        return yes, no
+        return self.tally.counts()
+
+    def get_vote_weight(self) -> Tuple[float, float]:
+        """Get voting-power weighted (yes, no) totals"""
+        return self.tally.weighted()
 
-    def is_approved(self, min_approval: int = 3) -> bool:
+    def is_approved(self, min_approval: Optional[int] = None) -> bool:
         """Check if proposal has sufficient approval (3/5 council)"""
-        yes, no = self.get_vote_count()
-        return yes >= min_approval
+        if min_approval is None:
+            min_approval = self.min_approval
+        return self.tally.yes >= min_approval
 
     def to_dict(self) -> Dict:
+        yes, no = self.tally.counts()
         return {
             'proposal_id': self.proposal_id,
             'proposal_type': self.proposal_type.value,
@@ -71,9 +93,11 @@ class Proposal:
             'timestamp': self.timestamp,
             'voting_deadline': self.voting_deadline,
             'status': self.status.value,
-            'votes': self.votes,
-            'yes_votes': self.get_vote_count()[0],
-            'no_votes': self.get_vote_count()[1]
+            'votes': dict(self.votes),
+            'yes_votes': yes,
+            'no_votes': no,
+            'yes_weight': self.tally.yes_weight,
+            'no_weight': self.tally.no_weight
         }
 
 
@@ -186,6 +210,8 @@ class Treasury:
 class GovernanceCouncil:
     """Council governance system"""
     
+    MAX_DIFFICULTY_ADJUSTMENT = 4   # Per vote, as PoCDifficulty.MAX_ADJUSTMENT per retarget
+    
     def __init__(self, treasurer_id: str, council_members: List[str]):
         self.treasurer_id = treasurer_id
         self.council_members = council_members[:5]  # Max 5 members
@@ -194,6 +220,9 @@ class GovernanceCouncil:
         self.reward_config = RewardConfiguration()
         self.proposal_counter = 0
         self.parameter_history: List[Dict] = []
+        self.voting_power: Dict[str, float] = {}  # member -> weight (default 1.0)
+        # Called as listener(proposal, approved) when approval is reached or lost
+        self.threshold_listeners: List[Callable[[Proposal, bool], None]] = []
 
     def create_proposal(
         self,
@@ -242,7 +271,10 @@ class GovernanceCouncil:
             return False
         
         # Record vote
-        proposal.votes[voter_id] = vote
+        if proposal.record_vote(voter_id, vote, self.voting_power.get(voter_id, 1.0)):
+            approved = proposal.is_approved()
+            for listener in self.threshold_listeners:
+                listener(proposal, approved)
         
         # Check if proposal can be finalized
         if len(proposal.votes) >= len(self.council_members):
@@ -250,11 +282,21 @@ class GovernanceCouncil:
         
         return True
 
+    def count_votes(self, proposal_id: str) -> Tuple[int, int, int]:
+        """
+        Count votes on proposal.
+        Returns: (yes_votes, no_votes, total_voters)
+        """
+        if proposal_id not in self.proposals:
+            return 0, 0, 0
+        yes, no = self.proposals[proposal_id].get_vote_count()
+        return yes, no, len(self.council_members)
+
     def _finalize_proposal(self, proposal_id: str):
         """Finalize proposal after voting complete"""
         proposal = self.proposals[proposal_id]
         
-        if proposal.is_approved(min_approval=3):  # 3 of 5 required
+        if proposal.is_approved():  # 3 of 5 required
             proposal.status = ProposalStatus.APPROVED
             self._execute_proposal(proposal_id)
         else:
@@ -367,9 +409,15 @@ class GovernanceCouncil:
         
         return rewards_given
 
-    def adjust_difficulty(self, current_difficulty: int, adjustment: int) -> int:
-        """Adjust PoC difficulty via governance"""
-        new_difficulty = max(1, min(32, current_difficulty + adjustment))
+    def adjust_difficulty(self, current_difficulty: int, ratio: float) -> int:
+        """
+        Scale PoC difficulty (expected hashes per block) by ratio via governance,
+        e.g. 2.0 doubles it. The ratio is clamped to MAX_DIFFICULTY_ADJUSTMENT
+        in either direction, as for automatic retargeting.
+        """
+        limit = self.MAX_DIFFICULTY_ADJUSTMENT
+        ratio = min(max(ratio, 1.0 / limit), float(limit))
+        new_difficulty = max(1, round(current_difficulty * ratio))
         
         if new_difficulty != current_difficulty:
             self.parameter_history.append({
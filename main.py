@@ -49,13 +49,6 @@ class FCUNetwork:
         
         # 1. Create Treasurer and Council
         print("\n[GOVERNANCE] Setting up governance council...")
-        treasurer = PoSValidatorNode(
-            node_id="TREASURER_Alice",
-            role=PoSValidator.ROLE_TREASURER,
-            initial_stake=50000.0,
-            port=8000
-        )
-        
         council_members = [
             "COUNCIL_Bob",
             "COUNCIL_Charlie", 
@@ -64,13 +57,26 @@ class FCUNetwork:
             "COUNCIL_Frank"
         ]
         
+        # Every node starts from the same genesis validator stakes
+        genesis_validators = {"TREASURER_Alice": 50000.0}
+        genesis_validators.update((member_id, 10000.0) for member_id in council_members[:5])
+        
+        treasurer = PoSValidatorNode(
+            node_id="TREASURER_Alice",
+            role=PoSValidator.ROLE_TREASURER,
+            initial_stake=50000.0,
+            port=8000,
+            genesis_validators=genesis_validators
+        )
+        
         council_validator_nodes = {}
         for member_id in council_members[:5]:
             node = PoSValidatorNode(
                 node_id=member_id,
                 role=PoSValidator.ROLE_COUNCIL,
                 initial_stake=10000.0,
-                port=8001
+                port=8001,
+                genesis_validators=genesis_validators
             )
             council_validator_nodes[member_id] = node
             self.pos_validators[member_id] = node
@@ -98,7 +104,8 @@ class FCUNetwork:
             node = PoCMinerNode(
                 node_id=miner_id,
                 storage_gb=storage_gb,
-                port=8010
+                port=8010,
+                genesis_validators=genesis_validators
             )
             self.poc_miners[miner_id] = node
             print(f"[OK] {miner_id}: {storage_gb} GB pledged")
@@ -118,7 +125,7 @@ class FCUNetwork:
         full_node_count = 2
         for i in range(full_node_count):
             node_id = f"FullNode_{i+1}"
-            node = FullNode(node_id, port=8020+i)
+            node = FullNode(node_id, port=8020+i, genesis_validators=genesis_validators)
             self.full_nodes[node_id] = node
             print(f"[OK] {node_id}")
         
@@ -438,6 +445,11 @@ def main():
     # Print final statistics
     network.print_network_stats()
     
+    # Release miner worker pools and block stores
+    for nodes in (network.poc_miners, network.pos_validators, network.full_nodes):
+        for node in nodes.values():
+            node.close()
+    
     print("\n" + "="*80)
     print("DEMONSTRATION COMPLETE")
     print("="*80)
@@ -3,15 +3,29 @@ FCU Blockchain P2P Network Layer
 - Peer discovery and management
 - Gossip-based message propagation
 - Block and transaction synchronization
+- Attestation aggregation (one vote message per block)
 """
 
 import time
+import math
+import heapq
+import struct
 import hashlib
 import json
 from typing import Dict, List, Optional, Set, Tuple
-from dataclasses import dataclass, asdict, field
+from array import array
+from dataclasses import dataclass, field
 from enum import Enum
-from collections import defaultdict
+from collections import defaultdict, deque, OrderedDict
+from collections.abc import Mapping
+
+from codec import CodecError
+from core import Block
+
+try:
+    import numpy as np
+except ImportError:  # Peer filters fall back to array columns
+    np = None
 
 
 class MessageType(Enum):
@@ -25,55 +39,434 @@ class MessageType(Enum):
     SYNC_REQUEST = "sync_request"          # Request chain sync
     SYNC_RESPONSE = "sync_response"        # Chain state response
     VOTE_MESSAGE = "vote_message"          # Governance vote
+    ATTESTATION = "attestation"            # Block signature, sent to aggregators only
+    AGGREGATE_ATTESTATION = "aggregate_attestation"  # Merged block signatures
     STORAGE_PLEDGE = "storage_pledge"      # Storage pledge announcement
     PING = "ping"                          # Keep-alive
     PONG = "pong"                          # Keep-alive response
 
 
-@dataclass
+PEER_TYPE_CODES = {"poc_miner": 1, "pos_validator": 2, "full_node": 3}
+
+
+def _column_property(name: str):
+    """Attribute stored in the bound PeerTable row, else on the object itself"""
+    private = '_' + name
+
+    def fget(self):
+        table = self._table
+        if table is not None:
+            slot = table._slots.get(self.peer_id)
+            if slot is not None:
+                return table._get(name, slot)
+        return getattr(self, private)
+
+    def fset(self, value):
+        table = self._table
+        if table is not None:
+            slot = table._slots.get(self.peer_id)
+            if slot is not None:
+                table._set(name, slot, value)
+                return
+        setattr(self, private, value)
+
+    return property(fget, fset)
+
+
 class PeerInfo:
-    """Information about a peer node"""
-    peer_id: str                           # Unique peer identifier
-    host: str                              # IP address
-    port: int                              # P2P port
-    node_type: str                         # "poc_miner", "pos_validator", "full_node"
-    last_seen: float = field(default_factory=time.time)
-    reputation: float = 1.0                # Peer reputation score (0-1)
-    blocks_shared: int = 0
-    failed_messages: int = 0
-    version: str = "1.0"
+    """
+    Information about a peer node.
+    Standalone it holds its own values; once added to a PeerTable it is a
+    thin view whose mutable fields live in the table's column arrays.
+    No longer a dataclass: compare with ==, convert with to_dict() (not
+    dataclasses.asdict). Unhashable, as the dataclass was.
+    """
+
+    __slots__ = (
+        'peer_id', 'host', '_table', '_port', '_node_type', '_last_seen',
+        '_reputation', '_blocks_shared', '_failed_messages', '_version'
+    )
+
+    port = _column_property('port')                    # P2P port
+    node_type = _column_property('node_type')          # "poc_miner", "pos_validator", "full_node"
+    last_seen = _column_property('last_seen')
+    reputation = _column_property('reputation')        # Peer reputation score (0-1)
+    blocks_shared = _column_property('blocks_shared')
+    failed_messages = _column_property('failed_messages')
+    version = _column_property('version')
+
+    def __init__(
+        self,
+        peer_id: str,                      # Unique peer identifier
+        host: str,                         # IP address
+        port: int,
+        node_type: str,
+        last_seen: Optional[float] = None,
+        reputation: float = 1.0,
+        blocks_shared: int = 0,
+        failed_messages: int = 0,
+        version: str = "1.0"
+    ):
+        self._table = None
+        self.peer_id = peer_id
+        self.host = host
+        self._version = version
+        self._port = port
+        self._node_type = node_type
+        self._last_seen = time.time() if last_seen is None else last_seen
+        self._reputation = reputation
+        self._blocks_shared = blocks_shared
+        self._failed_messages = failed_messages
 
     def is_alive(self, timeout: float = 300.0) -> bool:
         """Check if peer was seen recently"""
         return time.time() - self.last_seen < timeout
 
     def to_dict(self) -> Dict:
-        return asdict(self)
+        return {
+            'peer_id': self.peer_id,
+            'host': self.host,
+            'port': self.port,
+            'node_type': self.node_type,
+            'last_seen': self.last_seen,
+            'reputation': self.reputation,
+            'blocks_shared': self.blocks_shared,
+            'failed_messages': self.failed_messages,
+            'version': self.version
+        }
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PeerInfo):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"PeerInfo(peer_id={self.peer_id!r}, host={self.host!r}, port={self.port}, "
+                f"node_type={self.node_type!r}, reputation={self.reputation:.2f})")
+
+
+class PeerTable(Mapping):
+    """
+    Struct-of-arrays peer store: peer_id -> PeerInfo view.
+
+    last_seen, reputation, type code, counters and port live in parallel
+    NumPy columns (array module fallback), so health and type filters are a
+    few vectorized comparisons over the whole table with one time.time()
+    call. Removal swaps the last row into the hole, keeping rows dense.
+    Views are built on access and not kept; the object passed to add() is
+    bound as a view too, and after remove() reads the values it was added with.
+    """
+
+    _DTYPES = {
+        'last_seen': ('d', 'float64'),
+        'reputation': ('d', 'float64'),
+        'node_type': ('B', 'uint8'),
+        'blocks_shared': ('I', 'uint32'),
+        'failed_messages': ('I', 'uint32'),
+        'port': ('H', 'uint16'),
+        'version': ('B', 'uint8'),
+    }
+    _CODED = ('node_type', 'version')               # Strings stored as small codes
+    _MAX_INT = {'B': 0xFF, 'H': 0xFFFF, 'I': 0xFFFFFFFF}
+    UNKNOWN_CODE = 0xFF                             # Shared by strings past the interning bound
+
+    def __init__(self, capacity: int = 1024):
+        self._size = 0
+        self._slots: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._hosts: List[str] = []
+        self._codes = {'node_type': dict(PEER_TYPE_CODES), 'version': {}}
+        self._names = {
+            column: {code: name for name, code in codes.items()}
+            for column, codes in self._codes.items()
+        }
+        for names in self._names.values():
+            names[self.UNKNOWN_CODE] = "unknown"
+        if np is not None:
+            self._columns = {name: np.zeros(capacity, dtype) for name, (_, dtype) in self._DTYPES.items()}
+        else:
+            self._columns = {name: array(code) for name, (code, _) in self._DTYPES.items()}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        return iter(list(self._ids))
+
+    def __contains__(self, peer_id) -> bool:
+        return peer_id in self._slots
+
+    def __getitem__(self, peer_id: str) -> PeerInfo:
+        slot = self._slots[peer_id]
+        return self._view(slot)
+
+    def _code(self, column: str, value: str) -> int:
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = len(codes) + 1
+            if code >= self.UNKNOWN_CODE:
+                return self.UNKNOWN_CODE     # Interning is bounded; not remembered
+            codes[value] = code
+            self._names[column][code] = value
+        return code
+
+    def _convert(self, name: str, value):
+        """Column value for name; ValueError (nothing written) if it does not fit"""
+        if name in self._CODED:
+            if not isinstance(value, str):
+                raise ValueError(f"{name} must be a string, got {type(value).__name__}")
+            return self._code(name, value)
+        typecode = self._DTYPES[name][0]
+        if typecode == 'd':
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be a number, got {value!r}") from None
+        if not isinstance(value, int) or isinstance(value, bool) or not 0 <= value <= self._MAX_INT[typecode]:
+            raise ValueError(f"{name} must be an integer in 0..{self._MAX_INT[typecode]}, got {value!r}")
+        return value
+
+    def _get(self, name: str, slot: int):
+        value = self._columns[name][slot]
+        if name in self._CODED:
+            return self._names[name][int(value)]
+        return float(value) if name in ('last_seen', 'reputation') else int(value)
+
+    def _set(self, name: str, slot: int, value):
+        self._columns[name][slot] = self._convert(name, value)
+
+    def _view(self, slot: int) -> PeerInfo:
+        view = PeerInfo(self._ids[slot], self._hosts[slot], 0, "")
+        view._table = self
+        return view
+
+    def _grow(self):
+        for name, column in self._columns.items():
+            if np is not None:
+                grown = np.zeros(max(16, len(column) * 2), column.dtype)
+                grown[:len(column)] = column
+                self._columns[name] = grown
+            else:
+                column.append(0)
+
+    def add(self, peer: PeerInfo) -> bool:
+        """
+        Insert or overwrite peer's row and bind the object as a view.
+        All-or-nothing: a value that does not fit its column raises
+        ValueError before the table changes.
+        """
+        if peer._table is not None and peer._table is not self:
+            peer = PeerInfo(**peer.to_dict())  # Bound elsewhere: copy
+        # Coded strings last: interning is the only side effect of converting
+        names = sorted(self._DTYPES, key=lambda name: name in self._CODED)
+        values = {name: self._convert(name, getattr(peer, name)) for name in names}
+        slot = self._slots.get(peer.peer_id)
+        is_new = slot is None
+        if is_new:
+            slot = self._size
+            if np is None or slot >= len(self._columns['port']):
+                self._grow()
+            self._size += 1
+            self._slots[peer.peer_id] = slot
+            self._ids.append(peer.peer_id)
+            self._hosts.append(peer.host)
+        else:
+            self._hosts[slot] = peer.host
+        for name, value in values.items():
+            self._columns[name][slot] = value
+        peer._table = self
+        return is_new
+
+    def remove(self, peer_id: str) -> bool:
+        slot = self._slots.pop(peer_id, None)
+        if slot is None:
+            return False
+
+        last = self._size - 1
+        if slot != last:
+            moved = self._ids[last]
+            self._ids[slot] = moved
+            self._hosts[slot] = self._hosts[last]
+            for column in self._columns.values():
+                column[slot] = column[last]
+            self._slots[moved] = slot
+        self._ids.pop()
+        self._hosts.pop()
+        if np is None:
+            for column in self._columns.values():
+                column.pop()
+        self._size = last
+        return True
+
+    def _mask(self, code: Optional[int], alive_timeout: Optional[float], min_reputation: Optional[float]):
+        n = self._size
+        columns = self._columns
+        mask = np.ones(n, dtype=bool)
+        if code is not None:
+            mask &= columns['node_type'][:n] == code
+        if alive_timeout is not None:
+            mask &= columns['last_seen'][:n] > time.time() - alive_timeout
+        if min_reputation is not None:
+            mask &= columns['reputation'][:n] > min_reputation
+        return mask
+
+    def select(
+        self,
+        node_type: Optional[str] = None,
+        alive_timeout: Optional[float] = None,
+        min_reputation: Optional[float] = None
+    ) -> List[int]:
+        """Row slots matching all given filters"""
+        code = None
+        if node_type is not None:
+            code = self._codes['node_type'].get(node_type)
+            if code is None:
+                return []
+        if np is not None:
+            return np.flatnonzero(self._mask(code, alive_timeout, min_reputation)).tolist()
+
+        now = time.time()
+        columns = self._columns
+        slots = range(self._size)
+        if code is not None:
+            types = columns['node_type']
+            slots = [i for i in slots if types[i] == code]
+        if alive_timeout is not None:
+            seen, cutoff = columns['last_seen'], now - alive_timeout
+            slots = [i for i in slots if seen[i] > cutoff]
+        if min_reputation is not None:
+            reputation = columns['reputation']
+            slots = [i for i in slots if reputation[i] > min_reputation]
+        return list(slots)
+
+    def count(
+        self,
+        node_type: Optional[str] = None,
+        alive_timeout: Optional[float] = None,
+        min_reputation: Optional[float] = None
+    ) -> int:
+        """Number of rows matching the filters, without building views"""
+        if np is None or node_type is not None and node_type not in self._codes['node_type']:
+            return len(self.select(node_type, alive_timeout, min_reputation))
+        code = self._codes['node_type'].get(node_type) if node_type is not None else None
+        return int(np.count_nonzero(self._mask(code, alive_timeout, min_reputation)))
+
+    def peers(self, slots: List[int]) -> List[PeerInfo]:
+        return [self._view(slot) for slot in slots]
+
+    def ids(self, slots: List[int]) -> List[str]:
+        return [self._ids[slot] for slot in slots]
+
+    def gather(self, name: str, peer_ids: List[str]):
+        """Raw values of one numeric column for peer_ids (KeyError if unknown)"""
+        slots = [self._slots[peer_id] for peer_id in peer_ids]
+        column = self._columns[name]
+        if np is not None:
+            return column[slots]
+        return [column[slot] for slot in slots]
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the numeric columns"""
+        return sum(column.nbytes if np is not None else column.itemsize * len(column)
+                   for column in self._columns.values())
+
+
+# Canonical payload encodings (also the wire format, see transport.py)
+PAYLOAD_JSON = 0
+PAYLOAD_BLOCK = 1
+
+_BLOCK_KEYS = frozenset((
+    'index', 'hash', 'previous_hash', 'timestamp', 'transactions', 'miner', 'validators',
+    'poc_difficulty', 'pow_lottery_winner', 'nonce', 'merkle_root', 'state_root', 'base_target'
+))
+_BLOCK_MESSAGES = (MessageType.BLOCK_ANNOUNCE, MessageType.BLOCK_RESPONSE)
+_F64 = struct.Struct(">d")
+
+
+def encode_payload(message_type: MessageType, payload: Dict) -> Tuple[int, bytes]:
+    """(kind, bytes): Block.to_bytes() for full block payloads, else sorted compact JSON"""
+    if message_type in _BLOCK_MESSAGES and payload.keys() == _BLOCK_KEYS:
+        try:
+            return PAYLOAD_BLOCK, Block.from_dict(payload).to_bytes()
+        except (CodecError, KeyError, TypeError, ValueError):
+            pass
+    return PAYLOAD_JSON, json.dumps(
+        payload, sort_keys=True, separators=(',', ':'), default=str
+    ).encode()
+
+
+def decode_payload(kind: int, data) -> Dict:
+    if kind == PAYLOAD_BLOCK:
+        return Block.from_bytes(data).to_dict()
+    if kind == PAYLOAD_JSON:
+        return json.loads(bytes(data))
+    raise ValueError(f"unknown payload kind {kind}")
 
 
 @dataclass
 class Message:
-    """P2P network message"""
+    """
+    P2P network message.
+    The payload is encoded and hashed at most once per message (see
+    content_id); treat it as immutable after the message is sent.
+    """
     message_id: str                        # Unique message ID
     message_type: MessageType
     sender_id: str                         # Sender peer ID
     timestamp: float = field(default_factory=time.time)
     payload: Dict = field(default_factory=dict)
     ttl: int = 64                          # Time-to-live (hops)
+    _wire_payload: Optional[Tuple[int, bytes]] = field(default=None, init=False, repr=False, compare=False)
+    _content_id: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_wire(
+        cls,
+        message_id: str,
+        message_type: MessageType,
+        sender_id: str,
+        timestamp: float,
+        ttl: int,
+        kind: int,
+        data
+    ) -> 'Message':
+        """
+        Build from decoded frame fields, keeping the payload bytes for
+        content_id and relays. ValueError unless the payload is an object.
+        """
+        payload = decode_payload(kind, data)
+        if not isinstance(payload, dict):
+            raise ValueError(f"payload must be an object, got {type(payload).__name__}")
+        message = cls(message_id, message_type, sender_id, timestamp, payload, ttl)
+        message._wire_payload = (kind, data)
+        return message
+
+    def wire_payload(self) -> Tuple[int, bytes]:
+        """Canonical payload encoding, computed once"""
+        if self._wire_payload is None:
+            self._wire_payload = encode_payload(self.message_type, self.payload)
+        return self._wire_payload
+
+    def content_id(self) -> bytes:
+        """SHA-256 over type, sender, timestamp and canonical payload; computed once"""
+        if self._content_id is None:
+            kind, data = self.wire_payload()
+            digest = hashlib.sha256(self.message_type.value.encode())
+            digest.update(b"\x00")
+            digest.update(self.sender_id.encode())
+            digest.update(b"\x00")
+            digest.update(_F64.pack(self.timestamp))
+            digest.update(bytes((kind,)))
+            digest.update(data)
+            self._content_id = digest.digest()
+        return self._content_id
 
     def hash(self) -> str:
-        """Calculate message hash for deduplication"""
-        data = {
-            'sender_id': self.sender_id,
-            'message_type': self.message_type.value,
-            'timestamp': self.timestamp,
-            'payload_hash': hashlib.sha256(
-                json.dumps(self.payload, sort_keys=True, default=str).encode()
-            ).hexdigest()
-        }
-        return hashlib.sha256(
-            json.dumps(data, sort_keys=True).encode()
-        ).hexdigest()
+        """Message hash for deduplication (hex of content_id)"""
+        return self.content_id().hex()
 
     def to_dict(self) -> Dict:
         return {
@@ -94,18 +487,16 @@ class PeerDiscovery:
             ("127.0.0.1", 8000),   # Bootstrap node 1
             ("127.0.0.1", 8001),   # Bootstrap node 2
         ]
-        self.known_peers: Dict[str, PeerInfo] = {}
+        self.known_peers = PeerTable()  # peer_id -> PeerInfo view
         self.peer_index: Dict[str, str] = {}  # host:port -> peer_id
 
     def add_peer(self, peer_info: PeerInfo) -> bool:
         """Add peer to known peers"""
-        if peer_info.peer_id not in self.known_peers:
-            self.known_peers[peer_info.peer_id] = peer_info
+        if self.known_peers.add(peer_info):
             self.peer_index[f"{peer_info.host}:{peer_info.port}"] = peer_info.peer_id
             return True
         
-        # Update existing peer info
-        self.known_peers[peer_info.peer_id] = peer_info
+        # Existing peer info was updated in place
         return False
 
     def remove_peer(self, peer_id: str) -> bool:
@@ -115,22 +506,21 @@ class PeerDiscovery:
             key = f"{peer.host}:{peer.port}"
             if key in self.peer_index:
                 del self.peer_index[key]
-            del self.known_peers[peer_id]
+            self.known_peers.remove(peer_id)
             return True
         return False
 
     def get_random_peers(self, count: int = 5) -> List[PeerInfo]:
         """Get random peers for discovering more peers"""
         import random
-        peers = list(self.known_peers.values())
-        return random.sample(peers, min(count, len(peers)))
+        slots = random.sample(range(len(self.known_peers)), min(count, len(self.known_peers)))
+        return self.known_peers.peers(slots)
 
     def get_healthy_peers(self) -> List[PeerInfo]:
         """Get active peers with good reputation"""
-        return [
-            peer for peer in self.known_peers.values()
-            if peer.is_alive() and peer.reputation > 0.5
-        ]
+        return self.known_peers.peers(
+            self.known_peers.select(alive_timeout=300.0, min_reputation=0.5)
+        )
 
     def update_peer_reputation(self, peer_id: str, success: bool):
         """Update peer reputation based on interaction"""
@@ -153,26 +543,224 @@ class PeerDiscovery:
 
     def get_peers_by_type(self, node_type: str) -> List[PeerInfo]:
         """Get peers of specific type"""
-        return [
-            peer for peer in self.known_peers.values()
-            if peer.node_type == node_type
-        ]
+        return self.known_peers.peers(self.known_peers.select(node_type=node_type))
+
+
+class RotatingBloomFilter:
+    """
+    Time-bucketed Bloom filter for message dedup.
+
+    `buckets` filters each cover window / buckets seconds: inserts go to the
+    newest, lookups check all of them, and rotation clears the oldest. A
+    bucket that takes its share of `capacity` rotates early, so memory is
+    fixed by capacity and false_positive_rate whatever the message rate
+    (a flood shortens the window instead of growing the filter).
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        false_positive_rate: float = 1e-6,
+        window: float = 600.0,
+        buckets: int = 4
+    ):
+        self.bucket_capacity = max(1, math.ceil(capacity / buckets))
+        # A lookup ORs every bucket, so each gets 1/buckets of the error budget
+        bucket_rate = false_positive_rate / buckets
+        bits = math.ceil(-self.bucket_capacity * math.log(bucket_rate) / math.log(2) ** 2)
+        self.num_bytes = (bits + 7) // 8
+        self.num_bits = self.num_bytes * 8
+        self.num_hashes = max(1, round(self.num_bits / self.bucket_capacity * math.log(2)))
+        self.bucket_seconds = window / buckets
+        self.filters = deque(bytearray(self.num_bytes) for _ in range(buckets))
+        self.counts = deque(0 for _ in range(buckets))
+        self.rotated_at = time.time()
+
+    def _positions(self, key) -> List[int]:
+        # Raw SHA-256 digests (Message.content_id) are used as-is; any other
+        # key, str included, is hashed so the two halves below are uniform
+        if not (isinstance(key, bytes) and len(key) == 32):
+            key = hashlib.sha256(key.encode() if isinstance(key, str) else key).digest()
+        # Double hashing over two independent 64-bit halves of a digest
+        h1 = int.from_bytes(key[:8], 'big')
+        h2 = int.from_bytes(key[8:16], 'big') | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def _rotate(self):
+        elapsed = time.time() - self.rotated_at
+        if elapsed < self.bucket_seconds:
+            return
+        steps = min(int(elapsed // self.bucket_seconds), len(self.filters))
+        for _ in range(steps):
+            self._advance()
+        self.rotated_at += elapsed // self.bucket_seconds * self.bucket_seconds
+
+    def _advance(self):
+        oldest = self.filters.popleft()
+        oldest[:] = bytes(self.num_bytes)
+        self.filters.append(oldest)
+        self.counts.popleft()
+        self.counts.append(0)
+
+    @staticmethod
+    def _test(bits: bytearray, positions: List[int]) -> bool:
+        for pos in positions:
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __contains__(self, key) -> bool:
+        self._rotate()
+        positions = self._positions(key)
+        return any(self._test(bits, positions) for bits in reversed(self.filters))
+
+    def add(self, key) -> bool:
+        """Insert key; False if it was (probably) already present"""
+        self._rotate()
+        positions = self._positions(key)
+        if any(self._test(bits, positions) for bits in reversed(self.filters)):
+            return False
+        if self.counts[-1] >= self.bucket_capacity:
+            self._advance()
+            self.rotated_at = time.time()   # The new bucket gets a full period
+        bits = self.filters[-1]
+        for pos in positions:
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.counts[-1] += 1
+        return True
+
+    def __len__(self) -> int:
+        """Keys inserted into the live buckets"""
+        return sum(self.counts)
+
+    def memory_bytes(self) -> int:
+        return self.num_bytes * len(self.filters)
+
+
+# Traffic class -> (dequeue weight, max queued, drop policy). "oldest" evicts
+# the head to admit a new item (fresh blocks/votes matter most), "newest"
+# rejects the incoming item. Classes are served in this order of priority.
+TRAFFIC_CLASSES = {
+    'blocks': (16, 256, 'oldest'),
+    'votes': (8, 4096, 'oldest'),
+    'sync': (4, 1024, 'newest'),
+    'transactions': (2, 10000, 'newest'),
+    'discovery': (1, 256, 'oldest'),
+}
+
+MESSAGE_CLASSES = {
+    MessageType.BLOCK_ANNOUNCE: 'blocks',
+    MessageType.VOTE_MESSAGE: 'votes',
+    MessageType.ATTESTATION: 'votes',
+    MessageType.AGGREGATE_ATTESTATION: 'votes',
+    MessageType.BLOCK_REQUEST: 'sync',
+    MessageType.BLOCK_RESPONSE: 'sync',
+    MessageType.SYNC_REQUEST: 'sync',
+    MessageType.SYNC_RESPONSE: 'sync',
+    MessageType.TRANSACTION: 'transactions',
+    MessageType.STORAGE_PLEDGE: 'transactions',
+    MessageType.PEER_HELLO: 'discovery',
+    MessageType.PEER_DISCOVERY: 'discovery',
+    MessageType.PING: 'discovery',
+    MessageType.PONG: 'discovery',
+}
+
+
+class PriorityMessageQueue:
+    """
+    Bounded per-class deques with weighted-fair dequeue.
+
+    pop() runs smooth weighted round-robin over the non-empty classes, so a
+    backlogged class gets weight / total of the slots and a new block waits
+    at most a couple of pops behind any transaction backlog. Types not in
+    the class map (or mapped to an unconfigured class) use the last class.
+    """
+
+    def __init__(
+        self,
+        classes: Optional[Dict[str, Tuple[int, int, str]]] = None,
+        message_classes: Optional[Dict[MessageType, str]] = None
+    ):
+        self.classes = dict(classes or TRAFFIC_CLASSES)
+        self.message_classes = MESSAGE_CLASSES if message_classes is None else message_classes
+        self.queues = {name: deque() for name in self.classes}
+        self.credit = dict.fromkeys(self.classes, 0)
+        self.dropped = dict.fromkeys(self.classes, 0)
+        self._fallback = next(reversed(self.classes))
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def class_of(self, message_type: MessageType) -> str:
+        name = self.message_classes.get(message_type)
+        return name if name in self.queues else self._fallback
+
+    def push(self, message_type: MessageType, item) -> bool:
+        """Enqueue item; False if it was rejected by a full class"""
+        name = self.class_of(message_type)
+        queue = self.queues[name]
+        _, limit, policy = self.classes[name]
+        if len(queue) >= limit:
+            self.dropped[name] += 1
+            if policy != 'oldest':
+                return False
+            queue.popleft()
+            self._size -= 1
+        queue.append(item)
+        self._size += 1
+        return True
+
+    def pop(self):
+        """Next item by weighted-fair order (IndexError when empty)"""
+        if not self._size:
+            raise IndexError("pop from empty PriorityMessageQueue")
+        best, total = None, 0
+        credit = self.credit
+        for name, queue in self.queues.items():
+            if not queue:
+                credit[name] = 0            # Idle classes do not bank credit
+                continue
+            weight = self.classes[name][0]
+            credit[name] += weight
+            total += weight
+            if best is None or credit[name] > credit[best]:
+                best = name
+        credit[best] -= total
+        self._size -= 1
+        return self.queues[best].popleft()
+
+    def get_stats(self) -> Dict:
+        return {
+            name: {'queued': len(queue), 'dropped': self.dropped[name]}
+            for name, queue in self.queues.items()
+        }
 
 
 class GossipProtocol:
-    """Gossip-based message propagation"""
+    """
+    Gossip-based message propagation: dedup history and target selection.
+    There is no queue here; outbound messages are scheduled by the
+    per-connection PriorityMessageQueue in transport.Connection.
+    """
     
-    def __init__(self, max_fanout: int = 5, max_history: int = 1000):
+    def __init__(
+        self,
+        max_fanout: int = 5,
+        max_history: int = 100_000,
+        history_window: float = 600.0,
+        false_positive_rate: float = 1e-6
+    ):
         self.max_fanout = max_fanout          # Max peers to gossip to
-        self.message_history: Set[str] = set()  # Seen message hashes
-        self.max_history = max_history
-        self.message_queue: List[Message] = []
+        self.max_history = max_history        # Messages remembered per window
+        # Seen message content ids
+        self.message_history = RotatingBloomFilter(max_history, false_positive_rate, history_window)
+        self._rng = np.random.default_rng() if np is not None else None
 
     def should_propagate(self, message: Message) -> bool:
         """Check if message should be propagated"""
-        msg_hash = message.hash()
-        
-        if msg_hash in self.message_history:
+        if message.content_id() in self.message_history:
             return False
         
         if message.ttl <= 0:
@@ -182,12 +770,7 @@ class GossipProtocol:
 
     def add_to_history(self, message: Message):
         """Add message to deduplication history"""
-        msg_hash = message.hash()
-        self.message_history.add(msg_hash)
-        
-        # Limit history size
-        if len(self.message_history) > self.max_history:
-            self.message_history = set(list(self.message_history)[-self.max_history:])
+        self.message_history.add(message.content_id())
 
     def select_propagation_targets(
         self,
@@ -196,50 +779,49 @@ class GossipProtocol:
     ) -> List[PeerInfo]:
         """
         Select targets for gossip propagation.
-        Uses random sampling with reputation weighting.
+        Weighted sampling without replacement by reputation (floor 0.1):
+        A-Res keys log(u) / weight, the max_fanout largest win. One pass;
+        vectorized over PeerTable columns for large peer sets.
         """
         import random
         
-        # Filter out sender
         targets = [p for p in available_peers if p.peer_id != exclude_peer]
-        
-        if not targets:
+        count = min(self.max_fanout, len(targets))
+        if count == 0:
             return []
         
-        # Weight by reputation
-        weights = [max(0.1, p.reputation) for p in targets]
-        total_weight = sum(weights)
-        
-        if total_weight == 0:
-            return random.sample(targets, min(self.max_fanout, len(targets)))
+        weights = self._reputations(targets)
+        if weights is None:
+            log, rand = math.log, random.random
+            keyed = [
+                (log(1.0 - rand()) / max(0.1, peer.reputation), index)
+                for index, peer in enumerate(targets)
+            ]
+            return [targets[index] for _, index in heapq.nlargest(count, keyed)]
         
-        selected = []
-        for _ in range(min(self.max_fanout, len(targets))):
-            rand = random.uniform(0, total_weight)
-            cumsum = 0
-            for peer, weight in zip(targets, weights):
-                cumsum += weight
-                if rand <= cumsum:
-                    selected.append(peer)
-                    targets.remove(peer)
-                    weights.remove(weight)
-                    total_weight -= weight
-                    break
-        
-        return selected
+        n = len(targets)
+        keys = np.log1p(-self._rng.random(n)) / np.maximum(0.1, weights)
+        top = np.argpartition(keys, n - count)[n - count:]
+        top = top[np.argsort(keys[top])[::-1]]
+        return [targets[index] for index in top.tolist()]
+
+    def _reputations(self, peers: List[PeerInfo]):
+        """Reputation column for peers that are all views of one PeerTable, else None"""
+        if np is None or len(peers) <= 4 * self.max_fanout:
+            return None
+        table = peers[0]._table
+        if table is None or any(peer._table is not table for peer in peers):
+            return None
+        try:
+            return table.gather('reputation', [peer.peer_id for peer in peers])
+        except KeyError:
+            return None
 
     def add_message(self, message: Message):
-        """Add message to propagation queue"""
+        """Record an outgoing message as seen so its echoes are not relayed"""
         if self.should_propagate(message):
-            self.message_queue.append(message)
             self.add_to_history(message)
 
-    def get_propagation_batch(self, batch_size: int = 10) -> List[Message]:
-        """Get next batch of messages to propagate"""
-        batch = self.message_queue[:batch_size]
-        self.message_queue = self.message_queue[batch_size:]
-        return batch
-
 
 class MemoryPool:
     """Mempool - transaction and block synchronization pool"""
@@ -348,3 +930,134 @@ class NetworkSyncer:
         time_elapsed = time.time() - self.last_sync_time
         # Rough progress estimate (assume 5 min for full sync)
         return min(1.0, time_elapsed / 300.0)
+
+
+class AttestationAggregator:
+    """
+    Merges per-validator block attestations into one message per block.
+
+    Validators are numbered by their position in the sorted registry; an
+    aggregate carries a bitfield of who signed plus their signatures in bit
+    order. A few aggregators per block are chosen deterministically from the
+    block hash, so every node agrees on where to send attestations, and
+    relays forward an aggregate only if its signers strictly extend the best
+    aggregate they have seen for that block.
+    """
+
+    AGGREGATORS_PER_BLOCK = 2
+    MAX_TRACKED_BLOCKS = 1024
+
+    def __init__(self, validator_ids: Optional[List[str]] = None):
+        self.validators: List[str] = []
+        self.positions: Dict[str, int] = {}
+        # block_hash -> (bitfield, {position: signature}); oldest evicted first
+        self.pending: OrderedDict = OrderedDict()
+        self.published: OrderedDict = OrderedDict()   # block_hash -> best bitfield published/relayed
+        self.set_validators(validator_ids or [])
+
+    def set_validators(self, validator_ids: List[str]):
+        """Replace the validator registry (bit positions follow sorted ids)"""
+        validators = sorted(set(validator_ids))
+        if validators != self.validators:
+            self.pending.clear()    # Bitfields were built against the old positions
+        self.validators = validators
+        self.positions = {vid: i for i, vid in enumerate(self.validators)}
+
+    @staticmethod
+    def _mark(table: OrderedDict, key: str, value, limit: int):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > limit:
+            table.popitem(last=False)
+
+    def _improves(self, block_hash: str, bitfield: int) -> bool:
+        """bitfield is a strict superset of the best one published for block"""
+        best = self.published.get(block_hash)
+        return best is None or (bitfield | best == bitfield and bitfield != best)
+
+    def aggregators_for(self, block_hash: str) -> List[str]:
+        """Designated aggregators: validators with the lowest hash(block, id)"""
+        return heapq.nsmallest(
+            self.AGGREGATORS_PER_BLOCK,
+            self.validators,
+            key=lambda vid: hashlib.sha256(f"{block_hash}:{vid}".encode()).digest()
+        )
+
+    def add_attestation(self, block_hash: str, validator_id: str, signature: str) -> bool:
+        """Merge one validator's signature; False if unknown or duplicate"""
+        position = self.positions.get(validator_id)
+        if position is None:
+            return False
+        bitfield, signatures = self.pending.get(block_hash, (0, {}))
+        if bitfield >> position & 1:
+            return False
+        signatures[position] = signature
+        self._mark(self.pending, block_hash, (bitfield | (1 << position), signatures),
+                   self.MAX_TRACKED_BLOCKS)
+        return True
+
+    def attestation_count(self, block_hash: str) -> int:
+        bitfield, _ = self.pending.get(block_hash, (0, {}))
+        return bin(bitfield).count("1")
+
+    def has_quorum(self, block_hash: str) -> bool:
+        """At least 2/3 of the registry has attested"""
+        return 3 * self.attestation_count(block_hash) >= 2 * len(self.validators) > 0
+
+    def build_aggregate(self, block_hash: str) -> Optional[Dict]:
+        """
+        Aggregate payload for block and mark it published; None if nothing
+        pending adds to the best aggregate already published
+        """
+        if block_hash not in self.pending:
+            return None
+        bitfield, signatures = self.pending[block_hash]
+        if not self._improves(block_hash, bitfield):
+            return None
+        self._mark(self.published, block_hash, bitfield, self.MAX_TRACKED_BLOCKS)
+        return {
+            'block_hash': block_hash,
+            'bitfield': format(bitfield, 'x'),
+            'signatures': [signatures[i] for i in sorted(signatures)],
+            'count': len(signatures),
+            'timestamp': time.time()
+        }
+
+    def accept_aggregate(self, payload: Dict) -> bool:
+        """
+        Record a received aggregate. Returns True when it should be relayed:
+        its signers strictly extend the best aggregate seen for the block.
+        Its signatures are merged with any held locally. Bits past the
+        registry, or a signature count other than the number of set bits,
+        reject it.
+        """
+        block_hash = payload.get('block_hash')
+        if block_hash is None:
+            return False
+        try:
+            bitfield = int(payload.get('bitfield', '0'), 16)
+        except (TypeError, ValueError):
+            return False
+        signatures = payload.get('signatures', [])
+        if (bitfield < 0 or bitfield >> len(self.validators)
+                or not isinstance(signatures, list)
+                or len(signatures) != bin(bitfield).count("1")):
+            return False
+        if not self._improves(block_hash, bitfield):
+            return False
+        held_bits, held = self.pending.get(block_hash, (0, {}))
+        signatures = iter(signatures)
+        merged = dict(held)
+        position = 0
+        while bitfield >> position:
+            if bitfield >> position & 1:
+                merged[position] = next(signatures)
+            position += 1
+        self._mark(self.pending, block_hash, (held_bits | bitfield, merged), self.MAX_TRACKED_BLOCKS)
+        self._mark(self.published, block_hash, bitfield, self.MAX_TRACKED_BLOCKS)
+        return True
+
+    def signers(self, block_hash: str) -> List[str]:
+        """Validator ids whose attestation for block is known"""
+        bitfield, _ = self.pending.get(block_hash, (0, {}))
+        return [vid for i, vid in enumerate(self.validators) if bitfield >> i & 1]
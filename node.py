@@ -6,9 +6,12 @@ FCU Blockchain Node Implementations
 """
 
 import time
+import asyncio
 import hashlib
 import json
-from typing import Dict, List, Optional, Tuple
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass, field
 
 from core import (
@@ -17,22 +20,33 @@ from core import (
 )
 from consensus import (
     PoCMiner, PoSValidator, PoSConsensus, PoWLottery,
-    PoCDifficulty
+    PoCDifficulty, DifficultyRetarget, StakeWeightedValidatorSet
 )
+import plot
 from network import (
     PeerDiscovery, GossipProtocol, MemoryPool, NetworkSyncer,
-    Message, MessageType, PeerInfo
+    Message, MessageType, PeerInfo, AttestationAggregator
 )
+from transport import PeerTransport
 
 
 class FCUNode:
     """Base FCU Blockchain Node"""
     
-    def __init__(self, node_id: str, host: str = "127.0.0.1", port: int = 8000):
+    def __init__(
+        self,
+        node_id: str,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        data_dir: Optional[str] = None,
+        genesis_validators: Optional[Dict[str, float]] = None
+    ):
         self.node_id = node_id
         self.host = host
         self.port = port
-        self.blockchain = Blockchain()
+        # With data_dir the chain persists and restarts resume from the latest snapshot;
+        # genesis_validators (address -> stake) only shapes a newly created chain
+        self.blockchain = Blockchain(data_dir=data_dir, genesis_validators=genesis_validators)
         self.peer_discovery = PeerDiscovery()
         self.gossip = GossipProtocol()
         self.mempool = MemoryPool()
@@ -46,6 +60,11 @@ class FCUNode:
         )
         self.connected_peers: Dict[str, PeerInfo] = {}
         self.block_times: List[float] = []
+        self.attestations = AttestationAggregator()
+        self._registry_tip: Optional[str] = None   # Chain tip the registry was built at
+        self.transport: Optional[PeerTransport] = None
+        # message_type value -> seconds since origin, for first arrivals over TCP
+        self.propagation_delays: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=10000))
 
     def connect_peer(self, peer_info: PeerInfo) -> bool:
         """Connect to another peer"""
@@ -60,6 +79,93 @@ class FCUNode:
             return True
         return False
 
+    def _refresh_validator_registry(self):
+        """Attestation bit positions: the chain's validators (genesis and staked) as of the tip"""
+        tip = self.blockchain.get_latest_block().hash
+        if tip != self._registry_tip:
+            self.attestations.set_validators(self.blockchain.get_validators())
+            self._registry_tip = tip
+
+    async def start_network(
+        self,
+        bootstrap: Optional[List[Tuple[str, int]]] = None,
+        ping_interval: float = 15.0,
+        traffic_classes: Optional[Dict[str, Tuple[int, int, str]]] = None
+    ) -> List[str]:
+        """
+        Listen on host:port over TCP and dial bootstrap peers; returns connected peer ids.
+        traffic_classes overrides network.TRAFFIC_CLASSES for outbound queues.
+        """
+        self.node_info.port = self.port
+        self.transport = PeerTransport(
+            self.node_info,
+            on_message=self.handle_network_message,
+            on_peer=self.connect_peer,
+            on_seen=self._mark_peer_seen,
+            on_disconnect=self.disconnect_peer,
+            ping_interval=ping_interval,
+            peer_timeout=4 * ping_interval,
+            traffic_classes=traffic_classes
+        )
+        await self.transport.start()
+        self.port = self.node_info.port
+        connected = []
+        for host, port in bootstrap or []:
+            peer_id = await self.dial_peer(host, port)
+            if peer_id is not None:
+                connected.append(peer_id)
+        return connected
+
+    async def dial_peer(self, host: str, port: int) -> Optional[str]:
+        """Open (or reuse) the TCP connection to host:port; returns the peer id"""
+        try:
+            return await self.transport.connect(host, port)
+        except OSError as e:
+            print(f"[{self.node_id}] Could not reach {host}:{port}: {e}")
+            return None
+
+    async def stop_network(self):
+        if self.transport is not None:
+            await self.transport.close()
+            self.transport = None
+
+    def close(self):
+        """Release node resources; the chain's block store is flushed and closed"""
+        self.blockchain.close()
+
+    def _mark_peer_seen(self, peer_id: str):
+        # The peer table row drives broadcast liveness; the connected object
+        # may be bound to another table
+        now = time.time()
+        for peers in (self.connected_peers, self.peer_discovery.known_peers):
+            peer = peers.get(peer_id)
+            if peer is not None:
+                peer.last_seen = now
+
+    def handle_network_message(self, message: Message, peer_id: str):
+        """Transport callback: dedupe/relay, then apply the payload locally"""
+        arrived = time.time()
+        if not self.receive_message(message, from_peer=peer_id):
+            return
+        self.propagation_delays[message.message_type.value].append(arrived - message.timestamp)
+        if message.message_type == MessageType.BLOCK_ANNOUNCE:
+            self.mempool.add_block(message.payload)
+        elif message.message_type == MessageType.TRANSACTION:
+            self.mempool.add_transaction(message.payload)
+
+    def send_message(self, peer_id: str, message: Message) -> bool:
+        """Send message directly to one peer (no gossip)"""
+        peer = self.connected_peers.get(peer_id)
+        if peer is None or not peer.is_alive():
+            return False
+        return self._send(peer_id, message)
+
+    def _send(self, peer_id: str, message: Message) -> bool:
+        # Caller has already checked the peer is connected and alive
+        if self.transport is None:
+            return True
+        return self.transport.send(peer_id, message)
+
     def broadcast_message(
         self,
         message: Message,
@@ -71,28 +177,71 @@ class FCUNode:
         """
         self.gossip.add_message(message)
         
-        available_peers = [
-            p for p in self.connected_peers.values()
-            if p.peer_id != exclude_peer and p.is_alive()
-        ]
+        # One vectorized liveness pass over the peer table (PeerInfo.is_alive default)
+        table = self.peer_discovery.known_peers
+        alive = table.select(alive_timeout=300.0)
+        available_peers = table.peers([
+            slot for slot, peer_id in zip(alive, table.ids(alive))
+            if peer_id in self.connected_peers and peer_id != exclude_peer
+        ])
         
         targets = self.gossip.select_propagation_targets(available_peers, exclude_peer)
-        return len(targets)
+        return sum(self._send(peer.peer_id, message) for peer in targets)
 
-    def receive_message(self, message: Message) -> bool:
-        """Receive message from peer"""
+    def receive_message(self, message: Message, from_peer: Optional[str] = None) -> bool:
+        """Receive message from peer (from_peer: the hop it arrived on, if known)"""
         if not self.gossip.should_propagate(message):
             return False
         
+        if message.message_type == MessageType.ATTESTATION:
+            # Point-to-point to an aggregator; never relayed
+            payload = message.payload
+            return self.receive_attestation(
+                payload.get('block_hash'), payload.get('validator_id'), payload.get('signature')
+            )
+        
+        if message.message_type == MessageType.AGGREGATE_ATTESTATION:
+            # Relay only aggregates that add signers to the best one seen
+            self._refresh_validator_registry()
+            if not self.attestations.accept_aggregate(message.payload):
+                return False
+        
         self.gossip.add_to_history(message)
         
         # Decrement TTL and re-broadcast if TTL > 0
         message.ttl -= 1
         if message.ttl > 0:
-            self.broadcast_message(message, message.sender_id)
+            self.broadcast_message(message, from_peer or message.sender_id)
         
         return True
 
+    def receive_attestation(self, block_hash: str, validator_id: str, signature: str) -> bool:
+        """Aggregator side: merge an attestation, publish once 2/3 have signed"""
+        self._refresh_validator_registry()
+        if not self.attestations.add_attestation(block_hash, validator_id, signature):
+            return False
+        if self.attestations.has_quorum(block_hash):
+            self.publish_aggregate(block_hash)
+        return True
+
+    def publish_aggregate(self, block_hash: str) -> bool:
+        """Broadcast the merged attestations for block if they add to what was published"""
+        payload = self.attestations.build_aggregate(block_hash)
+        if payload is None:
+            return False
+        message = Message(
+            message_id=f"agg_{block_hash}_{payload['bitfield']}",
+            message_type=MessageType.AGGREGATE_ATTESTATION,
+            sender_id=self.node_id,
+            payload=payload
+        )
+        self.broadcast_message(message)
+        return True
+
+    def flush_attestations(self) -> int:
+        """Publish pending attestations that add to each block's published aggregate (e.g. short of quorum)"""
+        return sum(self.publish_aggregate(block_hash) for block_hash in list(self.attestations.pending))
+
     def receive_transaction(self, tx_data: Dict) -> bool:
         """Receive transaction from network"""
         if self.mempool.add_transaction(tx_data):
@@ -157,25 +306,39 @@ class PoCMinerNode(FCUNode):
         node_id: str,
         storage_gb: float = 256.0,
         host: str = "127.0.0.1",
-        port: int = 8000
+        port: int = 8000,
+        data_dir: Optional[str] = None,
+        mining_workers: int = 1,
+        plot_dir: Optional[Union[str, List[str]]] = None,
+        genesis_validators: Optional[Dict[str, float]] = None
     ):
-        super().__init__(node_id, host, port)
+        super().__init__(node_id, host, port, data_dir, genesis_validators)
         self.node_info.node_type = "poc_miner"
-        self.miner = PoCMiner(node_id, storage_gb)
+        self.miner = PoCMiner(node_id, storage_gb, workers=mining_workers, plot_dir=plot_dir)
         self.mining_rewards: Dict[str, float] = {}
         self.is_mining = False
         self.mining_difficulty = PoCDifficulty.INITIAL_DIFFICULTY
+        self.retarget = DifficultyRetarget(self.mining_difficulty)
+        self.last_deadline: Optional[int] = None
+        self.pending_forge = None   # TimerHandle/Timer of a plot block waiting for its deadline
+        self.blockchain.block_listeners.append(self._on_block_committed)
+
+    async def stop_network(self):
+        self.cancel_forge()
+        await super().stop_network()
+        self.miner.close()      # Worker pools restart on the next mining round
+
+    def close(self):
+        self.cancel_forge()
+        self.miner.close()
+        super().close()
 
     def update_mining_difficulty(self):
-        """Update PoC difficulty based on block times"""
-        if len(self.block_times) >= PoCDifficulty.DIFFICULTY_ADJUSTMENT_BLOCKS:
-            recent_times = self.block_times[-PoCDifficulty.DIFFICULTY_ADJUSTMENT_BLOCKS:]
-            network_capacity = self._estimate_network_capacity()
-            
-            self.mining_difficulty = PoCDifficulty.calculate_new_difficulty(
-                self.mining_difficulty,
-                recent_times,
-                network_capacity
+        """Retarget PoC difficulty from the rolling window of block times"""
+        if self.block_times:
+            self.mining_difficulty = self.retarget.record(
+                self.block_times[-1],
+                self._estimate_network_capacity()
             )
 
     def _estimate_network_capacity(self) -> float:
@@ -187,14 +350,32 @@ class PoCMinerNode(FCUNode):
                 capacity += 256.0  # Assume 256GB per miner (placeholder)
         return capacity
 
+    def _mine_with_plots(self, latest_block: Block) -> Tuple[Optional[int], int, int]:
+        """Scan plots for the best deadline; returns (nonce, deadline_seconds, base_target)"""
+        gen_sig = plot.generation_signature(latest_block.hash, latest_block.miner)
+        base_target = self.blockchain.next_base_target()   # Derived from the chain; peers check it
+        nonce, deadline = self.miner.mine_deadline(gen_sig, latest_block.index + 1, base_target)
+        if nonce is None:
+            return None, 0, base_target
+        
+        self.last_deadline = deadline
+        return nonce, deadline, base_target
+
     def mine_block(self) -> Optional[Block]:
-        """Mine new block using PoC"""
+        """
+        Mine new block using PoC.
+        A plot-forged block is only valid once its deadline has passed since
+        its parent; until then the forge is scheduled (pending_forge) and None
+        is returned. A new tip cancels the scheduled forge.
+        """
         if self.is_mining:
             return None
         
         self.is_mining = True
         
         try:
+            self.cancel_forge()
+            
             # Get pending transactions
             pending_txs = self.mempool.get_pending_transactions(limit=100)
             
@@ -210,50 +391,116 @@ class PoCMinerNode(FCUNode):
             
             # Mine block
             latest_block = self.blockchain.get_latest_block()
-            prev_hash = latest_block.hash
             
-            start_time = time.time()
-            nonce, mine_time = self.miner.mine_block(
-                prev_hash,
-                self.mining_difficulty,
-                timeout=30.0
-            )
+            base_target = None
+            if self.miner.plots:
+                nonce, deadline, base_target = self._mine_with_plots(latest_block)
+            else:
+                nonce, mine_time = self.miner.mine_block(
+                    latest_block.hash,
+                    self.mining_difficulty,
+                    timeout=30.0
+                )
             
             if nonce is None:
                 return None
             
-            # Create new block
-            new_block = Block(
-                index=latest_block.index + 1,
-                previous_hash=prev_hash,
-                timestamp=time.time(),
-                transactions=transactions,
-                miner=self.miner.miner_id,
-                validators=[],  # Will be filled by PoS validators
-                poc_difficulty=self.mining_difficulty,
-                nonce=nonce
-            )
+            if base_target is not None:
+                # Peers reject the block until the deadline has elapsed since its parent
+                forge_at = latest_block.timestamp + deadline
+                delay = forge_at - time.time()
+                if delay > 0:
+                    self.pending_forge = self._schedule(delay, lambda: self._forge_scheduled(
+                        latest_block, transactions, nonce, base_target, forge_at
+                    ))
+                    return None
+                return self._forge(latest_block, transactions, nonce, base_target, forge_at)
             
-            self.block_times.append(mine_time)
-            self.blockchain.chain.append(new_block)
+            new_block = self._forge(latest_block, transactions, nonce)
             
-            # Update difficulty
+            # Hash difficulty retargets on hash-ground blocks only; plot
+            # deadlines are governed by the base target
+            self.block_times.append(mine_time)
             self.update_mining_difficulty()
-            
-            # Broadcast block
-            message = Message(
-                message_id=f"blk_{new_block.hash}",
-                message_type=MessageType.BLOCK_ANNOUNCE,
-                sender_id=self.node_id,
-                payload=new_block.to_dict()
-            )
-            self.broadcast_message(message)
-            
             return new_block
         
         finally:
             self.is_mining = False
 
+    @staticmethod
+    def _schedule(delay: float, callback):
+        """Run callback after delay on the running event loop, else on a timer thread"""
+        try:
+            return asyncio.get_running_loop().call_later(delay, callback)
+        except RuntimeError:    # Not called from the loop (standalone mining)
+            timer = threading.Timer(delay, callback)
+            timer.daemon = True
+            timer.start()
+            return timer
+
+    def cancel_forge(self):
+        """Drop a scheduled forge, if any"""
+        if self.pending_forge is not None:
+            self.pending_forge.cancel()
+            self.pending_forge = None
+
+    def _on_block_committed(self, block: Block):
+        # The scheduled block's parent is no longer the tip
+        self.cancel_forge()
+
+    def _forge_scheduled(
+        self,
+        parent: Block,
+        transactions: List[Transaction],
+        nonce: int,
+        base_target: int,
+        forge_at: float
+    ):
+        self.pending_forge = None
+        if self.blockchain.get_latest_block().hash != parent.hash:
+            return
+        self._forge(parent, transactions, nonce, base_target, forge_at)
+
+    def _forge(
+        self,
+        parent: Block,
+        transactions: List[Transaction],
+        nonce: int,
+        base_target: Optional[int] = None,
+        not_before: float = 0.0
+    ) -> Block:
+        """Build the block on parent, commit it and announce it"""
+        # Apply transactions so the header commits to post-block state
+        self.blockchain.begin_block()
+        self.blockchain.process_transactions(transactions)
+        
+        # Create new block
+        new_block = Block(
+            index=parent.index + 1,
+            previous_hash=parent.hash,
+            timestamp=max(time.time(), not_before),
+            transactions=transactions,
+            miner=self.miner.miner_id,
+            validators=[],  # Will be filled by PoS validators
+            poc_difficulty=self.mining_difficulty,
+            nonce=nonce,
+            state_root=self.blockchain.get_state_root(),
+            base_target=base_target
+        )
+        
+        self.blockchain.commit_block(new_block)
+        
+        # Broadcast block
+        message = Message(
+            message_id=f"blk_{new_block.hash}",
+            message_type=MessageType.BLOCK_ANNOUNCE,
+            sender_id=self.node_id,
+            payload=new_block.to_dict()
+        )
+        self.broadcast_message(message)
+        
+        return new_block
+
     def get_mining_stats(self) -> Dict:
         """Get miner statistics"""
         return {
@@ -261,6 +508,11 @@ class PoCMinerNode(FCUNode):
             'storage_capacity_gb': self.miner.storage_capacity_gb,
             'blocks_mined': self.miner.total_blocks_mined,
             'current_difficulty': self.mining_difficulty,
+            'plot_files': len(self.miner.plots),
+            'last_deadline': self.last_deadline,
+            'last_scan_time': self.miner.last_scan.scan_time if self.miner.last_scan else None,
+            'drive_scan_times': dict(self.miner.last_scan.drive_times) if self.miner.last_scan else {},
+            'drive_scan_errors': dict(self.miner.last_scan.drive_errors) if self.miner.last_scan else {},
             'avg_block_time': sum(self.block_times) / len(self.block_times) if self.block_times else 0,
             'mining_rewards': sum(self.mining_rewards.values())
         }
@@ -275,14 +527,35 @@ class PoSValidatorNode(FCUNode):
         role: str = PoSValidator.ROLE_VALIDATOR,
         initial_stake: float = 5000.0,
         host: str = "127.0.0.1",
-        port: int = 8000
+        port: int = 8000,
+        data_dir: Optional[str] = None,
+        genesis_validators: Optional[Dict[str, float]] = None
     ):
-        super().__init__(node_id, host, port)
+        # The initial stake is credited in the genesis block, so snapshot
+        # boot and block replay agree on the validator's balance
+        genesis_validators = dict(genesis_validators or {})
+        genesis_validators.setdefault(node_id, initial_stake)
+        super().__init__(node_id, host, port, data_dir, genesis_validators)
         self.node_info.node_type = "pos_validator"
         self.validator = PoSValidator(node_id, role, min_stake=1000.0)
         self.validator.total_staked = initial_stake
-        self.blockchain.state[node_id] = initial_stake
         self.validation_rewards: Dict[str, float] = {}
+        
+        # Committees come from chain stakes frozen at epoch boundaries. A fresh
+        # chain freezes epoch 0 from genesis; a reopened one has no committee
+        # until the next boundary block is applied
+        self.validator_set = StakeWeightedValidatorSet(seed=self.blockchain.chain_id)
+        self.validator_set.set_stakes(self.blockchain.get_validator_stakes())
+        if self.blockchain.get_chain_length() == 1:
+            self.validator_set.freeze_stakes(0)
+        self.consensus = PoSConsensus(self.validator, validator_set=self.validator_set)
+        self.blockchain.block_listeners.append(self._on_block_committed)
+
+    def _on_block_committed(self, block: Block):
+        # Stakes only matter where record_block freezes them: an epoch's last block
+        if (block.index + 1) % self.validator_set.epoch_blocks == 0:
+            self.validator_set.set_stakes(self.blockchain.get_validator_stakes())
+        self.validator_set.record_block(block.index)
 
     def validate_block(self, block_data: Dict) -> bool:
         """Validate and sign block"""
@@ -295,10 +568,10 @@ class PoSValidatorNode(FCUNode):
         # Sign block
         signature = self._sign_block(block_hash)
         
-        # Broadcast validation
+        # Send attestation to the block's aggregators instead of gossiping it
         message = Message(
-            message_id=f"validate_{block_hash}",
-            message_type=MessageType.VOTE_MESSAGE,
+            message_id=f"attest_{block_hash}_{self.node_id}",
+            message_type=MessageType.ATTESTATION,
             sender_id=self.node_id,
             payload={
                 'block_hash': block_hash,
@@ -307,7 +580,12 @@ class PoSValidatorNode(FCUNode):
                 'timestamp': time.time()
             }
         )
-        self.broadcast_message(message)
+        self._refresh_validator_registry()
+        for aggregator_id in self.attestations.aggregators_for(block_hash):
+            if aggregator_id == self.node_id:
+                self.receive_attestation(block_hash, self.validator.validator_id, signature)
+            else:
+                self.send_message(aggregator_id, message)
         
         self.validator.validate_block(block_hash)
         return True
@@ -383,9 +661,11 @@ class FullNode(FCUNode):
         self,
         node_id: str,
         host: str = "127.0.0.1",
-        port: int = 8000
+        port: int = 8000,
+        data_dir: Optional[str] = None,
+        genesis_validators: Optional[Dict[str, float]] = None
     ):
-        super().__init__(node_id, host, port)
+        super().__init__(node_id, host, port, data_dir, genesis_validators)
         self.node_info.node_type = "full_node"
         self.last_block_received = time.time()
 
@@ -415,17 +695,7 @@ class FullNode(FCUNode):
 
     def _dict_to_transaction(self, tx_data: Dict) -> Transaction:
         """Convert dictionary to Transaction object"""
-        return Transaction(
-            tx_id=tx_data.get('tx_id'),
-            timestamp=tx_data.get('timestamp'),
-            sender=tx_data.get('sender'),
-            receiver=tx_data.get('receiver'),
-            amount=tx_data.get('amount'),
-            tx_type=TransactionType(tx_data.get('tx_type', 'transfer')),
-            nonce=tx_data.get('nonce', 0),
-            signature=tx_data.get('signature'),
-            data=tx_data.get('data', {})
-        )
+        return Transaction.from_dict(tx_data)
 
     def get_full_node_stats(self) -> Dict:
         """Get full node statistics"""
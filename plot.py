@@ -0,0 +1,468 @@
+"""
+FCU Blockchain Capacity Plots (Signum PoC2-style)
+- Plotter: writes nonces x scoops plot files to a directory
+- Generation signature and per-block scoop selection
+- Deadlines from a single scoop read per plot file
+- Base target retarget from recent plot-forged blocks
+- PlotScanner: one reader thread per drive feeding a hashing pool
+
+A nonce is 4096 scoops of 64 bytes (256 KiB). Files are stored scoop-major,
+so mining a block reads one contiguous run of `nonces * 64` bytes per file
+and hashes it once; the work is bounded by disk reads, not CPU.
+SHA-256 stands in for Signum's Shabal-256 (not available in hashlib).
+"""
+
+import os
+import mmap
+import time
+import struct
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+HASH_SIZE = 32
+HASH_CAP = 4096
+SCOOPS_PER_NONCE = 4096
+SCOOP_SIZE = 2 * HASH_SIZE
+NONCE_SIZE = SCOOPS_PER_NONCE * SCOOP_SIZE      # 256 KiB
+NONCES_PER_GB = (1 << 30) // NONCE_SIZE
+
+_SEED = struct.Struct(">QQ")                      # account id, nonce
+_HEIGHT = struct.Struct(">Q")
+MAX_HIT = (1 << 64) - 1
+
+TARGET_BLOCK_TIME = 22.5                          # seconds between plot-forged blocks
+INITIAL_CAPACITY_GB = 1.0                         # Network size assumed by the first base target
+RETARGET_BLOCKS = 4                               # Base targets averaged per retarget
+
+
+def account_id_for(miner_id: str) -> int:
+    """Numeric plot account id for a miner name (first 8 bytes of its hash)"""
+    return int.from_bytes(hashlib.sha256(miner_id.encode()).digest()[:8], 'big')
+
+
+def generate_nonce(account_id: int, nonce: int) -> bytes:
+    """
+    Plot data for one nonce in PoC2 layout.
+    Hashes are chained backwards from the (account, nonce) seed, the whole
+    buffer is XORed with its final hash, then the second half of each scoop
+    is swapped with that of its mirror scoop.
+    """
+    gendata = bytearray(NONCE_SIZE + _SEED.size)
+    gendata[NONCE_SIZE:] = _SEED.pack(account_id, nonce)
+    view = memoryview(gendata)
+    sha256 = hashlib.sha256
+    end = len(gendata)
+    for i in range(NONCE_SIZE, 0, -HASH_SIZE):
+        view[i - HASH_SIZE:i] = sha256(view[i:min(end, i + HASH_CAP)]).digest()
+    final = sha256(gendata).digest()
+    data = (
+        int.from_bytes(view[:NONCE_SIZE], 'big')
+        ^ int.from_bytes(final * (NONCE_SIZE // HASH_SIZE), 'big')
+    ).to_bytes(NONCE_SIZE, 'big')
+
+    # PoC2 shuffle: scoop n keeps its first hash, takes scoop 4095-n's second
+    out = bytearray(data)
+    for scoop in range(SCOOPS_PER_NONCE):
+        mirror = SCOOPS_PER_NONCE - 1 - scoop
+        dst = scoop * SCOOP_SIZE + HASH_SIZE
+        src = mirror * SCOOP_SIZE + HASH_SIZE
+        out[dst:dst + HASH_SIZE] = data[src:src + HASH_SIZE]
+    return bytes(out)
+
+
+def generation_signature(previous_hash: str, previous_generator: str) -> bytes:
+    """Per-block generation signature: previous block hash chained with its miner"""
+    return hashlib.sha256(
+        previous_hash.encode() + _HEIGHT.pack(account_id_for(previous_generator))
+    ).digest()
+
+
+def scoop_number(gen_sig: bytes, height: int) -> int:
+    """Scoop every miner must read for this block"""
+    digest = hashlib.sha256(gen_sig + _HEIGHT.pack(height)).digest()
+    return int.from_bytes(digest[-2:], 'big') % SCOOPS_PER_NONCE
+
+
+def calculate_hit(gen_sig: bytes, scoop_data: bytes) -> int:
+    """64-bit hit value of one scoop"""
+    return int.from_bytes(hashlib.sha256(gen_sig + scoop_data).digest()[:8], 'little')
+
+
+def base_target_for(network_capacity_gb: float, block_time: float) -> int:
+    """
+    Base target such that the best deadline across `network_capacity_gb`
+    averages `block_time` seconds (min of N uniform hits ~ 2^64 / N).
+    """
+    network_nonces = max(1, int(network_capacity_gb * NONCES_PER_GB))
+    return max(1, int(MAX_HIT / (network_nonces * block_time)))
+
+
+INITIAL_BASE_TARGET = base_target_for(INITIAL_CAPACITY_GB, TARGET_BLOCK_TIME)
+
+
+def next_base_target(recent: Sequence[Tuple[float, int]]) -> int:
+    """
+    Base target of the next block, derived only from the chain (Signum-style).
+    `recent` holds (timestamp, base_target) of the latest consecutive
+    plot-forged blocks, oldest first. The average base target of the last
+    RETARGET_BLOCKS is scaled by actual over target block time and moves at
+    most 10% per block; without history the initial base target applies.
+    """
+    if not recent:
+        return INITIAL_BASE_TARGET
+    last = recent[-1][1]
+    window = recent[-(RETARGET_BLOCKS + 1):]
+    if len(window) < 2:
+        return last
+    intervals = len(window) - 1
+    average = sum(base_target for _, base_target in window[1:]) // intervals
+    elapsed_ms = max(1, int((window[-1][0] - window[0][0]) * 1000))
+    base_target = average * elapsed_ms // (int(TARGET_BLOCK_TIME * 1000) * intervals)
+    return max(1, min(max(base_target, last * 9 // 10), last * 11 // 10, MAX_HIT))
+
+
+def deadline_for(account_id: int, nonce: int, gen_sig: bytes, height: int, base_target: int) -> int:
+    """Deadline (seconds) of a single regenerated nonce"""
+    scoop = scoop_number(gen_sig, height)
+    data = generate_nonce(account_id, nonce)
+    hit = calculate_hit(gen_sig, data[scoop * SCOOP_SIZE:(scoop + 1) * SCOOP_SIZE])
+    return hit // base_target
+
+
+def verify_deadline(
+    account_id: int,
+    nonce: int,
+    gen_sig: bytes,
+    height: int,
+    base_target: int,
+    deadline: int
+) -> bool:
+    """Recompute a submitted deadline from a single regenerated nonce"""
+    return deadline_for(account_id, nonce, gen_sig, height, base_target) == deadline
+
+
+class PlotFile:
+    """
+    One plot file named <account_id>_<start_nonce>_<nonces>, scoop-major:
+    scoop s of every nonce lives at [s * nonces * 64, (s + 1) * nonces * 64).
+    """
+
+    def __init__(self, path: str, account_id: int, start_nonce: int, nonces: int):
+        self.path = path
+        self.account_id = account_id
+        self.start_nonce = start_nonce
+        self.nonces = nonces
+
+    @classmethod
+    def from_path(cls, path: str) -> Optional['PlotFile']:
+        """Parse a plot file name; None if it is not a complete plot"""
+        try:
+            account_id, start_nonce, nonces = (int(part) for part in os.path.basename(path).split('_'))
+        except ValueError:
+            return None
+        if nonces <= 0 or os.path.getsize(path) != nonces * NONCE_SIZE:
+            return None
+        return cls(path, account_id, start_nonce, nonces)
+
+    @property
+    def capacity_gb(self) -> float:
+        return self.nonces * NONCE_SIZE / (1 << 30)
+
+    def scoop_offset(self, scoop: int) -> int:
+        return scoop * self.nonces * SCOOP_SIZE
+
+    def read_scoop(self, scoop: int) -> bytes:
+        """All nonces' data for one scoop: a single sequential read"""
+        size = self.nonces * SCOOP_SIZE
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            data = os.pread(fd, size, self.scoop_offset(scoop))
+        finally:
+            os.close(fd)
+        if len(data) != size:
+            raise IOError(f"short read from plot {self.path}")
+        return data
+
+    def best_deadline(self, gen_sig: bytes, scoop_data: bytes, base_target: int) -> Tuple[int, int]:
+        """(nonce, deadline) of the best hit in an already-read scoop"""
+        return best_in_scoop(gen_sig, scoop_data, self.start_nonce, base_target)
+
+
+def best_in_scoop(
+    gen_sig: bytes,
+    scoop_data: bytes,
+    start_nonce: int,
+    base_target: int
+) -> Tuple[int, int]:
+    """(nonce, deadline) with the lowest hit among consecutive scoop entries"""
+    midstate = hashlib.sha256(gen_sig)
+    view = memoryview(scoop_data)
+    best_hit = MAX_HIT + 1
+    best_index = -1
+    for index, offset in enumerate(range(0, len(view), SCOOP_SIZE)):
+        h = midstate.copy()
+        h.update(view[offset:offset + SCOOP_SIZE])
+        hit = int.from_bytes(h.digest()[:8], 'little')
+        if hit < best_hit:
+            best_hit = hit
+            best_index = index
+    return start_nonce + best_index, best_hit // base_target
+
+
+def _generate_range(account_id: int, start: int, count: int) -> bytes:
+    return b"".join(generate_nonce(account_id, nonce) for nonce in range(start, start + count))
+
+
+class Plotter:
+    """Creates plot files in plot_dir"""
+
+    CHUNK_NONCES = 16   # Nonces generated per write pass (4 MiB buffer)
+
+    def __init__(self, plot_dir: str, workers: int = 1):
+        self.plot_dir = plot_dir
+        self.workers = workers
+        os.makedirs(plot_dir, exist_ok=True)
+
+    def plot(self, account_id: int, start_nonce: int, nonces: int) -> PlotFile:
+        """Generate `nonces` nonces into a new scoop-major plot file"""
+        name = f"{account_id}_{start_nonce}_{nonces}"
+        path = os.path.join(self.plot_dir, name)
+        tmp_path = path + ".plotting"
+        chunks = [
+            (start, min(self.CHUNK_NONCES, start_nonce + nonces - start))
+            for start in range(start_nonce, start_nonce + nonces, self.CHUNK_NONCES)
+        ]
+
+        with open(tmp_path, "wb") as f:
+            f.truncate(nonces * NONCE_SIZE)
+            fd = f.fileno()
+            for (start, count), data in zip(chunks, self._generate(account_id, chunks)):
+                self._write_chunk(fd, data, start - start_nonce, count, nonces)
+            f.flush()
+            os.fsync(fd)
+        os.replace(tmp_path, path)
+        return PlotFile(path, account_id, start_nonce, nonces)
+
+    def plot_capacity(self, miner_id: str, capacity_gb: float, start_nonce: int = 0) -> PlotFile:
+        """Plot roughly capacity_gb for a miner name"""
+        nonces = max(1, int(capacity_gb * NONCES_PER_GB))
+        return self.plot(account_id_for(miner_id), start_nonce, nonces)
+
+    def _generate(self, account_id: int, chunks: List[Tuple[int, int]]) -> Iterable[bytes]:
+        if self.workers <= 1:
+            for start, count in chunks:
+                yield _generate_range(account_id, start, count)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            yield from executor.map(
+                _generate_range,
+                [account_id] * len(chunks),
+                [start for start, _ in chunks],
+                [count for _, count in chunks]
+            )
+
+    @staticmethod
+    def _write_chunk(fd: int, data: bytes, first: int, count: int, nonces: int):
+        """Scatter nonce-major chunk data into the scoop-major file"""
+        view = memoryview(data)
+        for scoop in range(SCOOPS_PER_NONCE):
+            offset = scoop * SCOOP_SIZE
+            run = b"".join(
+                view[n * NONCE_SIZE + offset:n * NONCE_SIZE + offset + SCOOP_SIZE]
+                for n in range(count)
+            )
+            os.pwrite(fd, run, (scoop * nonces + first) * SCOOP_SIZE)
+
+
+def load_plots(plot_dir: str, account_id: Optional[int] = None) -> List[PlotFile]:
+    """Complete plot files in plot_dir, optionally for a single account"""
+    if not os.path.isdir(plot_dir):
+        return []
+    plots = []
+    for name in sorted(os.listdir(plot_dir)):
+        plot = PlotFile.from_path(os.path.join(plot_dir, name))
+        if plot is not None and (account_id is None or plot.account_id == account_id):
+            plots.append(plot)
+    return plots
+
+
+@dataclass
+class ScanResult:
+    """Best deadline of one mining round plus per-drive timings"""
+    nonce: Optional[int] = None
+    deadline: Optional[int] = None
+    account_id: Optional[int] = None
+    plot_path: Optional[str] = None
+    scoop: int = 0
+    scan_time: float = 0.0
+    bytes_read: int = 0
+    drive_times: Dict[str, float] = field(default_factory=dict)
+    drive_errors: Dict[str, str] = field(default_factory=dict)   # Drives whose read failed mid-round
+
+    def offer(self, plot_file: PlotFile, nonce: int, deadline: int):
+        if self.deadline is None or deadline < self.deadline:
+            self.nonce = nonce
+            self.deadline = deadline
+            self.account_id = plot_file.account_id
+            self.plot_path = plot_file.path
+
+    def merge(self, other: 'ScanResult'):
+        if other.deadline is not None and (self.deadline is None or other.deadline < self.deadline):
+            self.nonce = other.nonce
+            self.deadline = other.deadline
+            self.account_id = other.account_id
+            self.plot_path = other.plot_path
+
+
+class PlotScanner:
+    """
+    Scans plots spread over several drives for the best deadline.
+
+    Each directory (one per physical drive) gets its own reader thread that
+    walks its plots' scoop runs in large sequential chunks. With
+    hash_workers > 0 chunks are hashed in a process pool (hashing 96-byte
+    messages holds the GIL, so threads would not help); with 0 each reader
+    hashes its own chunks in place from a reused readinto() buffer.
+    """
+
+    CHUNK_SIZE = 4 << 20        # Bytes per sequential read
+    ALIGNMENT = 4096            # Chunk sizes stay page and scoop aligned
+    MAX_INFLIGHT = 4            # Chunks queued to the pool per reader
+
+    def __init__(
+        self,
+        plot_dirs: Union[str, Sequence[str]],
+        account_id: Optional[int] = None,
+        hash_workers: int = 0,
+        chunk_size: int = CHUNK_SIZE,
+        use_mmap: bool = False
+    ):
+        if isinstance(plot_dirs, str):
+            plot_dirs = [plot_dirs]
+        self.plot_dirs = list(plot_dirs)
+        self.account_id = account_id
+        self.hash_workers = hash_workers
+        self.chunk_size = max(self.ALIGNMENT, chunk_size - chunk_size % self.ALIGNMENT)
+        self.use_mmap = use_mmap
+        self.drives: Dict[str, List[PlotFile]] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.reload()
+
+    def reload(self):
+        """Re-read plot directories"""
+        self.drives = {
+            plot_dir: load_plots(plot_dir, self.account_id)
+            for plot_dir in self.plot_dirs
+        }
+
+    @property
+    def plots(self) -> List[PlotFile]:
+        return [plot_file for plots in self.drives.values() for plot_file in plots]
+
+    @property
+    def capacity_gb(self) -> float:
+        return sum(plot_file.capacity_gb for plot_file in self.plots)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _chunks(self, plot_file: PlotFile, scoop: int) -> Iterable[Tuple[int, int, int]]:
+        """(file offset, size, first nonce) for a scoop run"""
+        offset = plot_file.scoop_offset(scoop)
+        end = offset + plot_file.nonces * SCOOP_SIZE
+        nonce = plot_file.start_nonce
+        while offset < end:
+            size = min(self.chunk_size, end - offset)
+            yield offset, size, nonce
+            offset += size
+            nonce += size // SCOOP_SIZE
+
+    def _read_drive(
+        self,
+        plot_dir: str,
+        scoop: int,
+        gen_sig: bytes,
+        base_target: int,
+        result: ScanResult,
+        pending: List,
+        lock: threading.Lock
+    ):
+        started = time.perf_counter()
+        local = ScanResult()
+        bytes_read = 0
+        executor = self._executor
+        inflight = threading.BoundedSemaphore(self.MAX_INFLIGHT) if executor else None
+        buffer = bytearray(self.chunk_size)
+        view = memoryview(buffer)
+
+        error = None
+        try:
+            for plot_file in self.drives[plot_dir]:
+                with open(plot_file.path, "rb", buffering=0) as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.use_mmap else None
+                    try:
+                        for offset, size, first_nonce in self._chunks(plot_file, scoop):
+                            if mapped is not None:
+                                data = mapped[offset:offset + size]
+                            else:
+                                f.seek(offset)
+                                if f.readinto(view[:size]) != size:
+                                    raise IOError(f"short read from plot {plot_file.path}")
+                                data = view[:size]
+                            bytes_read += size
+
+                            if executor is None:
+                                local.offer(plot_file, *best_in_scoop(gen_sig, data, first_nonce, base_target))
+                                continue
+                            inflight.acquire()
+                            future = executor.submit(best_in_scoop, gen_sig, bytes(data), first_nonce, base_target)
+                            future.add_done_callback(lambda _: inflight.release())
+                            with lock:
+                                pending.append((plot_file, future))
+                    finally:
+                        if mapped is not None:
+                            mapped.close()
+        except Exception as e:
+            # Keep what the drive yielded so far; the round goes on without the rest
+            error = f"{type(e).__name__}: {e}"
+            print(f"[plot-scanner] Drive {plot_dir} failed: {error}")
+
+        with lock:
+            result.merge(local)
+            result.bytes_read += bytes_read
+            result.drive_times[plot_dir] = time.perf_counter() - started
+            if error is not None:
+                result.drive_errors[plot_dir] = error
+
+    def scan(self, gen_sig: bytes, height: int, base_target: int) -> ScanResult:
+        """Best (nonce, deadline) across all drives for one block"""
+        if self.hash_workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.hash_workers)
+
+        started = time.perf_counter()
+        result = ScanResult(scoop=scoop_number(gen_sig, height))
+        pending: List = []
+        lock = threading.Lock()
+        readers = [
+            threading.Thread(
+                target=self._read_drive,
+                args=(plot_dir, result.scoop, gen_sig, base_target, result, pending, lock),
+                name=f"plot-reader-{index}"
+            )
+            for index, plot_dir in enumerate(self.plot_dirs)
+            if self.drives.get(plot_dir)
+        ]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+
+        for plot_file, future in pending:
+            result.offer(plot_file, *future.result())
+        result.scan_time = time.perf_counter() - started
+        return result
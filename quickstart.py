@@ -74,7 +74,7 @@ def example_2_poc_mining():
     previous_hash = "genesis_hash_0000"
     nonce, time_taken = miner.mine_block(
         previous_hash=previous_hash,
-        difficulty=2,  # Lower difficulty for demo
+        difficulty=16,  # Lower difficulty for demo (~16 hashes)
         timeout=5.0
     )
     
@@ -214,10 +214,15 @@ def example_6_multi_node_network():
     # Create different node types
     nodes = {}
     
+    # Shared genesis: every node registers the same validators
+    genesis_validators = {"Treasurer_Alice": 50000.0, "Council_Bob": 10000.0}
+    
     # PoC Miners
     print("[*] Creating PoC Miner Nodes:")
-    miner1 = PoCMinerNode("Farmer_Alice_Node", storage_gb=256, port=8010)
-    miner2 = PoCMinerNode("Farmer_Bob_Node", storage_gb=512, port=8011)
+    miner1 = PoCMinerNode("Farmer_Alice_Node", storage_gb=256, port=8010,
+                          genesis_validators=genesis_validators)
+    miner2 = PoCMinerNode("Farmer_Bob_Node", storage_gb=512, port=8011,
+                          genesis_validators=genesis_validators)
     nodes["Miner1"] = miner1
     nodes["Miner2"] = miner2
     print(f"    {miner1.node_id}: PoC Miner (256 GB)")
@@ -229,13 +234,15 @@ def example_6_multi_node_network():
         "Treasurer_Alice",
         role=PoSValidator.ROLE_TREASURER,
         initial_stake=50000.0,
-        port=8020
+        port=8020,
+        genesis_validators=genesis_validators
     )
     validator2 = PoSValidatorNode(
         "Council_Bob",
         role=PoSValidator.ROLE_COUNCIL,
         initial_stake=10000.0,
-        port=8021
+        port=8021,
+        genesis_validators=genesis_validators
     )
     nodes["Validator1"] = validator1
     nodes["Validator2"] = validator2
@@ -244,8 +251,8 @@ def example_6_multi_node_network():
     
     # Full Nodes
     print("\n[*] Creating Full Nodes:")
-    full1 = FullNode("FullNode_1", port=8030)
-    full2 = FullNode("FullNode_2", port=8031)
+    full1 = FullNode("FullNode_1", port=8030, genesis_validators=genesis_validators)
+    full2 = FullNode("FullNode_2", port=8031, genesis_validators=genesis_validators)
     nodes["Full1"] = full1
     nodes["Full2"] = full2
     print(f"    {full1.node_id}: Full Node")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+FCU Blockchain Difficulty / Block-Time Simulator
+- Samples block times from the exponential distribution implied by
+  difficulty and network hash rate (capacity x hashes per GB)
+- Applies the PoCDifficulty proportional retarget, vectorized across
+  many independent runs with rolling window sums
+- Reports block-time percentiles and convergence curves
+
+Run: python simulator.py [--blocks N] [--runs R] [--window W]
+"""
+
+import argparse
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from consensus import PoCDifficulty
+
+PERCENTILES = (5, 25, 50, 75, 95, 99)
+
+
+@dataclass
+class SimulationResult:
+    """Per-block outputs, shape (blocks, runs)"""
+    block_times: np.ndarray
+    difficulties: np.ndarray
+    target_block_time: float
+
+    def percentiles(self, skip: int = 0) -> Dict[int, float]:
+        """Block-time percentiles (seconds) after the first `skip` blocks"""
+        values = np.percentile(self.block_times[skip:], PERCENTILES)
+        return dict(zip(PERCENTILES, values.tolist()))
+
+    def convergence_curve(self, bucket: int = 100) -> np.ndarray:
+        """Mean block time per bucket of blocks, averaged over runs"""
+        blocks = self.block_times.shape[0] // bucket * bucket
+        return self.block_times[:blocks].reshape(-1, bucket, self.block_times.shape[1]).mean(axis=(1, 2))
+
+    def blocks_to_converge(self, tolerance: float = 0.1, bucket: int = 100) -> Optional[int]:
+        """First block after which every bucket mean stays within tolerance of target"""
+        curve = self.convergence_curve(bucket)
+        off = np.abs(curve / self.target_block_time - 1.0) > tolerance
+        if not off.any():
+            return 0
+        last_off = int(np.nonzero(off)[0][-1])
+        if last_off == len(curve) - 1:
+            return None
+        return (last_off + 1) * bucket
+
+
+def simulate(
+    capacity_gb: Union[float, Sequence[float], np.ndarray],
+    blocks: int = 100_000,
+    runs: int = 16,
+    hashes_per_gb: float = 1.0,
+    initial_difficulty: float = PoCDifficulty.INITIAL_DIFFICULTY,
+    target_block_time: float = PoCDifficulty.TARGET_BLOCK_TIME,
+    window: int = PoCDifficulty.DIFFICULTY_ADJUSTMENT_BLOCKS,
+    min_blocks: int = PoCDifficulty.RETARGET_MIN_BLOCKS,
+    max_adjustment: float = PoCDifficulty.MAX_ADJUSTMENT,
+    seed: int = 0
+) -> SimulationResult:
+    """
+    Simulate `runs` independent chains of `blocks` blocks.
+
+    capacity_gb is a constant or a per-block capacity curve; hash rate is
+    capacity_gb * hashes_per_gb. Each block's time is Exp(difficulty / rate),
+    after which difficulty is retargeted exactly as
+    PoCDifficulty.calculate_new_difficulty does over the rolling window
+    (in float rather than integer arithmetic).
+    """
+    rng = np.random.default_rng(seed)
+    rate = np.broadcast_to(np.asarray(capacity_gb, dtype=np.float64) * hashes_per_gb, (blocks,))
+
+    block_times = np.empty((blocks, runs))
+    difficulties = np.empty((blocks, runs))
+    window_times = np.zeros((window, runs))
+    window_work = np.zeros((window, runs))
+    sum_time = np.zeros(runs)
+    sum_work = np.zeros(runs)
+    difficulty = np.full(runs, float(initial_difficulty))
+    unit_times = rng.standard_exponential((blocks, runs))
+
+    for i in range(blocks):
+        times = unit_times[i] * (difficulty / rate[i])
+        block_times[i] = times
+        difficulties[i] = difficulty
+
+        # Rolling window sums: swap out the oldest slot
+        slot = i % window
+        sum_time += times - window_times[slot]
+        sum_work += difficulty - window_work[slot]
+        window_times[slot] = times
+        window_work[slot] = difficulty
+
+        if i + 1 >= min_blocks:
+            proposed = sum_work * target_block_time / np.maximum(sum_time, 1e-9)
+            difficulty = np.clip(
+                proposed,
+                np.maximum(1.0, difficulty / max_adjustment),
+                difficulty * max_adjustment
+            )
+
+    return SimulationResult(block_times, difficulties, target_block_time)
+
+
+def capacity_scenarios(blocks: int, base_gb: float) -> Dict[str, np.ndarray]:
+    """Network capacity curves to tune against"""
+    index = np.arange(blocks)
+    return {
+        'constant': np.full(blocks, base_gb),
+        'step 2x at 25%': np.where(index < blocks // 4, base_gb, 2 * base_gb),
+        'linear growth 10x': base_gb * (1 + 9 * index / max(1, blocks - 1)),
+        'drop to 25% at 50%': np.where(index < blocks // 2, base_gb, base_gb / 4),
+    }
+
+
+def print_report(name: str, result: SimulationResult, bucket: int):
+    pct = result.percentiles(skip=bucket)
+    converged = result.blocks_to_converge(bucket=bucket)
+    curve = result.convergence_curve(bucket)
+    print(f"{name:<22}" + "".join(f"{pct[p]:>8.1f}" for p in PERCENTILES)
+          + f"{np.mean(result.block_times[bucket:]):>8.2f}"
+          + f"{converged if converged is not None else 'never':>10}")
+    preview = curve[:: max(1, len(curve) // 10)][:10]
+    print(f"{'':<22}curve: " + " ".join(f"{v:.1f}" for v in preview))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FCU difficulty / block-time simulator")
+    parser.add_argument("--blocks", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=16)
+    parser.add_argument("--window", type=int, default=PoCDifficulty.DIFFICULTY_ADJUSTMENT_BLOCKS)
+    parser.add_argument("--target", type=float, default=PoCDifficulty.TARGET_BLOCK_TIME)
+    parser.add_argument("--capacity-gb", type=float, default=10_000.0)
+    parser.add_argument("--bucket", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{args.blocks} blocks x {args.runs} runs, window {args.window}, "
+          f"target {args.target}s")
+    print(f"{'scenario':<22}" + "".join(f"{'p' + str(p):>8}" for p in PERCENTILES)
+          + f"{'mean':>8}{'converge':>10}")
+    for name, capacity in capacity_scenarios(args.blocks, args.capacity_gb).items():
+        result = simulate(
+            capacity,
+            blocks=args.blocks,
+            runs=args.runs,
+            window=args.window,
+            target_block_time=args.target
+        )
+        print_report(name, result, args.bucket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+FCU Blockchain State Snapshots
+- Versioned binary format with SHA-256 checksum
+- Balances, PoS stakes, storage pledges and lottery entries at a height
+- Lets a node boot from the latest snapshot plus the block tail
+"""
+
+import os
+import struct
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+SNAPSHOT_MAGIC = b"FCUSNAP"
+SNAPSHOT_VERSION = 1
+
+_HEADER = struct.Struct(">7sBQ32s32s")   # magic, version, height, block hash, state root
+_U32 = struct.Struct(">I")
+_U64 = struct.Struct(">Q")
+_I64 = struct.Struct(">q")
+_F64 = struct.Struct(">d")
+_CHECKSUM_SIZE = 32
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is truncated, corrupt or of an unknown version"""
+
+
+@dataclass
+class StateSnapshot:
+    """Decoded snapshot contents (values are plain dicts, see Blockchain.load_snapshot)"""
+    height: int
+    block_hash: str
+    state_root: str
+    balances: Dict[str, float] = field(default_factory=dict)
+    stakes: Dict[str, List[Dict]] = field(default_factory=dict)
+    pledges: Dict[str, Dict] = field(default_factory=dict)
+    lottery_entries: Dict[int, List[Dict]] = field(default_factory=dict)
+
+
+class _Writer:
+    def __init__(self):
+        self.parts: List[bytes] = []
+
+    def u32(self, value: int):
+        self.parts.append(_U32.pack(value))
+
+    def u64(self, value: int):
+        self.parts.append(_U64.pack(value))
+
+    def i64(self, value: int):
+        self.parts.append(_I64.pack(value))
+
+    def f64(self, value: float):
+        self.parts.append(_F64.pack(value))
+
+    def flag(self, value: bool):
+        self.parts.append(b"\x01" if value else b"\x00")
+
+    def str(self, value: str):
+        raw = str(value).encode()
+        self.parts.append(_U32.pack(len(raw)) + raw)
+
+    def opt_str(self, value: Optional[str]):
+        self.flag(value is not None)
+        if value is not None:
+            self.str(value)
+
+    def opt_i64(self, value: Optional[int]):
+        self.flag(value is not None)
+        if value is not None:
+            self.i64(value)
+
+
+class _Reader:
+    def __init__(self, data: memoryview, offset: int):
+        self.data = data
+        self.offset = offset
+
+    def _unpack(self, fmt: struct.Struct):
+        if self.offset + fmt.size > len(self.data):
+            raise SnapshotError("snapshot truncated")
+        value = fmt.unpack_from(self.data, self.offset)[0]
+        self.offset += fmt.size
+        return value
+
+    def u32(self) -> int:
+        return self._unpack(_U32)
+
+    def u64(self) -> int:
+        return self._unpack(_U64)
+
+    def i64(self) -> int:
+        return self._unpack(_I64)
+
+    def f64(self) -> float:
+        return self._unpack(_F64)
+
+    def flag(self) -> bool:
+        if self.offset >= len(self.data):
+            raise SnapshotError("snapshot truncated")
+        self.offset += 1
+        return self.data[self.offset - 1] != 0
+
+    def str(self) -> str:
+        length = self.u32()
+        if self.offset + length > len(self.data):
+            raise SnapshotError("snapshot truncated")
+        value = bytes(self.data[self.offset:self.offset + length]).decode()
+        self.offset += length
+        return value
+
+    def opt_str(self) -> Optional[str]:
+        return self.str() if self.flag() else None
+
+    def opt_i64(self) -> Optional[int]:
+        return self.i64() if self.flag() else None
+
+
+def encode_snapshot(snapshot: StateSnapshot) -> bytes:
+    """Serialize snapshot: header, four sections, trailing SHA-256 of everything before it"""
+    w = _Writer()
+    w.parts.append(_HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, snapshot.height,
+        bytes.fromhex(snapshot.block_hash), bytes.fromhex(snapshot.state_root)
+    ))
+
+    w.u32(len(snapshot.balances))
+    for address, balance in snapshot.balances.items():
+        w.str(address)
+        w.f64(balance)
+
+    w.u32(len(snapshot.stakes))
+    for address, stakes in snapshot.stakes.items():
+        w.str(address)
+        w.u32(len(stakes))
+        for stake in stakes:
+            w.str(stake['validator'])
+            w.f64(stake['amount'])
+            w.i64(stake['lock_time'])
+            w.f64(stake['timestamp'])
+            w.opt_str(stake['delegated_from'])
+            w.flag(stake['is_active'])
+
+    w.u32(len(snapshot.pledges))
+    for address, pledge in snapshot.pledges.items():
+        w.str(address)
+        w.str(pledge['pledger'])
+        w.f64(pledge['capacity_gb'])
+        w.f64(pledge['timestamp'])
+        w.opt_str(pledge['proof_hash'])
+        w.opt_str(pledge['challenge_response'])
+        w.flag(pledge['is_active'])
+
+    w.u32(len(snapshot.lottery_entries))
+    for height, entries in snapshot.lottery_entries.items():
+        w.u64(height)
+        w.u32(len(entries))
+        for entry in entries:
+            w.str(entry['participant'])
+            w.i64(entry['nonce'])
+            w.str(entry['difficulty_target'])
+            w.f64(entry['timestamp'])
+            w.opt_i64(entry['winning_nonce'])
+
+    body = b"".join(w.parts)
+    return body + hashlib.sha256(body).digest()
+
+
+def decode_snapshot(data: bytes) -> StateSnapshot:
+    """Parse and checksum-verify a serialized snapshot"""
+    if len(data) < _HEADER.size + _CHECKSUM_SIZE:
+        raise SnapshotError("snapshot truncated")
+    view = memoryview(data)
+    body = view[:-_CHECKSUM_SIZE]
+    if hashlib.sha256(body).digest() != bytes(view[-_CHECKSUM_SIZE:]):
+        raise SnapshotError("snapshot checksum mismatch")
+
+    magic, version, height, block_hash, state_root = _HEADER.unpack_from(body, 0)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("not a snapshot file")
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"unsupported snapshot version {version}")
+
+    r = _Reader(body, _HEADER.size)
+    snapshot = StateSnapshot(height, block_hash.hex(), state_root.hex())
+
+    for _ in range(r.u32()):
+        address = r.str()
+        snapshot.balances[address] = r.f64()
+
+    for _ in range(r.u32()):
+        address = r.str()
+        snapshot.stakes[address] = [
+            {
+                'validator': r.str(),
+                'amount': r.f64(),
+                'lock_time': r.i64(),
+                'timestamp': r.f64(),
+                'delegated_from': r.opt_str(),
+                'is_active': r.flag()
+            }
+            for _ in range(r.u32())
+        ]
+
+    for _ in range(r.u32()):
+        address = r.str()
+        snapshot.pledges[address] = {
+            'pledger': r.str(),
+            'capacity_gb': r.f64(),
+            'timestamp': r.f64(),
+            'proof_hash': r.opt_str(),
+            'challenge_response': r.opt_str(),
+            'is_active': r.flag()
+        }
+
+    for _ in range(r.u32()):
+        height = r.u64()
+        snapshot.lottery_entries[height] = [
+            {
+                'participant': r.str(),
+                'nonce': r.i64(),
+                'difficulty_target': r.str(),
+                'timestamp': r.f64(),
+                'winning_nonce': r.opt_i64()
+            }
+            for _ in range(r.u32())
+        ]
+
+    if r.offset != len(body):
+        raise SnapshotError("trailing bytes in snapshot")
+    return snapshot
+
+
+class SnapshotStore:
+    """Directory of snapshot_<height>.snap files, newest kept up to `retain`"""
+
+    def __init__(self, snapshot_dir: str, retain: int = 3):
+        self.snapshot_dir = snapshot_dir
+        self.retain = retain
+        os.makedirs(snapshot_dir, exist_ok=True)
+
+    def _path(self, height: int) -> str:
+        return os.path.join(self.snapshot_dir, f"snapshot_{height:010d}.snap")
+
+    def heights(self) -> List[int]:
+        """Available snapshot heights, newest first"""
+        heights = []
+        for name in os.listdir(self.snapshot_dir):
+            if name.startswith("snapshot_") and name.endswith(".snap"):
+                try:
+                    heights.append(int(name[len("snapshot_"):-len(".snap")]))
+                except ValueError:
+                    continue
+        return sorted(heights, reverse=True)
+
+    def save(self, snapshot: StateSnapshot):
+        """Write snapshot atomically and prune old ones"""
+        path = self._path(snapshot.height)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encode_snapshot(snapshot))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        for height in self.heights()[self.retain:]:
+            os.remove(self._path(height))
+
+    def load(self, height: int) -> StateSnapshot:
+        with open(self._path(height), "rb") as f:
+            return decode_snapshot(f.read())
@@ -0,0 +1,191 @@
+"""
+FCU Blockchain Authenticated State
+- Compressed binary Patricia trie over 32-byte key hashes
+- Incremental root: only paths touched since the last root are rehashed
+- Inclusion proofs for light clients
+"""
+
+import hashlib
+from typing import List, Optional, Tuple
+
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+
+def _bit(key: bytes, index: int) -> int:
+    """Bit at index (0 = most significant bit of key[0])"""
+    return (key[index >> 3] >> (7 - (index & 7))) & 1
+
+
+def _first_diff(a: bytes, b: bytes) -> int:
+    """Index of first differing bit between two equal-length keys"""
+    x = int.from_bytes(a, "big") ^ int.from_bytes(b, "big")
+    return len(a) * 8 - x.bit_length()
+
+
+def _leaf_hash(key: bytes, value_hash: bytes) -> bytes:
+    return hashlib.sha256(b"\x00" + key + value_hash).digest()
+
+
+def _branch_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+class _Leaf:
+    __slots__ = ('key', 'value_hash', 'hash')
+
+    def __init__(self, key: bytes, value_hash: bytes):
+        self.key = key
+        self.value_hash = value_hash
+        self.hash = None  # None = dirty
+
+
+class _Branch:
+    __slots__ = ('bit', 'key', 'left', 'right', 'hash')
+
+    def __init__(self, bit: int, left, right):
+        self.bit = bit           # First bit where the two subtrees differ
+        self.key = left.key      # Any key below; shares the first `bit` bits with all others
+        self.left = left
+        self.right = right
+        self.hash = None
+
+
+class StateTrie:
+    """
+    Authenticated key -> value_hash map.
+    Keys are 32-byte hashes, so the trie stays ~log2(N) deep. Leaves and
+    branches cache their hash; an update only clears the cache along its
+    own path, so root() costs O(touched keys * log N).
+    """
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _join(self, leaf: _Leaf, node, bit: int) -> _Branch:
+        if _bit(leaf.key, bit) == 0:
+            return _Branch(bit, leaf, node)
+        return _Branch(bit, node, leaf)
+
+    def _insert(self, node, key: bytes, value_hash: bytes):
+        if isinstance(node, _Leaf):
+            if node.key == key:
+                if node.value_hash != value_hash:
+                    node.value_hash = value_hash
+                    node.hash = None
+                return node
+            self._size += 1
+            return self._join(_Leaf(key, value_hash), node, _first_diff(node.key, key))
+
+        diff = _first_diff(node.key, key)
+        if diff < node.bit:
+            self._size += 1
+            return self._join(_Leaf(key, value_hash), node, diff)
+
+        if _bit(key, node.bit) == 0:
+            child = self._insert(node.left, key, value_hash)
+            if child is not node.left or child.hash is None:
+                node.left = child
+                node.hash = None
+        else:
+            child = self._insert(node.right, key, value_hash)
+            if child is not node.right or child.hash is None:
+                node.right = child
+                node.hash = None
+        return node
+
+    def update(self, key: bytes, value_hash: bytes):
+        """Insert or replace the value hash stored under key"""
+        if self._root is None:
+            self._root = _Leaf(key, value_hash)
+            self._size = 1
+        else:
+            self._root = self._insert(self._root, key, value_hash)
+
+    def _delete(self, node, key: bytes):
+        if isinstance(node, _Leaf):
+            if node.key == key:
+                self._size -= 1
+                return None
+            return node
+
+        if _bit(key, node.bit) == 0:
+            child = self._delete(node.left, key)
+            if child is None:
+                return node.right
+            if child is not node.left or child.hash is None:
+                node.left = child
+                node.hash = None
+        else:
+            child = self._delete(node.right, key)
+            if child is None:
+                return node.left
+            if child is not node.right or child.hash is None:
+                node.right = child
+                node.hash = None
+        return node
+
+    def delete(self, key: bytes):
+        """Remove key if present"""
+        if self._root is not None:
+            self._root = self._delete(self._root, key)
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """Value hash stored under key, or None"""
+        node = self._root
+        while isinstance(node, _Branch):
+            node = node.right if _bit(key, node.bit) else node.left
+        if node is not None and node.key == key:
+            return node.value_hash
+        return None
+
+    def _hash(self, node) -> bytes:
+        if node.hash is None:
+            if isinstance(node, _Leaf):
+                node.hash = _leaf_hash(node.key, node.value_hash)
+            else:
+                node.hash = _branch_hash(self._hash(node.left), self._hash(node.right))
+        return node.hash
+
+    def root(self) -> bytes:
+        """Raw 32-byte root, rehashing only dirty paths"""
+        if self._root is None:
+            return EMPTY_ROOT
+        return self._hash(self._root)
+
+    def get_proof(self, key: bytes) -> Optional[List[Tuple[bytes, bool]]]:
+        """
+        Inclusion proof for key.
+        Returns [(sibling_hash, sibling_is_right), ...] from leaf to root,
+        or None if key is absent.
+        """
+        self.root()
+        path = []
+        node = self._root
+        while isinstance(node, _Branch):
+            if _bit(key, node.bit):
+                path.append((node.left.hash, False))
+                node = node.right
+            else:
+                path.append((node.right.hash, True))
+                node = node.left
+        if node is None or node.key != key:
+            return None
+        path.reverse()
+        return path
+
+    @staticmethod
+    def verify_proof(
+        key: bytes,
+        value_hash: bytes,
+        proof: List[Tuple[bytes, bool]],
+        root: bytes
+    ) -> bool:
+        """Verify an inclusion proof against a raw root"""
+        node = _leaf_hash(key, value_hash)
+        for sibling, sibling_is_right in proof:
+            node = _branch_hash(node, sibling) if sibling_is_right else _branch_hash(sibling, node)
+        return node == root
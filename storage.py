@@ -0,0 +1,348 @@
+"""
+FCU Blockchain Persistent Storage
+- Append-only segment files holding serialized blocks
+- Memory-mapped fixed-width height -> location index
+- Memory-mapped open-addressing hash -> height index
+"""
+
+import os
+import mmap
+import struct
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class BlockStoreError(Exception):
+    """Raised when the on-disk block store is corrupt or misused"""
+
+
+class BlockStore:
+    """
+    Disk-backed, append-only block store.
+
+    Layout of data_dir:
+      blocks_NNNNN.dat  - segment files, serialized blocks back to back
+      height.idx        - header + one fixed-width entry per height
+                          (segment, offset, length, 32-byte block hash)
+      hash.idx          - open-addressing table: 8-byte hash prefix -> height+1
+
+    Both index files are mmap'd, so lookups never load the whole chain and
+    resident memory stays bounded regardless of height.
+
+    read_only=True opens an existing store without a writer, so other
+    processes (e.g. validation workers) can read it alongside the owner.
+    """
+
+    SEGMENT_SIZE = 64 * 1024 * 1024        # Roll over to a new segment at 64MB
+    INDEX_GROWTH = 65536                   # Height index grows 64K entries at a time
+
+    _HEADER = struct.Struct(">8sQ")        # magic, count
+    _HEIGHT_MAGIC = b"FCUHIDX1"
+    _HEIGHT_ENTRY = struct.Struct(">IQI32s")  # segment, offset, length, hash
+    _HASH_HEADER = struct.Struct(">8sQQ")  # magic, count, capacity (slots)
+    _HASH_MAGIC = b"FCUBHIX1"
+    _HASH_SLOT = struct.Struct(">8sQ")     # hash prefix, height + 1 (0 = empty)
+    _HASH_INITIAL_SLOTS = 1 << 16
+
+    def __init__(
+        self,
+        data_dir: str,
+        segment_size: int = SEGMENT_SIZE,
+        read_only: bool = False
+    ):
+        self.data_dir = data_dir
+        self.segment_size = segment_size
+        self.read_only = read_only
+        if not read_only:
+            os.makedirs(data_dir, exist_ok=True)
+
+        self._height_path = os.path.join(data_dir, "height.idx")
+        self._hash_path = os.path.join(data_dir, "hash.idx")
+        self._height_file, self._height_map = self._open_height_index()
+        self._count = self._HEADER.unpack_from(self._height_map, 0)[1]
+        self._hash_file, self._hash_map = self._open_hash_index()
+        if not read_only and self._HASH_HEADER.unpack_from(self._hash_map, 0)[1] != self._count:
+            # Crashed between index writes - rebuild from the height index
+            self._hash_resize(self._hash_capacity())
+
+        self._readers: Dict[int, int] = {}  # segment -> read fd
+        self._writer = None
+        self._write_segment = 0
+        self._write_offset = 0
+        self._closed = False
+        if not read_only:
+            self._recover_tail()
+
+    # ------------------------------------------------------------------
+    # File management
+    # ------------------------------------------------------------------
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.data_dir, f"blocks_{segment:05d}.dat")
+
+    def _map(self, path: str, header: bytes, size: int) -> Tuple[object, mmap.mmap]:
+        """Open (creating if needed) and mmap an index file"""
+        if self.read_only:
+            if not os.path.exists(path):
+                raise BlockStoreError(f"no block store index at {path}")
+            f = open(path, "rb")
+            return f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        f = open(path, "w+b" if new else "r+b")
+        if new:
+            f.truncate(size)
+            f.write(header)
+            f.flush()
+        return f, mmap.mmap(f.fileno(), 0)
+
+    def _open_height_index(self):
+        size = self._HEADER.size + self.INDEX_GROWTH * self._HEIGHT_ENTRY.size
+        f, m = self._map(self._height_path, self._HEADER.pack(self._HEIGHT_MAGIC, 0), size)
+        if m[:8] != self._HEIGHT_MAGIC:
+            raise BlockStoreError(f"bad height index magic in {self._height_path}")
+        return f, m
+
+    def _open_hash_index(self, slots: int = _HASH_INITIAL_SLOTS):
+        size = self._HASH_HEADER.size + slots * self._HASH_SLOT.size
+        header = self._HASH_HEADER.pack(self._HASH_MAGIC, 0, slots)
+        f, m = self._map(self._hash_path, header, size)
+        if m[:8] != self._HASH_MAGIC:
+            raise BlockStoreError(f"bad hash index magic in {self._hash_path}")
+        return f, m
+
+    def _recover_tail(self):
+        """Position the writer after the last indexed block, dropping torn writes"""
+        if self._count:
+            segment, offset, length, _ = self._entry(self._count - 1)
+            self._write_segment, self._write_offset = segment, offset + length
+        path = self._segment_path(self._write_segment)
+        self._writer = open(path, "r+b" if os.path.exists(path) else "w+b")
+        self._writer.truncate(self._write_offset)
+        self._writer.seek(self._write_offset)
+
+    def _grow_height_index(self):
+        capacity = (len(self._height_map) - self._HEADER.size) // self._HEIGHT_ENTRY.size
+        self._height_map.close()
+        self._height_file.truncate(
+            self._HEADER.size + (capacity + self.INDEX_GROWTH) * self._HEIGHT_ENTRY.size
+        )
+        self._height_map = mmap.mmap(self._height_file.fileno(), 0)
+
+    # ------------------------------------------------------------------
+    # Height index
+    # ------------------------------------------------------------------
+
+    def _entry(self, height: int) -> Tuple[int, int, int, bytes]:
+        return self._HEIGHT_ENTRY.unpack_from(
+            self._height_map, self._HEADER.size + height * self._HEIGHT_ENTRY.size
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get_hash(self, height: int) -> bytes:
+        """Raw 32-byte hash of block at height (no block decode)"""
+        if not 0 <= height < self._count:
+            raise IndexError(f"height {height} out of range")
+        return self._entry(height)[3]
+
+    # ------------------------------------------------------------------
+    # Hash index (open addressing, linear probing)
+    # ------------------------------------------------------------------
+
+    def _hash_capacity(self) -> int:
+        return self._HASH_HEADER.unpack_from(self._hash_map, 0)[2]
+
+    def _hash_slot_offset(self, slot: int) -> int:
+        return self._HASH_HEADER.size + slot * self._HASH_SLOT.size
+
+    def _hash_insert(self, block_hash: bytes, height: int):
+        capacity = self._hash_capacity()
+        slot = int.from_bytes(block_hash[:8], "big") % capacity
+        while True:
+            offset = self._hash_slot_offset(slot)
+            _, stored = self._HASH_SLOT.unpack_from(self._hash_map, offset)
+            if stored == 0:
+                self._HASH_SLOT.pack_into(self._hash_map, offset, block_hash[:8], height + 1)
+                return
+            slot = (slot + 1) % capacity
+
+    def _hash_resize(self, slots: int):
+        """Rebuild the hash index from the height index at a new capacity"""
+        self._hash_map.close()
+        self._hash_file.close()
+        os.remove(self._hash_path)
+        self._hash_file, self._hash_map = self._open_hash_index(slots)
+        for height in range(self._count):
+            self._hash_insert(self._entry(height)[3], height)
+        self._HASH_HEADER.pack_into(
+            self._hash_map, 0, self._HASH_MAGIC, self._count, slots
+        )
+
+    def _hash_remove(self, block_hash: bytes):
+        """Remove a hash, back-shifting later probes so lookups stay correct"""
+        capacity = self._hash_capacity()
+        slot = int.from_bytes(block_hash[:8], "big") % capacity
+        while True:
+            prefix, stored = self._HASH_SLOT.unpack_from(self._hash_map, self._hash_slot_offset(slot))
+            if stored == 0:
+                return
+            if prefix == block_hash[:8] and self._entry(stored - 1)[3] == block_hash:
+                break
+            slot = (slot + 1) % capacity
+
+        hole = probe = slot
+        while True:
+            probe = (probe + 1) % capacity
+            prefix, stored = self._HASH_SLOT.unpack_from(self._hash_map, self._hash_slot_offset(probe))
+            if stored == 0:
+                break
+            home = int.from_bytes(prefix, "big") % capacity
+            # Entry stays if its home slot lies cyclically within (hole, probe]
+            if (hole < probe and hole < home <= probe) or (hole > probe and (home > hole or home <= probe)):
+                continue
+            self._HASH_SLOT.pack_into(self._hash_map, self._hash_slot_offset(hole), prefix, stored)
+            hole = probe
+        self._HASH_SLOT.pack_into(self._hash_map, self._hash_slot_offset(hole), b"\x00" * 8, 0)
+
+    def get_height(self, block_hash: bytes) -> Optional[int]:
+        """Height of block with the given raw hash, or None"""
+        capacity = self._hash_capacity()
+        prefix = block_hash[:8]
+        slot = int.from_bytes(prefix, "big") % capacity
+        while True:
+            stored_prefix, stored = self._HASH_SLOT.unpack_from(
+                self._hash_map, self._hash_slot_offset(slot)
+            )
+            if stored == 0:
+                return None
+            if stored_prefix == prefix and self._entry(stored - 1)[3] == block_hash:
+                return stored - 1
+            slot = (slot + 1) % capacity
+
+    # ------------------------------------------------------------------
+    # Blocks
+    # ------------------------------------------------------------------
+
+    def append(self, block_hash: bytes, payload: bytes) -> int:
+        """Append a serialized block; returns its height"""
+        if self.read_only:
+            raise BlockStoreError("block store opened read-only")
+        if len(block_hash) != 32:
+            raise BlockStoreError("block hash must be 32 raw bytes")
+
+        if self._write_offset and self._write_offset + len(payload) > self.segment_size:
+            self._writer.close()
+            self._write_segment += 1
+            self._write_offset = 0
+            self._writer = open(self._segment_path(self._write_segment), "w+b")
+
+        self._writer.write(payload)
+        self._writer.flush()
+
+        height = self._count
+        entry_offset = self._HEADER.size + height * self._HEIGHT_ENTRY.size
+        if entry_offset + self._HEIGHT_ENTRY.size > len(self._height_map):
+            self._grow_height_index()
+        self._HEIGHT_ENTRY.pack_into(
+            self._height_map, entry_offset,
+            self._write_segment, self._write_offset, len(payload), block_hash
+        )
+        self._write_offset += len(payload)
+
+        # Count is bumped last so a crash before this point leaves no visible entry
+        self._count += 1
+        self._HEADER.pack_into(self._height_map, 0, self._HEIGHT_MAGIC, self._count)
+
+        if self._count * 2 > self._hash_capacity():
+            self._hash_resize(self._hash_capacity() * 2)
+        else:
+            self._hash_insert(block_hash, height)
+            self._HASH_HEADER.pack_into(
+                self._hash_map, 0, self._HASH_MAGIC, self._count, self._hash_capacity()
+            )
+        return height
+
+    def truncate(self, count: int):
+        """Drop all blocks at height >= count (used for chain reorganizations)"""
+        if self.read_only:
+            raise BlockStoreError("block store opened read-only")
+        if not 0 <= count <= self._count:
+            raise IndexError(f"cannot truncate {self._count} blocks to {count}")
+
+        for height in range(self._count - 1, count - 1, -1):
+            self._hash_remove(self._entry(height)[3])
+
+        segment, offset = 0, 0
+        if count:
+            segment, offset, length, _ = self._entry(count - 1)
+            offset += length
+
+        self._count = count
+        self._HEADER.pack_into(self._height_map, 0, self._HEIGHT_MAGIC, count)
+        self._HASH_HEADER.pack_into(
+            self._hash_map, 0, self._HASH_MAGIC, count, self._hash_capacity()
+        )
+
+        if segment != self._write_segment:
+            self._writer.close()
+            for stale in range(segment + 1, self._write_segment + 1):
+                fd = self._readers.pop(stale, None)
+                if fd is not None:
+                    os.close(fd)
+                if os.path.exists(self._segment_path(stale)):
+                    os.remove(self._segment_path(stale))
+            self._write_segment = segment
+            self._writer = open(self._segment_path(segment), "r+b")
+        self._write_offset = offset
+        self._writer.truncate(offset)
+        self._writer.seek(offset)
+
+    def _reader(self, segment: int) -> int:
+        fd = self._readers.get(segment)
+        if fd is None:
+            fd = os.open(self._segment_path(segment), os.O_RDONLY)
+            self._readers[segment] = fd
+        return fd
+
+    def read(self, height: int) -> bytes:
+        """Serialized block at height"""
+        if height < 0:
+            height += self._count
+        if not 0 <= height < self._count:
+            raise IndexError(f"height {height} out of range")
+        segment, offset, length, _ = self._entry(height)
+        payload = os.pread(self._reader(segment), length, offset)
+        if len(payload) != length:
+            raise BlockStoreError(f"short read for block {height}")
+        return payload
+
+    def iter_payloads(self, start: int = 0) -> Iterator[bytes]:
+        """Stream serialized blocks in height order"""
+        for height in range(start, self._count):
+            yield self.read(height)
+
+    def sync(self):
+        """Flush segment data and indexes to disk"""
+        if self.read_only:
+            return
+        self._writer.flush()
+        os.fsync(self._writer.fileno())
+        self._height_map.flush()
+        self._hash_map.flush()
+
+    def close(self):
+        """Flush and release all file handles"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self.sync()
+            self._writer.close()
+            self._writer = None
+        for fd in self._readers.values():
+            os.close(fd)
+        self._readers.clear()
+        self._height_map.close()
+        self._height_file.close()
+        self._hash_map.close()
+        self._hash_file.close()
@@ -0,0 +1,352 @@
+"""
+FCU Blockchain TCP Transport (asyncio)
+- Length-prefixed frames carrying network.Message
+- One persistent connection per peer, opened with a PEER_HELLO handshake
+- PING/PONG keepalives; any inbound frame refreshes the peer's last_seen
+- Per-connection PriorityMessageQueue: blocks and votes overtake queued
+  transactions instead of waiting behind them in the socket buffer
+- Payloads travel in their canonical encoding (network.encode_payload):
+  Block.to_bytes() for blocks, JSON otherwise; relays resend received bytes
+"""
+
+import time
+import socket
+import struct
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from codec import CodecError, Decoder, Encoder
+from network import Message, MessageType, PeerInfo, PriorityMessageQueue
+
+_LENGTH = struct.Struct(">I")
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+# Small kernel send buffer: backlog waits in the priority queue, not a FIFO
+SEND_BUFFER_SIZE = 128 * 1024
+MAX_HELLO_FIELD = 64                   # Longest node_type/version accepted in a hello
+MAX_HOST_LENGTH = 253                  # DNS name limit
+
+_MESSAGE_TYPES = {message_type.value: message_type for message_type in MessageType}
+
+
+class TransportError(Exception):
+    """Raised on malformed frames or a failed handshake"""
+
+
+def encode_message(message: Message) -> bytes:
+    """Frame body: type, id, sender, timestamp, ttl, payload kind, payload"""
+    enc = Encoder()
+    enc.str(message.message_type.value)
+    enc.str(message.message_id)
+    enc.str(message.sender_id)
+    enc.f64(message.timestamp)
+    enc.varint(max(0, message.ttl))
+    kind, payload = message.wire_payload()
+    enc.u8(kind)
+    enc.blob(payload)
+    return enc.getvalue()
+
+
+def decode_message(data) -> Message:
+    """Inverse of encode_message; TransportError unless well-formed with a dict payload"""
+    try:
+        dec = Decoder(data)
+        message_type = _MESSAGE_TYPES[dec.str()]
+        message_id = dec.str()
+        sender_id = dec.str()
+        timestamp = dec.f64()
+        ttl = dec.varint()
+        kind = dec.u8()
+        raw = dec.blob()
+        if not dec.done():
+            raise TransportError("trailing bytes in frame")
+        return Message.from_wire(message_id, message_type, sender_id, timestamp, ttl, kind, raw)
+    except (CodecError, KeyError, UnicodeDecodeError, ValueError) as e:
+        raise TransportError(f"malformed message: {e}") from None
+
+
+def frame(message: Message) -> bytes:
+    body = encode_message(message)
+    return _LENGTH.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Message:
+    header = await reader.readexactly(_LENGTH.size)
+    (length,) = _LENGTH.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise TransportError(f"frame of {length} bytes exceeds limit")
+    return decode_message(await reader.readexactly(length))
+
+
+class Connection:
+    """One framed TCP stream to a peer that completed the handshake"""
+
+    def __init__(self, peer: PeerInfo, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter, outbound: bool,
+                 traffic_classes: Optional[Dict[str, Tuple[int, int, str]]] = None):
+        self.peer = peer
+        self.reader = reader
+        self.writer = writer
+        self.outbound = outbound
+        self.last_received = time.time()
+        self.ping_sent: Optional[float] = None
+        self.rtt: Optional[float] = None
+        self.read_task: Optional[asyncio.Task] = None     # Set once registered
+        self.queue = PriorityMessageQueue(traffic_classes)
+        self._ready = asyncio.Event()
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_SIZE)
+
+    def send(self, message_type: MessageType, data: bytes) -> bool:
+        """Queue a frame for the write loop; False if closed or its class is full"""
+        if self.writer.transport.is_closing() or not self.queue.push(message_type, data):
+            return False
+        self._ready.set()
+        return True
+
+    def send_now(self, data: bytes):
+        """Control frames (PING/PONG) skip the queue"""
+        if not self.writer.transport.is_closing():
+            self.writer.write(data)
+
+    async def write_loop(self):
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                if self.writer.transport.is_closing():
+                    return
+                while self.queue:
+                    self.writer.write(self.queue.pop())
+                    await self.writer.drain()
+        except OSError:
+            self.close()
+
+    def close(self):
+        if not self.writer.transport.is_closing():
+            self.writer.close()
+        self._ready.set()               # Let the write loop exit
+
+
+class PeerTransport:
+    """
+    Listens on host:port and keeps one connection per peer id.
+
+    Callbacks run on the event loop: on_peer(PeerInfo) after a handshake,
+    on_message(Message, peer_id) for every non-control frame,
+    on_seen(peer_id) whenever a frame arrives and on_disconnect(peer_id).
+    When both sides dial each other, the connection opened by the smaller
+    node id wins on both ends.
+    """
+
+    def __init__(
+        self,
+        local: PeerInfo,
+        on_message: Callable[[Message, str], None],
+        on_peer: Optional[Callable[[PeerInfo], None]] = None,
+        on_seen: Optional[Callable[[str], None]] = None,
+        on_disconnect: Optional[Callable[[str], None]] = None,
+        ping_interval: float = 15.0,
+        peer_timeout: float = 60.0,
+        handshake_timeout: float = 5.0,
+        traffic_classes: Optional[Dict[str, Tuple[int, int, str]]] = None
+    ):
+        self.local = local
+        self.on_message = on_message
+        self.on_peer = on_peer
+        self.on_seen = on_seen
+        self.on_disconnect = on_disconnect
+        self.ping_interval = ping_interval
+        self.peer_timeout = peer_timeout
+        self.handshake_timeout = handshake_timeout
+        self.traffic_classes = traffic_classes      # Per-connection queues (network.TRAFFIC_CLASSES)
+        self.connections: Dict[str, Connection] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._tasks: List[asyncio.Task] = []
+        self._ping_counter = 0
+        self._last_frame = (None, -1, b"")    # (message, ttl, frame): fanout encodes once
+
+    async def start(self):
+        """Bind the listening socket and start the keepalive loop"""
+        self.server = await asyncio.start_server(self._accept, self.local.host, self.local.port)
+        if self.local.port == 0:
+            self.local.port = self.server.sockets[0].getsockname()[1]
+        self._spawn(self._keepalive())
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for connection in list(self.connections.values()):
+            connection.close()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self.connections.clear()
+
+    def _spawn(self, coro: Awaitable) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._tasks.append(task)
+        task.add_done_callback(lambda t: t in self._tasks and self._tasks.remove(t))
+        return task
+
+    def _hello(self) -> Message:
+        return Message(
+            message_id=f"hello_{self.local.peer_id}_{time.time()}",
+            message_type=MessageType.PEER_HELLO,
+            sender_id=self.local.peer_id,
+            payload={
+                'peer_id': self.local.peer_id,
+                'host': self.local.host,
+                'port': self.local.port,
+                'node_type': self.local.node_type,
+                'version': self.local.version
+            },
+            ttl=1
+        )
+
+    @staticmethod
+    def _peer_from_hello(message: Message, fallback_host: str) -> PeerInfo:
+        if message.message_type != MessageType.PEER_HELLO:
+            raise TransportError(f"expected peer_hello, got {message.message_type.value}")
+        payload = message.payload
+        try:
+            peer_id = str(payload['peer_id'])
+            port = int(payload['port'])
+        except (KeyError, TypeError, ValueError) as e:
+            raise TransportError(f"malformed peer_hello: {e!r}") from None
+        if not 0 <= port <= 0xFFFF:
+            raise TransportError(f"malformed peer_hello: port {port} out of range")
+        fields = {}
+        for name, default, limit in (
+            ('host', fallback_host, MAX_HOST_LENGTH),
+            ('node_type', 'full_node', MAX_HELLO_FIELD),
+            ('version', '1.0', MAX_HELLO_FIELD)
+        ):
+            value = payload.get(name) or default
+            if not isinstance(value, str) or len(value) > limit:
+                raise TransportError(f"malformed peer_hello: {name} must be a string of at most {limit} chars")
+            fields[name] = str(value)
+        return PeerInfo(peer_id=peer_id, port=port, **fields)
+
+    async def connect(self, host: str, port: int) -> Optional[str]:
+        """Dial a peer and handshake; returns its peer id (existing connection reused)"""
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(frame(self._hello()))
+            reply = await asyncio.wait_for(read_frame(reader), self.handshake_timeout)
+            peer = self._peer_from_hello(reply, host)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, TransportError):
+            writer.close()
+            return None
+        connection = Connection(peer, reader, writer, True, self.traffic_classes)
+        self._register(connection)
+        return peer.peer_id if peer.peer_id in self.connections else None
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        host = writer.get_extra_info('peername', ('', 0))[0]
+        try:
+            hello = await asyncio.wait_for(read_frame(reader), self.handshake_timeout)
+            peer = self._peer_from_hello(hello, host)
+            writer.write(frame(self._hello()))
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, TransportError):
+            writer.close()
+            return
+        connection = Connection(peer, reader, writer, False, self.traffic_classes)
+        self._register(connection)
+
+    def _register(self, connection: Connection) -> bool:
+        """Adopt a handshaken connection and start its loops; False if it was dropped"""
+        peer_id = connection.peer.peer_id
+        if peer_id == self.local.peer_id:
+            connection.close()
+            return False
+        existing = self.connections.get(peer_id)
+        if existing is not None:
+            # Simultaneous dial: keep the connection the smaller id opened
+            keep_outbound = self.local.peer_id < peer_id
+            if existing.outbound == keep_outbound or connection.outbound != keep_outbound:
+                connection.close()
+                return False
+            del self.connections[peer_id]
+            existing.close()
+        self.connections[peer_id] = connection
+        self._spawn(connection.write_loop())
+        if self.on_peer is not None:
+            try:
+                self.on_peer(connection.peer)
+            except Exception as e:
+                # No read loop would ever clean this entry up: undo it now
+                print(f"[{self.local.peer_id}] Dropping {peer_id}: peer handler failed: {e!r}")
+                self._drop(connection)
+                return False
+        connection.read_task = self._spawn(self._read_loop(connection))
+        return True
+
+    def _drop(self, connection: Connection):
+        """Close connection and forget it if it is still the peer's entry"""
+        connection.close()
+        peer_id = connection.peer.peer_id
+        if self.connections.get(peer_id) is connection:
+            del self.connections[peer_id]
+            if self.on_disconnect is not None:
+                self.on_disconnect(peer_id)
+
+    async def _read_loop(self, connection: Connection):
+        peer_id = connection.peer.peer_id
+        try:
+            while True:
+                message = await read_frame(connection.reader)
+                connection.last_received = time.time()
+                if self.on_seen is not None:
+                    self.on_seen(peer_id)
+                if message.message_type == MessageType.PING:
+                    connection.send_now(frame(Message(
+                        message.message_id, MessageType.PONG, self.local.peer_id, ttl=1
+                    )))
+                elif message.message_type == MessageType.PONG:
+                    if connection.ping_sent is not None:
+                        connection.rtt = connection.last_received - connection.ping_sent
+                        connection.ping_sent = None
+                elif message.message_type != MessageType.PEER_HELLO:
+                    try:
+                        self.on_message(message, peer_id)
+                    except Exception as e:
+                        # A handler bug costs this message, not the connection
+                        print(f"[{self.local.peer_id}] Error handling "
+                              f"{message.message_type.value} from {peer_id}: {e!r}")
+        except (OSError, asyncio.IncompleteReadError, TransportError):
+            pass
+        finally:
+            self._drop(connection)
+
+    async def _keepalive(self):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            now = time.time()
+            for connection in list(self.connections.values()):
+                if connection.read_task is None or connection.read_task.done():
+                    self._drop(connection)  # Nothing reads it, so nothing else would
+                    continue
+                if now - connection.last_received > self.peer_timeout:
+                    connection.close()      # Read loop cleans up
+                    continue
+                self._ping_counter += 1
+                connection.ping_sent = now
+                connection.send_now(frame(Message(
+                    f"ping_{self._ping_counter}", MessageType.PING, self.local.peer_id, ttl=1
+                )))
+
+    def send(self, peer_id: str, message: Message) -> bool:
+        connection = self.connections.get(peer_id)
+        if connection is None:
+            return False
+        last_message, last_ttl, data = self._last_frame
+        if last_message is not message or last_ttl != message.ttl:
+            data = frame(message)
+            self._last_frame = (message, message.ttl, data)
+        return connection.send(message.message_type, data)
+
+    def peer_ids(self) -> List[str]:
+        return list(self.connections)
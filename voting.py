@@ -0,0 +1,55 @@
+"""
+FCU Blockchain Vote Counting
+- VoteTally: O(1) running yes/no counts and weighted (stake) totals
+- Shared by governance.py (proposals) and consensus.py (block approval)
+"""
+
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+
+class VoteTally:
+    """
+    Running yes/no counts and weighted (e.g. stake) totals.
+    record() is O(1) and handles a voter changing their vote; the weight
+    counted for each voter is the one given with their latest vote.
+    `votes` is a read-only view: every write goes through record() so the
+    counters cannot drift from it.
+    """
+
+    __slots__ = ('_votes', 'votes', 'weights', 'yes', 'no', 'yes_weight', 'no_weight')
+
+    def __init__(self, votes: Optional[Mapping[str, bool]] = None):
+        self._votes: Dict[str, bool] = {}
+        self.votes: Mapping[str, bool] = MappingProxyType(self._votes)
+        self.weights: Dict[str, float] = {}
+        self.yes = self.no = 0
+        self.yes_weight = self.no_weight = 0.0
+        for voter, vote in (votes or {}).items():
+            self.record(voter, vote)
+
+    def record(self, voter_id: str, vote: bool, weight: float = 1.0):
+        previous = self._votes.get(voter_id)
+        if previous is not None:
+            previous_weight = self.weights[voter_id]
+            if previous:
+                self.yes -= 1
+                self.yes_weight -= previous_weight
+            else:
+                self.no -= 1
+                self.no_weight -= previous_weight
+
+        self._votes[voter_id] = vote
+        self.weights[voter_id] = weight
+        if vote:
+            self.yes += 1
+            self.yes_weight += weight
+        else:
+            self.no += 1
+            self.no_weight += weight
+
+    def counts(self) -> Tuple[int, int]:
+        return self.yes, self.no
+
+    def weighted(self) -> Tuple[float, float]:
+        return self.yes_weight, self.no_weight